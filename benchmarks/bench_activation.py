@@ -0,0 +1,92 @@
+"""Measure activation-to-first-preview latency of the old and new pick paths.
+
+The old path built a new preview Toplevel and started fresh keyboard and mouse
+listener threads on every F2 press. The new path keeps them alive and only
+flips the picker state. Needs a real display (or Xvfb).
+Run with: python benchmarks/bench_activation.py
+"""
+import argparse
+import tkinter as tk
+
+from common import measure, report
+
+from pynput import mouse
+from pynput.keyboard import Listener as KeyboardListener
+import capture
+from preview import PickerState
+
+
+def render(root, color_preview, hex_label):
+    # One preview frame, as drawn by the picker
+    pixel_color = capture.sample_pixel(10, 10)
+    hex_color = '#{:02x}{:02x}{:02x}'.format(pixel_color[0], pixel_color[1], pixel_color[2])
+    color_preview.config(bg=hex_color)
+    hex_label.config(text=hex_color.upper())
+    root.update()
+
+
+def build_preview(root):
+    preview = tk.Toplevel(root)
+    preview.overrideredirect(True)
+    preview.attributes('-topmost', True)
+    color_preview = tk.Frame(preview, width=60, height=30, bg="#FFFFFF")
+    color_preview.pack(side=tk.TOP, pady=2, padx=2)
+    hex_label = tk.Label(preview, text="#FFFFFF", bg="#F0F0F0", font=("Arial", 9))
+    hex_label.pack(side=tk.BOTTOM, pady=2, padx=2, fill=tk.X)
+    preview.geometry("80x50+30+30")
+    return preview, color_preview, hex_label
+
+
+def old_activation(root):
+    # What every F2 press used to do
+    preview, color_preview, hex_label = build_preview(root)
+    key_listener = KeyboardListener(on_release=lambda key: True)
+    key_listener.start()
+    mouse_listener = mouse.Listener(on_move=lambda x, y: True)
+    mouse_listener.start()
+    key_listener.wait()
+    mouse_listener.wait()
+    render(root, color_preview, hex_label)
+
+    # The old path also tore everything down after each pick
+    key_listener.stop()
+    mouse_listener.stop()
+    preview.destroy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=30, help="Activations per case")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+
+    report("old: new window + listeners", measure(lambda: old_activation(root), repeat=args.repeat))
+
+    # New path: everything is built once up front
+    preview, color_preview, hex_label = build_preview(root)
+    preview.withdraw()
+    key_listener = KeyboardListener(on_release=lambda key: True)
+    key_listener.start()
+    mouse_listener = mouse.Listener(on_move=lambda x, y: True)
+    mouse_listener.start()
+    state = PickerState()
+
+    def new_activation():
+        state.transition(PickerState.IDLE, PickerState.PICKING)
+        preview.deiconify()
+        render(root, color_preview, hex_label)
+        state.transition(PickerState.PICKING, PickerState.FINISHING)
+        preview.withdraw()
+        state.transition(PickerState.FINISHING, PickerState.IDLE)
+
+    report("new: persistent, state flip", measure(new_activation, repeat=args.repeat))
+
+    key_listener.stop()
+    mouse_listener.stop()
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
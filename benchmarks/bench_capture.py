@@ -0,0 +1,53 @@
+"""Compare per-sample latency of full-screen capture, region capture and each backend.
+
+Needs a real display (or Xvfb). Run with: python benchmarks/bench_capture.py
+"""
+import argparse
+
+from common import measure, report
+
+import pyautogui
+import capture
+from capture_backends import BACKENDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50, help="Samples per case")
+    args = parser.parse_args()
+
+    width, height = pyautogui.size()
+    x, y = width // 2, height // 2
+
+    # The original path: grab the whole desktop, then read one pixel
+    report("full screenshot + getpixel",
+           measure(lambda: pyautogui.screenshot().getpixel((x, y)), repeat=args.repeat))
+
+    # The region-limited path used by the picker
+    report("capture.sample_pixel (1x1)",
+           measure(lambda: capture.sample_pixel(x, y), repeat=args.repeat))
+    for size in (5, 11, 33):
+        report(f"capture.sample_tile ({size}x{size})",
+               measure(lambda: capture.sample_tile(x, y, size), repeat=args.repeat))
+
+    # Every backend on the same 1x1 and 11x11 grabs
+    for name, backend_class in BACKENDS.items():
+        if name == 'fake':
+            continue
+        try:
+            backend = backend_class()
+        except Exception as e:
+            print(f"{name:<40} unavailable: {e}")
+            continue
+        for size in (1, 11):
+            report(f"{name} grab ({size}x{size})",
+                   measure(lambda: backend.grab(x, y, size, size), repeat=args.repeat))
+
+    capture.calibrate()
+    print("\nCalibration: " + ", ".join(
+        f"{name} {value:.3f} ms" if isinstance(value, float) else f"{name} {value}"
+        for name, value in capture.calibration.items()))
+
+
+if __name__ == "__main__":
+    main()
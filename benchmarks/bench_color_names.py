@@ -0,0 +1,49 @@
+"""Measure nearest color-name lookups: the bundled names and larger dictionaries.
+
+Runs headless. Run with: python benchmarks/bench_color_names.py
+"""
+import argparse
+import random
+import time
+
+from common import measure, report
+
+import color_names
+from color_index import NearestColorIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000],
+                        help="Sizes of synthetic name dictionaries to index as well")
+    parser.add_argument('--repeat', type=int, default=20, help="Runs per case")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    samples = [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(1000)]
+
+    started = time.perf_counter()
+    color_names.nearest_name(samples[0])
+    print(f"build @ {len(color_names.named_colors())} names: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def uncached():
+        color_names.nearest_name.cache_clear()
+        for color in samples:
+            color_names.nearest_name(color)
+    report("nearest_name x1k (uncached)", measure(uncached, repeat=args.repeat, warmup=1))
+    report("nearest_name x1k (cached)", measure(lambda: [color_names.nearest_name(color) for color in samples],
+                                               repeat=args.repeat))
+
+    # The same index over bigger dictionaries, for names appended to color_name_data
+    for size in args.sizes:
+        index = NearestColorIndex()
+        started = time.perf_counter()
+        index.rebuild((f"name {i}", (rng.randrange(256), rng.randrange(256), rng.randrange(256)), f"name {i}")
+                      for i in range(size))
+        print(f"build @ {size} names: {(time.perf_counter() - started) * 1000:.1f} ms")
+        report(f"nearest x1k @ {size} names", measure(lambda: [index.nearest(color) for color in samples],
+                                                       repeat=args.repeat, warmup=1))
+
+
+if __name__ == "__main__":
+    main()
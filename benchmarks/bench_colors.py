@@ -0,0 +1,61 @@
+"""Measure batch color-conversion throughput against the scalar functions.
+
+Runs headless. Run with: python benchmarks/bench_colors.py
+"""
+import argparse
+
+import numpy as np
+
+from common import measure, report
+
+import colors
+
+BATCH = [
+    ('hex_to_rgb', 'hex'),
+    ('rgb_to_hex', 'rgb'),
+    ('rgb_to_hsv', 'rgb'),
+    ('rgb_to_hsl', 'rgb'),
+    ('rgb_to_lab', 'rgb'),
+    ('rgb_to_oklab', 'rgb'),
+    ('lab_to_rgb', 'lab'),
+    ('oklab_to_rgb', 'oklab'),
+    ('relative_luminance', 'rgb'),
+    ('is_dark', 'rgb'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000000, help="Colors per batch call")
+    parser.add_argument('--repeat', type=int, default=10, help="Runs per case")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(args.size, 3), dtype=np.uint8)
+    inputs = {
+        'rgb': rgb,
+        'hex': colors.rgb_to_hex_array(rgb),
+        'lab': colors.rgb_to_lab_array(rgb),
+        'oklab': colors.rgb_to_oklab_array(rgb),
+    }
+
+    print(f"Batch calls over {args.size} colors")
+    for name, kind in BATCH:
+        func = getattr(colors, name + '_array')
+        values = inputs[kind]
+        stats = measure(lambda: func(values), repeat=args.repeat, warmup=1)
+        report(f"{name}_array", stats)
+        print(f"{'':<40} {args.size / stats['p50_ms'] / 1000.0:9.1f} M colors/s")
+
+    # The scalar path, for comparison, over a slice small enough to loop in Python
+    sample = [tuple(int(c) for c in color) for color in rgb[:10000]]
+    print(f"\nScalar calls over {len(sample)} colors")
+    for name in ('rgb_to_lab', 'rgb_to_oklab', 'is_dark'):
+        func = getattr(colors, name)
+        stats = measure(lambda: [func(color) for color in sample], repeat=args.repeat, warmup=1)
+        report(name, stats)
+        print(f"{'':<40} {len(sample) / stats['p50_ms'] / 1000.0:9.1f} M colors/s")
+
+
+if __name__ == "__main__":
+    main()
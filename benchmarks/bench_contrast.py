@@ -0,0 +1,37 @@
+"""Measure the WCAG contrast matrix: summary, listing and CSV export.
+
+Runs headless. Run with: python benchmarks/bench_contrast.py
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from common import measure, report
+
+from contrast import ContrastMatrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 3000, 5000],
+                        help="Numbers of favorites compared pairwise")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        entries = [(f"color {i}", '#{:06X}'.format(rng.randrange(1 << 24))) for i in range(size)]
+        matrix = ContrastMatrix(entries)
+        name = f"{matrix.pairs:,} pairs"
+        report(f"summary @ {name}", measure(matrix.summary, repeat=args.repeat, warmup=1))
+        report(f"500 failing AA @ {name}",
+               measure(lambda: matrix.pairs_list('AA', False, 500), repeat=args.repeat, warmup=0))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "contrast.csv")
+            report(f"CSV of AAA passes @ {name}",
+                   measure(lambda: matrix.write_csv(path, 'AAA'), repeat=args.repeat, warmup=0))
+
+
+if __name__ == "__main__":
+    main()
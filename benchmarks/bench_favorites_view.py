@@ -0,0 +1,84 @@
+"""Measure the favorites Treeview add, edit and delete paths at scale.
+
+Compares the old full rebuild (every row deleted and reinserted after each
+change) with single-row updates. Needs a display (Xvfb is fine).
+Run with: python benchmarks/bench_favorites_view.py
+"""
+import argparse
+import random
+import tkinter as tk
+from tkinter import ttk
+
+from common import measure, report
+
+from favorites_view import FavoritesView
+
+
+def is_dark_color(hex_color):
+    # The row text color rule as the old rebuild computed it, one string at a time
+    hex_color = hex_color.lstrip('#')
+    r, g, b = (int(hex_color[i:i + 2], 16) / 255.0 for i in (0, 2, 4))
+    return (0.299 * r + 0.587 * g + 0.114 * b) < 0.5
+
+
+def full_rebuild(tree, favorites):
+    # What refresh_favorites_list did after every add, edit and delete
+    for item in tree.get_children():
+        tree.delete(item)
+    for favorite in favorites:
+        hex_code = favorite["hex"]
+        is_dark = is_dark_color(hex_code)
+        tag_name = f"{hex_code}_{is_dark}"
+        tree.insert("", "end", values=(favorite["label"], hex_code), tags=(tag_name,))
+        tree.tag_configure(tag_name, background=hex_code, foreground="white" if is_dark else "black")
+    ttk.Style().configure('Treeview', rowheight=40)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help="Numbers of favorites")
+    parser.add_argument('--repeat', type=int, default=200, help="Runs per incremental case")
+    parser.add_argument('--rebuild-repeat', type=int, default=3, help="Runs of the full rebuild")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    rng = random.Random(0)
+
+    for size in args.sizes:
+        tree = ttk.Treeview(root, columns=("Label", "Hex"), show="headings")
+        view = FavoritesView(tree)
+        favorites = [{"label": f"color {i}", "hex": '#{:06X}'.format(rng.randrange(1 << 24))}
+                     for i in range(size)]
+
+        report(f"full rebuild @ {size}",
+               measure(lambda: full_rebuild(tree, favorites), repeat=args.rebuild_repeat, warmup=0))
+
+        tree.delete(*tree.get_children())  # The view only tracks rows it inserted
+        view.reset(enumerate(favorites))
+        root.update()
+        new_favorite = {"label": "new", "hex": "#123456"}
+
+        def add():
+            view.insert(size, new_favorite)
+            view.remove(size)
+
+        def edit():
+            key = rng.randrange(size)
+            view.update(key, favorites[key])
+
+        def delete():
+            key = rng.randrange(size)
+            view.remove(key)
+            view.insert(key, favorites[key])
+
+        report(f"add row @ {size}", measure(add, repeat=args.repeat))
+        report(f"edit row @ {size}", measure(edit, repeat=args.repeat))
+        report(f"delete row @ {size}", measure(delete, repeat=args.repeat))
+        tree.destroy()
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
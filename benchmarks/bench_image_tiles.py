@@ -0,0 +1,72 @@
+"""Measure Open Image: decoding a large file, rendering tiles and sampling.
+
+Writes a synthetic PNG (noise over gradients, so it does not compress away)
+to a temporary directory first. Runs headless; PhotoImage creation is not
+included. Run with: python benchmarks/bench_image_tiles.py --size 12000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from common import measure, report
+
+from image_tiles import TILE_SIZE, TiledImage
+
+# A full-HD canvas worth of tiles
+VIEW = (1920, 1080)
+
+
+def write_image(path, size):
+    # Build a band of rows at a time so the source image is the only full-size copy
+    rng = np.random.default_rng(0)
+    image = Image.new('RGB', (size, size))
+    band = 1024
+    columns = np.arange(size, dtype=np.uint32)
+    for top in range(0, size, band):
+        rows = np.arange(top, min(size, top + band), dtype=np.uint32)[:, None]
+        pixels = np.empty((len(rows), size, 3), dtype=np.uint8)
+        pixels[..., 0] = (columns * 255 // size)[None, :]
+        pixels[..., 1] = rows * 255 // size
+        pixels[..., 2] = rng.integers(0, 256, size=(len(rows), size), dtype=np.uint8)
+        image.paste(Image.fromarray(pixels, 'RGB'), (0, top))
+    image.save(path, compress_level=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=8000, help="Side of the square test image in pixels")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per case")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.png")
+        started = time.perf_counter()
+        write_image(path, args.size)
+        print(f"wrote {args.size} x {args.size} PNG in {time.perf_counter() - started:.1f} s")
+
+        started = time.perf_counter()
+        image = TiledImage(path)
+        print(f"decode and pyramid: {time.perf_counter() - started:.1f} s ({len(image.levels)} levels)")
+
+    # Every tile of a full-HD view from the middle of the image, as a zoom change draws them
+    for label, zoom in (("fit", image.fit_zoom(*VIEW)), ("25%", 0.25), ("100%", 1.0), ("400%", 4.0)):
+        width, height = image.display_size(zoom)
+        left, top = max(0, (width - VIEW[0]) // 2), max(0, (height - VIEW[1]) // 2)
+        tiles = image.visible_tiles(zoom, left, top, *VIEW)
+        report(f"{len(tiles)} tiles @ {label}",
+               measure(lambda: [image.render_tile(zoom, column, row) for column, row in tiles],
+                       repeat=args.repeat, warmup=1))
+    report(f"one {TILE_SIZE}px tile @ 100%", measure(lambda: image.render_tile(1.0, 3, 3), repeat=args.repeat * 20))
+
+    center = (image.width // 2, image.height // 2)
+    report("sample 1 pixel", measure(lambda: image.sample(*center), repeat=1000))
+    report("sample 11x11 median", measure(lambda: image.sample(*center, 11, 'median'), repeat=1000))
+    report("loupe tile 11x11", measure(lambda: image.tile_array(*center, 11), repeat=1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Measure magnifier frame time for a few grid sizes and zoom factors.
+
+Needs a display for the Tk PhotoImage (Xvfb is fine).
+Run with: python benchmarks/bench_magnifier.py
+"""
+import argparse
+import tkinter as tk
+
+from common import measure, report
+
+import numpy as np
+from magnifier import Magnifier
+
+CASES = [(11, 8), (21, 8), (31, 6), (63, 4)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help="Frames per case")
+    parser.add_argument('--live', action='store_true', help="Include a real screen capture in each frame")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    rng = np.random.default_rng(0)
+
+    for grid_size, zoom in CASES:
+        loupe = Magnifier(root, grid_size, zoom)
+        tile = rng.integers(0, 256, (loupe.grid_size, loupe.grid_size, 3), dtype=np.uint8)
+
+        report(f"draw {loupe.grid_size}x{loupe.grid_size} @ {zoom}x",
+               measure(lambda: loupe.draw(tile), repeat=args.repeat))
+        if args.live:
+            report(f"capture+draw {loupe.grid_size}x{loupe.grid_size} @ {zoom}x",
+                   measure(lambda: loupe.render(100, 100), repeat=args.repeat))
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
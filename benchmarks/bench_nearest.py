@@ -0,0 +1,39 @@
+"""Measure nearest-favorite lookups and incremental index updates.
+
+Runs headless. Run with: python benchmarks/bench_nearest.py
+"""
+import argparse
+import random
+
+from common import measure, report
+
+from color_index import NearestColorIndex
+
+
+def random_rgb(rng):
+    return rng.randrange(256), rng.randrange(256), rng.randrange(256)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help="Numbers of favorites to index")
+    parser.add_argument('--repeat', type=int, default=2000, help="Queries per case")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        index = NearestColorIndex()
+        index.rebuild((key, random_rgb(rng), None) for key in range(size))
+
+        report(f"nearest @ {size}", measure(lambda: index.nearest(random_rgb(rng)), repeat=args.repeat))
+
+        # One add followed by one remove, as when a favorite is saved and deleted
+        def add_remove():
+            index.add('bench', random_rgb(rng))
+            index.remove('bench')
+        report(f"add + remove @ {size}", measure(add_remove, repeat=args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Measure palette export, streaming import and dedup for every format.
+
+Runs headless. Run with: python benchmarks/bench_palette_io.py
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from common import measure, report
+
+import palette_io
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=200000, help="Colors in the palette")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    entries = [(f"color {i}", '#{:06X}'.format(rng.randrange(1 << 24))) for i in range(args.size)]
+    # Half the palette already saved, as when re-importing an updated palette
+    existing = {hex_code for _, hex_code in entries[::2]}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for format in palette_io.FORMATS:
+            path = os.path.join(directory, f"palette.{format}")
+            report(f"write {format} @ {args.size}",
+                   measure(lambda: palette_io.write_palette(path, entries), repeat=args.repeat, warmup=0))
+            report(f"read {format} @ {args.size}",
+                   measure(lambda: sum(1 for _ in palette_io.read_palette(path)), repeat=args.repeat, warmup=0))
+            report(f"read + dedup {format} @ {args.size}",
+                   measure(lambda: palette_io.new_entries(palette_io.read_palette(path), set(existing)),
+                           repeat=args.repeat, warmup=0))
+
+
+if __name__ == "__main__":
+    main()
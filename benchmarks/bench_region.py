@@ -0,0 +1,41 @@
+"""Measure region analysis (histograms, average, top colors) on screen-sized buffers.
+
+Runs headless on synthetic BGRA buffers laid out like an mss capture.
+Run with: python benchmarks/bench_region.py
+"""
+import argparse
+
+import numpy as np
+
+from common import measure, report
+
+from region import analyze_region, preview_step
+
+SIZES = {'1080p': (1920, 1080), '1440p': (2560, 1440), '4k': (3840, 2160)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=sorted(SIZES), default=['1080p', '4k'])
+    parser.add_argument('--bits', type=int, default=5, help="Bits per channel for top-color bins")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per case")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for name in args.sizes:
+        width, height = SIZES[name]
+        # Flat UI areas plus noise, viewed as RGB the way capture returns it
+        bgra = np.full((height, width, 4), 255, dtype=np.uint8)
+        bgra[:height // 2, :, :3] = (40, 40, 40)
+        bgra[height // 2:, :, :3] = rng.integers(0, 256, size=(height - height // 2, width, 3), dtype=np.uint8)
+        pixels = bgra[..., 2::-1]
+
+        report(f"full analysis @ {name}",
+               measure(lambda: analyze_region(pixels, bits=args.bits), repeat=args.repeat, warmup=1))
+        step = preview_step(width, height)
+        report(f"quick preview (step {step}) @ {name}",
+               measure(lambda: analyze_region(pixels, bits=args.bits, step=step), repeat=args.repeat, warmup=1))
+
+
+if __name__ == "__main__":
+    main()
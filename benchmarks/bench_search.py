@@ -0,0 +1,57 @@
+"""Measure favorites filter queries and incremental index updates.
+
+Runs headless. Run with: python benchmarks/bench_search.py
+"""
+import argparse
+import random
+import time
+
+from common import measure, report
+
+from color_index import NearestColorIndex
+from colors import hex_to_rgb
+from favorites import FavoritesModel
+from favorites_search import FavoritesSearch
+
+WORDS = ("brand blue red green primary accent dark light warm cool ocean sky forest sunset gray slate").split()
+
+QUERIES = ("b", "blue", "brand blue", "ocean 123", "brnad bleu", "#3A", "#3A5F", "~#3366CC", "~#3366CC 3")
+
+
+def random_favorites(size, rng):
+    return [{"label": f"{' '.join(rng.sample(WORDS, 2))} {i}", "hex": '#{:06X}'.format(rng.randrange(1 << 24))}
+            for i in range(size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="Numbers of favorites to search")
+    parser.add_argument('--repeat', type=int, default=50, help="Runs per query")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        model = FavoritesModel()
+        model.load(random_favorites(size, rng))
+        index = NearestColorIndex()
+        index.rebuild((key, hex_to_rgb(favorite["hex"]), favorite) for key, favorite in model)
+        search = FavoritesSearch(model, index)
+
+        started = time.perf_counter()
+        search.build()
+        print(f"build @ {size}: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        for query in QUERIES:
+            report(f"{query!r} @ {size} ({len(search.search(query))} hits)",
+                   measure(lambda: search.search(query), repeat=args.repeat))
+
+        # A label edit re-indexes one favorite, as edit_favorite_label does
+        def edit():
+            key = rng.randrange(1, size + 1)
+            search.update(key, model.update(key, label=f"{rng.choice(WORDS)} edited"))
+        report(f"edit label @ {size}", measure(edit, repeat=args.repeat))
+
+
+if __name__ == "__main__":
+    main()
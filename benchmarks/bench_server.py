@@ -0,0 +1,87 @@
+"""Measure pixel-query server throughput with concurrent clients.
+
+Starts the server in-process on a free port and captures the real screen,
+so it needs a display. Xvfb works:
+
+    xvfb-run -s "-screen 0 1920x1080x24" python benchmarks/bench_server.py
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+
+from common import measure, report
+
+import capture
+from pixel_server import PixelServer
+
+
+def make_client(address, points):
+    """Return a function that sends one batch over a kept-alive connection"""
+    connection = http.client.HTTPConnection(*address)
+    body = json.dumps({"points": points})
+    headers = {'Content-Type': 'application/json'}
+
+    def query():
+        connection.request('POST', '/pixels', body, headers)
+        response = connection.getresponse()
+        payload = response.read()
+        if response.status != 200:
+            raise RuntimeError(payload.decode('utf-8', 'replace'))
+    return query
+
+
+def run_clients(address, batches, clients, requests):
+    """Send `requests` batches from each of `clients` threads; return seconds taken"""
+    queries = [make_client(address, batches[i % len(batches)]) for i in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+
+    def worker(query):
+        barrier.wait()
+        for _ in range(requests):
+            query()
+
+    threads = [threading.Thread(target=worker, args=(query,)) for query in queries]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1, 100, 1000], help="Points per batch")
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8], help="Concurrent clients")
+    parser.add_argument('--cache-ms', type=float, nargs='+', default=[0, 16], help="Frame cache TTLs")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per client")
+    args = parser.parse_args()
+
+    left, top, width, height = capture.screen_bounds()
+    rng = random.Random(0)
+    print(f"Screen {width}x{height}")
+
+    for cache_ms in args.cache_ms:
+        server = PixelServer(0, cache_ms=cache_ms)
+        server.start()
+        try:
+            for count in args.points:
+                batches = [[[rng.randrange(left, left + width), rng.randrange(top, top + height)]
+                            for _ in range(count)] for _ in range(8)]
+                report(f"latency, {count} points, cache {cache_ms:g} ms",
+                       measure(make_client(server.address, batches[0]), repeat=args.requests))
+                for clients in args.clients:
+                    elapsed = run_clients(server.address, batches, clients, args.requests)
+                    total = clients * args.requests
+                    print(f"{'':<4}{clients} clients: {total / elapsed:9.1f} requests/s  "
+                          f"{total * count / elapsed:12.0f} points/s")
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Cold-start timings: time to first paint and time until the hotkey is armed.
+
+Launches the application several times with COLOR_PICKER_STARTUP_REPORT set,
+so it writes its own timings and quits once the hotkey is registered. Run
+under `-X importtime` to also list the slowest imports. Needs a display.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --exe dist/ColorPicker.exe
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from common import ROOT
+
+APP = os.path.join(ROOT, 'color-picker.py')
+
+
+def launch(command, timeout=60):
+    """Run the app once and return its startup timings and stderr"""
+    fd, report_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        env = dict(os.environ, COLOR_PICKER_STARTUP_REPORT=report_path)
+        result = subprocess.run(command, env=env, capture_output=True, text=True, timeout=timeout)
+        with open(report_path) as f:
+            text = f.read()
+        if not text:
+            raise RuntimeError(f"No startup report written:\n{result.stderr}")
+        return json.loads(text), result.stderr
+    finally:
+        os.remove(report_path)
+
+
+def slowest_imports(stderr, count=15):
+    """Parse `-X importtime` output into the top (cumulative ms, module) pairs"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative) / 1000.0, name.rstrip()))
+    imports.sort(reverse=True)
+    return imports[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure application startup time.")
+    parser.add_argument('--exe', help="Time a frozen build instead of the script")
+    parser.add_argument('-n', '--runs', type=int, default=5, help="Launches to time (default 5)")
+    args = parser.parse_args()
+
+    if args.exe:
+        command = [args.exe]
+    else:
+        command = [sys.executable, '-X', 'importtime', APP]
+
+    runs = []
+    stderr = ''
+    for _ in range(args.runs):
+        timings, stderr = launch(command)
+        runs.append(timings)
+
+    for key in ('first_paint_ms', 'hotkey_ready_ms'):
+        samples = [run[key] for run in runs]
+        print(f"{key:<40} median {statistics.median(samples):9.1f} ms   "
+              f"min {min(samples):9.1f} ms   max {max(samples):9.1f} ms   ({len(samples)} runs)")
+
+    imports = slowest_imports(stderr)
+    if imports:
+        print("\nSlowest imports (cumulative, last run):")
+        for ms, name in imports:
+            print(f"  {ms:9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measure favorites save and load at large list sizes.
+
+Compares the old full rewrite of favorites.json with the journaled store.
+Runs headless in a temporary directory. Run with: python benchmarks/bench_storage.py
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from common import measure, report
+
+from favorites import FavoritesModel, FavoritesStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help="Numbers of favorites")
+    parser.add_argument('--repeat', type=int, default=20, help="Runs per case")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        entries = [{"label": f"color {i}", "hex": '#{:06X}'.format(rng.randrange(1 << 24))} for i in range(size)]
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            legacy_path = os.path.join(data_dir, 'legacy.json')
+
+            def legacy_save():
+                # What save_favorites did after every change
+                with open(legacy_path, 'w') as f:
+                    json.dump(entries, f, indent=2)
+
+            def legacy_load():
+                with open(legacy_path, 'r') as f:
+                    FavoritesModel().load(json.load(f))
+
+            report(f"legacy save @ {size}", measure(legacy_save, repeat=args.repeat))
+            report(f"legacy load @ {size}", measure(legacy_load, repeat=args.repeat))
+
+            # Journaled store; compaction is measured separately
+            store = FavoritesStore(data_dir, compact_after=10 ** 9)
+            model = FavoritesModel()
+            model.load(entries)
+            store.compact(model)
+
+            def journal_save():
+                model.update(rng.randrange(1, size + 1), label="edited")
+                store.save(model)
+
+            report(f"journal save (1 edit) @ {size}", measure(journal_save, repeat=args.repeat))
+            report(f"compact @ {size}", measure(lambda: store.compact(model), repeat=args.repeat))
+
+            # Load with a journal of 1000 pending records on top of the snapshot
+            for _ in range(1000):
+                model.update(rng.randrange(1, size + 1), label="edited")
+            store.save(model)
+            report(f"load snapshot+1000 records @ {size}",
+                   measure(lambda: store.load(FavoritesModel()), repeat=args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Small timing helpers shared by the benchmark scripts."""
+import os
+import statistics
+import sys
+import time
+
+# Make the application modules importable when run as `python benchmarks/x.py`
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def measure(func, repeat=100, warmup=5):
+    """Call func repeatedly and return its latency statistics in milliseconds"""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    samples.sort()
+    return {
+        'runs': repeat,
+        'min_ms': samples[0],
+        'mean_ms': statistics.fmean(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max_ms': samples[-1],
+    }
+
+
+def report(name, stats):
+    """Print one line of benchmark results"""
+    print(f"{name:<40} mean {stats['mean_ms']:9.3f} ms   p50 {stats['p50_ms']:9.3f} ms   "
+          f"p95 {stats['p95_ms']:9.3f} ms   ({stats['runs']} runs)")
@@ -0,0 +1,254 @@
+"""Reproducible benchmark suite with JSON baselines and regression checks.
+
+Covers the hot paths: per-sample capture against a synthetic screen (the
+fake capture backend), color conversion throughput, the favorites list
+refresh at 1k/10k/100k rows, favorites load/save at scale, and filter
+queries over 100k favorites. Runs
+headless on Linux; with no DISPLAY it starts Xvfb itself when available,
+otherwise the Tk cases are skipped.
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --baseline baseline.json        # run, then compare
+    python benchmarks/suite.py --compare old.json new.json     # compare two saved runs
+
+A case regresses when its median grows by more than --threshold (default
+15%) and by more than --min-delta-ms, so sub-microsecond noise is ignored.
+Exits with status 1 if anything regressed.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, measure
+
+import capture
+import color_names
+import colors
+from color_index import NearestColorIndex
+from favorites import FavoritesModel, FavoritesStore
+from favorites_search import FavoritesSearch
+
+FAVORITE_SIZES = (1000, 10000, 100000)
+
+
+def random_favorites(size, seed=0):
+    rng = random.Random(seed)
+    return [{"label": f"color {i}", "hex": '#{:06X}'.format(rng.randrange(1 << 24))} for i in range(size)]
+
+
+def capture_cases(repeat):
+    # The fake backend serves a synthetic two-monitor screen from memory
+    capture.set_backend('fake')
+    yield "capture.sample_pixel", measure(lambda: capture.sample_pixel(-5, 300), repeat=repeat)
+    yield "capture.sample_area 5x5 mean", measure(lambda: capture.sample_area(100, 300, 5), repeat=repeat)
+    yield "capture.sample_tile_array 11x11", measure(lambda: capture.sample_tile_array(100, 300, 11), repeat=repeat)
+
+
+def color_cases(repeat):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(100000, 3), dtype=np.uint8)
+    hex_codes = colors.rgb_to_hex_array(rgb)
+    sample = hex_codes[:10000]
+
+    # The per-row rule FavoritesView and is_dark_color apply
+    yield "is_dark(hex_to_rgb) x10k", measure(
+        lambda: [colors.is_dark(colors.hex_to_rgb(code)) for code in sample], repeat=repeat)
+    yield "rgb_to_hex x10k", measure(
+        lambda: [colors.rgb_to_hex(color) for color in rgb[:10000].tolist()], repeat=repeat)
+    yield "is_dark_array x100k", measure(lambda: colors.is_dark_array(rgb), repeat=repeat)
+    yield "hex_to_rgb_array x100k", measure(lambda: colors.hex_to_rgb_array(hex_codes), repeat=repeat)
+    yield "rgb_to_hex_array x100k", measure(lambda: colors.rgb_to_hex_array(rgb), repeat=repeat)
+    yield "rgb_to_lab_array x100k", measure(lambda: colors.rgb_to_lab_array(rgb), repeat=repeat)
+
+    # What each preview frame spends naming the sampled color
+    samples = [tuple(color) for color in rgb[:1000].tolist()]
+    color_names.nearest_name(samples[0])  # Build the index outside the timings
+
+    def uncached():
+        color_names.nearest_name.cache_clear()
+        for color in samples:
+            color_names.nearest_name(color)
+    yield "nearest_name x1k (uncached)", measure(uncached, repeat=max(1, repeat // 10), warmup=1)
+    yield "nearest_name x1k (cached)", measure(
+        lambda: [color_names.nearest_name(color) for color in samples], repeat=repeat)
+
+
+def search_cases(repeat):
+    model = FavoritesModel()
+    model.load(random_favorites(FAVORITE_SIZES[-1]))
+    index = NearestColorIndex()
+    index.rebuild((key, colors.hex_to_rgb(favorite["hex"]), favorite) for key, favorite in model)
+    search = FavoritesSearch(model, index)
+    search.build()
+    size = len(model)
+    for query in ("color 12", "colr 123", "#3A", "~#3366CC 5"):
+        yield f"filter {query!r} @ {size}", measure(lambda: search.search(query), repeat=repeat)
+
+
+def favorites_view_cases(repeat):
+    import tkinter as tk
+    from tkinter import ttk
+    from favorites_view import FavoritesView
+
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        for size in FAVORITE_SIZES:
+            model = FavoritesModel()
+            model.load(random_favorites(size))
+            tree = ttk.Treeview(root, columns=("Label", "Hex"), show="headings")
+            view = FavoritesView(tree)
+
+            def refresh():
+                # What refresh_favorites_list does
+                view.reset(model)
+                root.update_idletasks()
+
+            yield f"refresh_favorites_list @ {size}", measure(refresh, repeat=max(1, repeat // 10), warmup=1)
+            tree.destroy()
+    finally:
+        root.destroy()
+
+
+def storage_cases(repeat):
+    rng = random.Random(0)
+    for size in FAVORITE_SIZES:
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = FavoritesStore(data_dir, compact_after=10 ** 9)
+            model = FavoritesModel()
+            model.load(random_favorites(size))
+            store.compact(model)
+
+            def save_one_edit():
+                # What save_favorites hands the writer after a single change
+                model.update(rng.randrange(1, size + 1), label="edited")
+                store.save(model)
+
+            yield f"save_favorites (1 edit) @ {size}", measure(save_one_edit, repeat=repeat)
+            yield f"compact @ {size}", measure(lambda: store.compact(model), repeat=max(1, repeat // 5), warmup=1)
+            store.compact(model)
+            yield f"load_favorites @ {size}", measure(lambda: store.load(FavoritesModel()),
+                                                      repeat=max(1, repeat // 5), warmup=1)
+
+
+def ensure_display():
+    """Make sure Tk has a display, starting Xvfb if needed; return the process we started"""
+    if os.getenv('DISPLAY') or sys.platform != 'linux':
+        return None
+    xvfb = shutil.which('Xvfb')
+    if xvfb is None:
+        return None
+    display = ':97'
+    process = subprocess.Popen([xvfb, display, '-screen', '0', '1920x1080x24', '-nolisten', 'tcp'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)  # Give the server time to accept connections
+    os.environ['DISPLAY'] = display
+    return process
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(repeat):
+    groups = [("capture", capture_cases), ("colors", color_cases), ("storage", storage_cases),
+              ("search", search_cases)]
+    xvfb = ensure_display()
+    if sys.platform == 'linux' and not os.getenv('DISPLAY'):
+        print("No DISPLAY and no Xvfb found; skipping the favorites list cases", file=sys.stderr)
+    else:
+        groups.append(("favorites view", favorites_view_cases))
+
+    results = {}
+    try:
+        for group, cases in groups:
+            print(f"[{group}]")
+            for name, stats in cases(repeat):
+                results[name] = stats
+                print(f"  {name:<40} p50 {stats['p50_ms']:10.4f} ms   p95 {stats['p95_ms']:10.4f} ms")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "recorded_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold, min_delta_ms):
+    """Print median changes between two runs; return the names that regressed"""
+    regressions = []
+    print(f"\n{'case':<42} {'base p50':>12} {'new p50':>12} {'change':>9}")
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        old = baseline["results"].get(name)
+        new = current["results"].get(name)
+        if old is None or new is None:
+            print(f"{name:<42} {'only in ' + ('new' if old is None else 'baseline'):>35}")
+            continue
+        old_ms, new_ms = old["p50_ms"], new["p50_ms"]
+        change = (new_ms - old_ms) / old_ms if old_ms else 0.0
+        regressed = change > threshold and new_ms - old_ms > min_delta_ms
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<42} {old_ms:12.4f} {new_ms:12.4f} {change:+9.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-o', '--output', help="Write this run's results here as JSON")
+    parser.add_argument('--baseline', help="Compare this run against a saved JSON run")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="Compare two saved runs without running")
+    parser.add_argument('--repeat', type=int, default=50, help="Runs per fast case (slow cases use fewer)")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Allowed median slowdown (default 0.15)")
+    parser.add_argument('--min-delta-ms', type=float, default=0.002,
+                        help="Ignore slowdowns smaller than this many ms (default 0.002)")
+    args = parser.parse_args()
+
+    if args.compare:
+        runs = []
+        for path in args.compare:
+            with open(path) as f:
+                runs.append(json.load(f))
+        baseline, current = runs
+    else:
+        current = run(args.repeat)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2)
+        if not args.baseline:
+            return 0
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
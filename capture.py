@@ -0,0 +1,229 @@
+"""Screen sampling used by the live preview and the final pick.
+
+Captures go through one backend from capture_backends, chosen on first use:
+either the one named by the capture_backend setting, or with 'auto' the
+fastest backend that works here, measured by a short calibration run.
+"""
+import statistics
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from capture_backends import AUTO_EXCLUDED, BACKENDS
+from config import config
+from diagnostics import probe
+
+_lock = threading.Lock()
+_backend = None
+
+# Color given to the parts of a tile that are off the screen
+OFF_SCREEN_COLOR = (64, 64, 64)
+
+# Median milliseconds per calibration grab, or the error, by backend name
+calibration = {}
+
+
+def calibrate(names=None, size=11, runs=15, budget=0.25):
+    """Time each working backend on a size x size grab; return the fastest one.
+
+    After one untimed warm-up grab, which is also checked for the right
+    shape, each backend gets at most `runs` timed grabs or `budget` seconds,
+    whichever ends first, so a slow backend cannot stall startup; it always
+    gets at least one. Results are kept in `calibration`.
+    """
+    if names is None:
+        names = [name for name in BACKENDS if name not in AUTO_EXCLUDED]
+
+    best, best_ms = None, None
+    opened = []
+    for name in names:
+        try:
+            candidate = BACKENDS[name]()
+            opened.append(candidate)
+            left, top, width, height = candidate.screen_bounds()
+            x, y = left + width // 2 - size // 2, top + height // 2 - size // 2
+
+            tile = candidate.grab(x, y, size, size)  # Warm up caches and connections
+            if tile.shape != (size, size, 3) or tile.dtype != np.uint8:
+                raise ValueError(f"returned {tile.dtype} {tile.shape}")
+
+            # The budget starts after the warm-up, which may be slow the first time
+            samples = []
+            deadline = time.perf_counter() + budget
+            while not samples or (len(samples) < runs and time.perf_counter() < deadline):
+                start = time.perf_counter()
+                candidate.grab(x, y, size, size)
+                samples.append((time.perf_counter() - start) * 1000.0)
+            median_ms = statistics.median(samples)
+        except Exception as e:
+            calibration[name] = f"unavailable: {e}"
+            continue
+
+        calibration[name] = median_ms
+        if best is None or median_ms < best_ms:
+            best, best_ms = candidate, median_ms
+
+    # The losers are dropped; close the handles they opened on this thread
+    for candidate in opened:
+        if candidate is not best:
+            candidate.close()
+
+    if best is None:
+        raise OSError("No screen capture backend works here: "
+                      + "; ".join(f"{name} {calibration[name]}" for name in names))
+    return best
+
+
+def _choose(name):
+    # Caller holds _lock
+    global _backend
+    chosen = None
+    if name != 'auto':
+        try:
+            chosen = BACKENDS[name]()
+        except Exception as e:
+            print(f"Capture backend {name!r} unavailable ({e}); choosing automatically")
+    if chosen is None:
+        chosen = calibrate()
+    _backend = chosen
+    return chosen
+
+
+def set_backend(name='auto'):
+    """Switch to the named backend, or calibrate and take the fastest for 'auto'"""
+    with _lock:
+        return _choose(name)
+
+
+def backend():
+    """Return the active backend, choosing it on first use"""
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _choose(config['capture_backend'])
+    return _backend
+
+
+def active_backend():
+    """Return the backend in use, or None if none has been chosen yet"""
+    return _backend
+
+
+def release_thread():
+    """Close the capture handles the calling thread opened.
+
+    Backends keep one native handle (an X connection, say) per thread, so
+    every short-lived thread that captures calls this before it ends.
+    """
+    if _backend is not None:
+        _backend.close()
+
+
+def screen_bounds():
+    """Return (left, top, width, height) of the whole virtual screen (all monitors)"""
+    return backend().screen_bounds()
+
+
+def grab_region(left, top, width, height):
+    """Capture only the given rectangle of the screen as an RGB image"""
+    return Image.fromarray(np.ascontiguousarray(grab_region_array(left, top, width, height)), 'RGB')
+
+
+def grab_region_array(left, top, width, height):
+    """Capture a rectangle of the screen as a (height, width, 3) RGB uint8 array"""
+    started = probe.start()
+    pixels = backend().grab(left, top, width, height)
+    probe.stop('capture', started)
+    return pixels
+
+
+def clip_to_screen(left, top, width, height):
+    """Return the part of a rectangle on the virtual screen as (left, top, width, height), or None"""
+    screen_left, screen_top, screen_width, screen_height = screen_bounds()
+    right = min(left + width, screen_left + screen_width)
+    bottom = min(top + height, screen_top + screen_height)
+    left, top = max(left, screen_left), max(top, screen_top)
+    if left >= right or top >= bottom:
+        return None
+    return left, top, right - left, bottom - top
+
+
+def grab_on_screen(left, top, width, height):
+    """Capture the part of a rectangle that is on the virtual screen.
+
+    Returns (pixels, column, row): the captured array and where its top-left
+    corner sits within the requested rectangle. Backends must never be asked
+    for pixels off the screen (Xlib treats that as a fatal error), so
+    everything near an edge goes through here. Raises ValueError when none
+    of the rectangle is on the screen.
+    """
+    clipped = clip_to_screen(left, top, width, height)
+    if clipped is None:
+        raise ValueError(f"Region {width}x{height} at ({left}, {top}) is off the screen")
+    clipped_left, clipped_top, clipped_width, clipped_height = clipped
+    pixels = grab_region_array(clipped_left, clipped_top, clipped_width, clipped_height)
+    return pixels, clipped_left - left, clipped_top - top
+
+
+def sample_tile(x, y, size=1):
+    """Capture a size x size tile centred on (x, y)"""
+    return Image.fromarray(np.ascontiguousarray(sample_tile_array(x, y, size)), 'RGB')
+
+
+def sample_tile_array(x, y, size=1, fill=OFF_SCREEN_COLOR):
+    """Capture a size x size tile centred on (x, y) as a (size, size, 3) RGB uint8 array.
+
+    Cells off the virtual screen are set to `fill`.
+    """
+    half = size // 2
+    try:
+        pixels, column, row = grab_on_screen(x - half, y - half, size, size)
+    except ValueError:
+        pixels, column, row = None, 0, 0
+    if pixels is not None and pixels.shape[:2] == (size, size):
+        return pixels
+    tile = np.empty((size, size, 3), dtype=np.uint8)
+    tile[...] = fill
+    if pixels is not None:
+        tile[row:row + pixels.shape[0], column:column + pixels.shape[1]] = pixels
+    return tile
+
+
+def sample_pixel(x, y):
+    """Return the (r, g, b) color of the screen pixel at (x, y); ValueError if it is off the screen"""
+    # A 1x1 grab is all we need for a single pixel
+    pixels, _, _ = grab_on_screen(x, y, 1, 1)
+    r, g, b = pixels[0, 0].tolist()
+    return r, g, b
+
+
+def average_color(tile, size=None, method='mean'):
+    """Reduce the centre size x size part of an RGB tile to one (r, g, b) color.
+
+    method is 'mean' or 'median'; both are computed per channel over the
+    whole array at once.
+    """
+    if size is not None and size < tile.shape[0]:
+        start = (tile.shape[0] - size) // 2
+        tile = tile[start:start + size, start:start + size]
+
+    pixels = tile.reshape(-1, 3)
+    if method == 'median':
+        values = np.median(pixels, axis=0)
+    else:
+        values = pixels.mean(axis=0)
+    return tuple(int(v) for v in np.rint(values))
+
+
+def sample_area(x, y, size=1, method='mean'):
+    """Return the mean or median (r, g, b) of the size x size area centred on (x, y).
+
+    Near an edge only the pixels on the screen count.
+    """
+    if size <= 1:
+        return sample_pixel(x, y)
+    half = size // 2
+    pixels, _, _ = grab_on_screen(x - half, y - half, size, size)
+    return average_color(pixels, method=method)
@@ -0,0 +1,288 @@
+"""Screen capture backends.
+
+Every backend grabs a rectangle of the virtual screen as a (height, width, 3)
+RGB uint8 array. Coordinates are virtual-screen coordinates, the same ones
+the mouse reports, so monitors left of or above the primary one have
+negative x or y. Backends that keep native handles keep one per thread,
+because neither mss nor Xlib handles may be shared between threads.
+
+    mss        mss (BitBlt on Windows, XGetImage/XShm on Linux, CoreGraphics on macOS)
+    x11        XGetImage through ctypes, Linux/X11 only
+    imagegrab  Pillow's ImageGrab; grabs the whole screen and crops
+    fake       an in-memory frame, for tests and benchmarks without a display
+"""
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+
+import numpy as np
+
+
+class CaptureBackend:
+    """Interface shared by all backends"""
+
+    name = None
+
+    def grab(self, left, top, width, height):
+        """Capture a rectangle as a (height, width, 3) RGB uint8 array"""
+        raise NotImplementedError
+
+    def screen_bounds(self):
+        """Return (left, top, width, height) of the whole virtual screen"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release native handles held by the calling thread"""
+
+
+class MssBackend(CaptureBackend):
+    name = 'mss'
+
+    def __init__(self):
+        import mss
+        self._mss = mss.mss
+        self._local = threading.local()
+        self._handle()  # Fail now rather than on the first pick if there is no display
+
+    def _handle(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = self._local.sct = self._mss()
+        return sct
+
+    def grab(self, left, top, width, height):
+        shot = self._handle().grab({'left': left, 'top': top, 'width': width, 'height': height})
+        # mss returns BGRA rows; view them as RGB without copying
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)[..., 2::-1]
+
+    def screen_bounds(self):
+        monitor = self._handle().monitors[0]
+        return monitor['left'], monitor['top'], monitor['width'], monitor['height']
+
+    def close(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
+
+
+class _XImage(ctypes.Structure):
+    # Leading fields of Xlib's XImage; only these are read
+    _fields_ = [
+        ('width', ctypes.c_int),
+        ('height', ctypes.c_int),
+        ('xoffset', ctypes.c_int),
+        ('format', ctypes.c_int),
+        ('data', ctypes.c_void_p),
+        ('byte_order', ctypes.c_int),
+        ('bitmap_unit', ctypes.c_int),
+        ('bitmap_bit_order', ctypes.c_int),
+        ('bitmap_pad', ctypes.c_int),
+        ('depth', ctypes.c_int),
+        ('bytes_per_line', ctypes.c_int),
+        ('bits_per_pixel', ctypes.c_int),
+    ]
+
+
+class _XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_int),
+        ('display', ctypes.c_void_p),
+        ('resourceid', ctypes.c_ulong),
+        ('serial', ctypes.c_ulong),
+        ('error_code', ctypes.c_ubyte),
+        ('request_code', ctypes.c_ubyte),
+        ('minor_code', ctypes.c_ubyte),
+    ]
+
+
+_XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(_XErrorEvent))
+
+# Xlib's default error handler exits the process, so errors on our own
+# displays are recorded here instead and reported by the call that caused
+# them. Errors on other displays (Tk's) go to the handler we replaced.
+_x_displays = set()
+_x_errors = {}
+_x_previous_handler = None
+
+
+@_XErrorHandler
+def _on_x_error(display, event):
+    if display in _x_displays:
+        _x_errors[display] = event.contents.error_code
+        return 0
+    if _x_previous_handler:
+        return _x_previous_handler(display, event)
+    return 0
+
+
+class X11Backend(CaptureBackend):
+    """XGetImage on the root window. X11 root coordinates start at (0, 0)."""
+
+    name = 'x11'
+    ALL_PLANES = 0xFFFFFFFF
+    Z_PIXMAP = 2
+
+    def __init__(self):
+        if not sys.platform.startswith('linux') or not os.getenv('DISPLAY'):
+            raise OSError("X11 capture needs Linux with a DISPLAY")
+        path = ctypes.util.find_library('X11')
+        if path is None:
+            raise OSError("libX11 not found")
+
+        xlib = ctypes.cdll.LoadLibrary(path)
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        xlib.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        xlib.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xlib.XGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+                                   ctypes.c_uint, ctypes.c_uint, ctypes.c_ulong, ctypes.c_int]
+        xlib.XGetImage.restype = ctypes.POINTER(_XImage)
+        xlib.XDestroyImage.argtypes = [ctypes.POINTER(_XImage)]
+        xlib.XSetErrorHandler.argtypes = [_XErrorHandler]
+        xlib.XSetErrorHandler.restype = _XErrorHandler
+        self._xlib = xlib
+        self._local = threading.local()
+
+        global _x_previous_handler
+        if _x_previous_handler is None:
+            _x_previous_handler = xlib.XSetErrorHandler(_on_x_error)
+        self._display()
+
+    def _display(self):
+        display = getattr(self._local, 'display', None)
+        if display is None:
+            display = self._xlib.XOpenDisplay(None)
+            if not display:
+                raise OSError("Could not open the X display")
+            self._local.display = display
+            self._local.root = self._xlib.XDefaultRootWindow(display)
+            _x_displays.add(display)
+        return display
+
+    def grab(self, left, top, width, height):
+        display = self._display()
+        # XGetImage fails with BadMatch for any part outside the root window
+        _, _, screen_width, screen_height = self.screen_bounds()
+        if left < 0 or top < 0 or width < 1 or height < 1 \
+                or left + width > screen_width or top + height > screen_height:
+            raise ValueError(f"{width}x{height} at ({left}, {top}) is outside the "
+                             f"{screen_width}x{screen_height} screen")
+
+        _x_errors.pop(display, None)
+        image = self._xlib.XGetImage(display, self._local.root, left, top, width, height,
+                                     self.ALL_PLANES, self.Z_PIXMAP)
+        if not image:
+            # Set by _on_x_error when the server refused, e.g. after a resolution change
+            error = _x_errors.pop(display, None)
+            reason = f" (X error {error})" if error is not None else ""
+            raise ValueError(f"XGetImage failed for {width}x{height} at ({left}, {top}){reason}")
+        try:
+            ximage = image.contents
+            if ximage.bits_per_pixel != 32:
+                raise OSError(f"Unsupported X visual: {ximage.bits_per_pixel} bits per pixel")
+            stride = ximage.bytes_per_line
+            data = ctypes.string_at(ximage.data, stride * height)
+        finally:
+            self._xlib.XDestroyImage(image)
+        # 32-bit ZPixmap rows are BGRX on little-endian servers
+        return np.frombuffer(data, dtype=np.uint8).reshape(height, stride // 4, 4)[:, :width, 2::-1]
+
+    def screen_bounds(self):
+        display = self._display()
+        screen = self._xlib.XDefaultScreen(display)
+        return 0, 0, self._xlib.XDisplayWidth(display, screen), self._xlib.XDisplayHeight(display, screen)
+
+    def close(self):
+        display = getattr(self._local, 'display', None)
+        if display is not None:
+            self._xlib.XCloseDisplay(display)
+            _x_displays.discard(display)
+            _x_errors.pop(display, None)
+            self._local.display = None
+
+
+class ImageGrabBackend(CaptureBackend):
+    """Pillow's ImageGrab. Slow for small regions: it captures everything and crops."""
+
+    name = 'imagegrab'
+
+    def __init__(self):
+        from PIL import ImageGrab
+        self._image_grab = ImageGrab
+        self._bounds = None
+        self.screen_bounds()
+
+    def grab(self, left, top, width, height):
+        # With all_screens, Windows bboxes are virtual-screen coordinates like ours
+        image = self._image_grab.grab(bbox=(left, top, left + width, top + height), all_screens=True)
+        if image.size != (width, height):
+            raise ValueError(f"Region {width}x{height} at ({left}, {top}) is off the screen")
+        return np.asarray(image.convert('RGB'))
+
+    def screen_bounds(self):
+        if self._bounds is None:
+            if sys.platform == 'win32':
+                # SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN
+                metrics = ctypes.windll.user32.GetSystemMetrics
+                self._bounds = (metrics(76), metrics(77), metrics(78), metrics(79))
+            else:
+                width, height = self._image_grab.grab().size
+                self._bounds = (0, 0, width, height)
+        return self._bounds
+
+
+class FakeBackend(CaptureBackend):
+    """Serve captures from an in-memory RGB frame placed at `origin`.
+
+    The default frame is two 1920x1080 monitors side by side, the left one
+    at negative x, filled with a pattern that encodes each pixel's own
+    coordinates (see `expected_color`), so tests can check that the right
+    pixels come back.
+    """
+
+    name = 'fake'
+
+    def __init__(self, frame=None, origin=(-1920, 0)):
+        if frame is None:
+            frame = self.pattern(3840, 1080, origin)
+        self.frame = frame
+        self.origin = origin
+
+    @staticmethod
+    def expected_color(x, y):
+        """Color of the default pattern at virtual-screen point (x, y)"""
+        return x & 255, y & 255, ((x >> 8) & 15) << 4 | ((y >> 8) & 15)
+
+    @classmethod
+    def pattern(cls, width, height, origin):
+        ys, xs = np.mgrid[origin[1]:origin[1] + height, origin[0]:origin[0] + width]
+        return np.stack(cls.expected_color(xs, ys), axis=-1).astype(np.uint8)
+
+    def grab(self, left, top, width, height):
+        x = left - self.origin[0]
+        y = top - self.origin[1]
+        if x < 0 or y < 0 or x + width > self.frame.shape[1] or y + height > self.frame.shape[0]:
+            raise ValueError(f"Region {width}x{height} at ({left}, {top}) is off the screen")
+        return self.frame[y:y + height, x:x + width]
+
+    def screen_bounds(self):
+        return self.origin[0], self.origin[1], self.frame.shape[1], self.frame.shape[0]
+
+
+# Backends by config name, in the order auto-selection tries them
+BACKENDS = {
+    'mss': MssBackend,
+    'x11': X11Backend,
+    'imagegrab': ImageGrabBackend,
+    'fake': FakeBackend,
+}
+
+# Never picked automatically; it does not show the real screen
+AUTO_EXCLUDED = {'fake'}
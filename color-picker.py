@@ -1,39 +1,26 @@
+import time
+
+# Taken before anything else is imported so startup timings include imports
+STARTUP_STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox, filedialog
-import pyautogui
-import keyboard  # This is the keyboard module for global hotkeys
-import pyperclip
 import os
 import json
-import shutil
-from pynput import mouse
-from pynput.keyboard import Key, Listener as KeyboardListener  # This is the pynput keyboard listener
-
-def get_data_directory():
-    """Get the directory to store application data."""
-    # Check for a config file first
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
-
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                if 'data_dir' in config and os.path.exists(config['data_dir']):
-                    return config['data_dir']
-        except Exception as e:
-            print(f"Error reading config: {e}")
-
-    # Use AppData on Windows as fallback
-    appdata = os.getenv('APPDATA')
-    if appdata:
-        data_dir = os.path.join(appdata, "ColorPickerTool")
-    else:
-        # Fallback to user's home directory
-        data_dir = os.path.join(os.path.expanduser("~"), ".colorpickertool")
-
-    # Create directory if it doesn't exist
-    os.makedirs(data_dir, exist_ok=True)
-    return data_dir
+import multiprocessing
+import sys
+import threading
+# Capture (capture, magnifier), clipboard (pyperclip) and input (keyboard, pynput)
+# backends are heavy to import, so they are imported where first used,
+# after the window has painted
+from preview import PickerState, PreviewScheduler
+from config import config, get_data_directory
+from diagnostics import probe
+from colors import hex_to_rgb, rgb_to_hex, is_dark
+from color_index import NearestColorIndex
+from favorites import LOCK_TIMEOUT, FavoritesModel, FavoritesStore, FavoritesWriter, normalize_hex
+from favorites_view import FavoritesView
+from favorites_search import FavoritesSearch
 
 class ColorPickerApp:
     def __init__(self, root):
@@ -46,8 +33,51 @@ class ColorPickerApp:
         # Create a string variable for status
         self.status_var = tk.StringVar(value="Ready")
 
-        # Favorites storage
-        self.favorites = []
+        # Live preview updates per second while picking
+        self.preview_rate = config['preview_rate']
+
+        # Global hotkey that activates the picker
+        self.hotkey = config['hotkey']
+
+        # Magnifier (zoomed loupe) preview options
+        self.magnifier_enabled = tk.BooleanVar(value=config['magnifier'])
+        self.magnifier_grid_size = config['magnifier_grid_size']
+        self.magnifier_zoom = config['magnifier_zoom']
+
+        # Area sampling: side of the square averaged around the cursor and how
+        # it is reduced. Plain attributes because the SHIFT pick reads them
+        # from the keyboard listener thread.
+        self.sample_size = config['sample_size']
+        self.sample_method = config['sample_method']
+        self.sample_size_var = tk.IntVar(value=self.sample_size)
+        self.sample_method_var = tk.StringVar(value=self.sample_method)
+
+        # Continuous recording (samples per second, samples kept in memory)
+        self.record_rate = config['record_rate']
+        self.record_buffer = config['record_buffer']
+        self.recorder = None
+
+        # Screen capture backend ('auto' calibrates and takes the fastest)
+        self.capture_backend_var = tk.StringVar(value=config['capture_backend'])
+
+        # Pipeline timing hooks, shown in Settings > Diagnostics
+        probe.enabled = config['diagnostics']
+        self.diagnostics_window = None
+        self.hotkey_event_at = None  # Probe timestamps, None while the probe is off
+        self.move_event_at = None
+        self.last_frame_at = None
+
+        # Local pixel-query service for test automation
+        self.server_enabled = tk.BooleanVar(value=config['server_enabled'])
+        self.pixel_server = None
+
+        # Favorites storage, plus an index of their colors for the closest-favorite preview
+        self.favorites = FavoritesModel()
+        self.favorite_index = NearestColorIndex()
+        self.favorites_search = FavoritesSearch(self.favorites, self.favorite_index)
+        self.search_build_generation = None  # Generation of the index build running in the background
+        self.favorites_writer = None  # Background writer, created by load_favorites
+        self.favorites_read_only = False  # Set when the favorites cannot be saved safely
         self.load_favorites()  # Load favorites from file if exists
 
         # Try to set icon only if file exists
@@ -61,11 +91,60 @@ class ColorPickerApp:
 
         # Add settings option to menu
         menubar = tk.Menu(root)
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Open Image...", command=self.open_image)
+        menubar.add_cascade(label="File", menu=file_menu)
         settings_menu = tk.Menu(menubar, tearoff=0)
         settings_menu.add_command(label="Set Favorites Directory", command=self.set_data_directory)
+        settings_menu.add_separator()
+        settings_menu.add_checkbutton(label="Magnifier Preview", variable=self.magnifier_enabled,
+                                      command=lambda: config.update(magnifier=self.magnifier_enabled.get()))
+        settings_menu.add_command(label="Magnifier Settings...", command=self.set_magnifier_options)
+        settings_menu.add_separator()
+
+        # Area sampling options
+        sample_menu = tk.Menu(settings_menu, tearoff=0)
+        for size in (1, 3, 5, 11):
+            sample_menu.add_radiobutton(label="1 pixel" if size == 1 else f"{size}x{size} area",
+                                        variable=self.sample_size_var, value=size,
+                                        command=self.update_sample_options)
+        sample_menu.add_command(label="Custom...", command=self.set_custom_sample_size)
+        sample_menu.add_separator()
+        sample_menu.add_radiobutton(label="Mean", variable=self.sample_method_var, value='mean',
+                                    command=self.update_sample_options)
+        sample_menu.add_radiobutton(label="Median", variable=self.sample_method_var, value='median',
+                                    command=self.update_sample_options)
+        settings_menu.add_cascade(label="Sample Size", menu=sample_menu)
+        capture_menu = tk.Menu(settings_menu, tearoff=0)
+        capture_menu.add_radiobutton(label="Automatic (fastest)", variable=self.capture_backend_var, value='auto',
+                                     command=self.set_capture_backend)
+        capture_menu.add_separator()
+        for name, label in (('mss', "MSS"), ('x11', "X11 XGetImage"), ('imagegrab', "Pillow ImageGrab")):
+            capture_menu.add_radiobutton(label=label, variable=self.capture_backend_var, value=name,
+                                         command=self.set_capture_backend)
+        settings_menu.add_cascade(label="Capture Backend", menu=capture_menu)
+        settings_menu.add_separator()
+        settings_menu.add_checkbutton(label="Pixel Query Server", variable=self.server_enabled,
+                                      command=self.toggle_pixel_server)
+        settings_menu.add_command(label="Diagnostics...", command=self.show_diagnostics)
         menubar.add_cascade(label="Settings", menu=settings_menu)
+
+        favorites_menu = tk.Menu(menubar, tearoff=0)
+        favorites_menu.add_command(label="Import Palette...", command=self.import_palette)
+        favorites_menu.add_command(label="Export Palette...", command=self.export_palette)
+        favorites_menu.add_separator()
+        favorites_menu.add_command(label="Contrast Report...", command=self.show_contrast_report)
+        menubar.add_cascade(label="Favorites", menu=favorites_menu)
+        record_menu = tk.Menu(menubar, tearoff=0)
+        record_menu.add_command(label="Record Under Cursor...", command=lambda: self.start_recording(follow=True))
+        record_menu.add_command(label="Record at Point...", command=lambda: self.start_recording(follow=False))
+        record_menu.add_command(label="Stop Recording", command=self.stop_recording)
+        menubar.add_cascade(label="Record", menu=record_menu)
         root.config(menu=menubar)
 
+        # Write out pending favorites before the window goes away
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Create style
         style = ttk.Style()
         style.configure("TFrame", background="#f0f0f0")
@@ -104,7 +183,7 @@ class ColorPickerApp:
 
         # Instructions - Using tk.Label for better centering
         self.instructions = tk.Label(title_container,
-                                     text="F2 to activate color picker.\nPosition cursor and press SHIFT to select color.",
+                                     text=f"{self.hotkey.upper()} to activate color picker.\nPosition cursor and press SHIFT to select color.",
                                      font=("Arial", 12), bg="#f0f0f0")
         self.instructions.pack(pady=(0, 10), fill=tk.X)
 
@@ -125,6 +204,14 @@ class ColorPickerApp:
         # Fixed padding for the entry field
         self.hex_entry.pack(padx=5, pady=5)
 
+        # Nearest named color, kept in step with the hex code
+        self.color_name_var = tk.StringVar()
+        self.color_name_label = tk.Label(self.left_frame, textvariable=self.color_name_var,
+                                         font=("Arial", 10), bg="#f0f0f0")
+        self.color_name_label.pack(pady=(0, 10))
+        self.hex_var.trace_add("write", self.show_color_name)
+        self.show_color_name()
+
         # Buttons frame
         button_frame = ttk.Frame(self.left_frame)
         button_frame.pack(pady=(0, 10), fill=tk.X)
@@ -167,6 +254,17 @@ class ColorPickerApp:
                                               font=("Arial", 12), bg="#f0f0f0")
         self.favorites_instructions.pack(pady=(0, 10), fill=tk.X)
 
+        # Filter box: label text, #hex prefix, or ~#RRGGBB [delta E]
+        filter_frame = ttk.Frame(self.right_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_var = tk.StringVar()
+        self.filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var)
+        self.filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.filter_entry.bind("<FocusIn>", self.prepare_favorites_search)
+        self.filter_entry.bind("<Escape>", lambda event: self.filter_var.set(""))
+        self.filter_var.trace_add("write", self.apply_favorites_filter)
+
         # Frame for favorites list
         self.favorites_frame = ttk.Frame(self.right_frame)
         self.favorites_frame.pack(fill=tk.BOTH, expand=True)
@@ -195,6 +293,12 @@ class ColorPickerApp:
         # Configure row height to allow for text wrapping
         self.favorites_list.configure(height=10)  # Adjust visible rows
 
+        # Set row height to accommodate wrapped text - using style instead of direct configuration
+        style.configure('Treeview', rowheight=40)
+
+        # Applies single-row changes to the Treeview as favorites change
+        self.favorites_view = FavoritesView(self.favorites_list)
+
         # Bind double-click to load color
         self.favorites_list.bind("<Double-1>", self.load_selected_color)
         # Bind right-click to show context menu
@@ -214,12 +318,64 @@ class ColorPickerApp:
                                     command=self.edit_favorite_label)
         self.edit_button.pack(side=tk.RIGHT, padx=(5, 0), fill=tk.X, expand=True)
 
-        # Register the hotkey
-        keyboard.add_hotkey('f2', self.pick_color)
+        # Picker state; the preview window and input listeners are built once
+        # the window has painted (see finish_startup)
+        self.picker_state = PickerState()
+        self.activation_started = None
+        self.activation_latency_ms = None
+        self.awaiting_first_preview = False
+        self.startup_times = {}
+
+        # Region selection: corner where CTRL went down during a pick, and the results window
+        self.region_top_colors = config['region_top_colors']
+        self.region_bits = config['region_bits']
+        self.region_anchor = None
+        self.region_window = None
+
+        self.contrast_window = None  # Favorites > Contrast Report, built on first use
+        self.image_window = None  # File > Open Image, built on first use
 
         # Populate favorites list
         self.refresh_favorites_list()
 
+        # Let the window paint first, then load the input backends
+        self.root.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        """Build the preview and register input hooks after the first paint"""
+        self.root.update_idletasks()
+        self.startup_times['first_paint_ms'] = (time.perf_counter() - STARTUP_STARTED) * 1000.0
+
+        # Build the preview window and input listeners once; the hotkey only arms them
+        self.create_preview_window()
+        self.start_input_listeners()
+
+        # Register the hotkey (stays registered for the whole session)
+        import keyboard  # Global hotkeys
+        keyboard.add_hotkey(self.hotkey, self.on_pick_hotkey)
+
+        if self.server_enabled.get():
+            self.toggle_pixel_server()
+
+        # Pick (and with 'auto', calibrate) the capture backend now rather than on the first pick
+        import capture
+
+        def calibrate():
+            try:
+                capture.backend()
+            finally:
+                capture.release_thread()
+
+        threading.Thread(target=calibrate, name="capture-calibration", daemon=True).start()
+        self.startup_times['hotkey_ready_ms'] = (time.perf_counter() - STARTUP_STARTED) * 1000.0
+
+        # Benchmarks ask for the timings through the environment, then quit
+        report_path = os.getenv('COLOR_PICKER_STARTUP_REPORT')
+        if report_path:
+            with open(report_path, 'w') as f:
+                json.dump(self.startup_times, f)
+            self.root.after(0, self.on_close)
+
     def set_data_directory(self):
         """Allow user to set custom data directory"""
         # Get initial directory
@@ -238,263 +394,998 @@ class ColorPickerApp:
         # Confirm with user
         if messagebox.askyesno(
             "Confirm Directory Change",
-            f"Set data directory to:\n{new_dir}\n\nExisting favorites will be moved to the new location."
+            f"Set data directory to:\n{new_dir}\n\nExisting favorites will be copied to the new location. "
+            "Favorites already there are kept, and their files are backed up first."
         ):
-            try:
-                # Create config file
-                config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
-                config = {'data_dir': new_dir}
+            old_store = self.favorites_store
 
+            # The new directory may be on a slow network share, so do the file
+            # work on the writer thread (after any pending saves)
+            def move_favorites():
                 # Create the new directory if it doesn't exist
                 os.makedirs(new_dir, exist_ok=True)
 
-                # Save config
-                with open(config_path, 'w') as f:
-                    json.dump(config, f, indent=2)
+                # Copy existing favorites (snapshot and journal) if they exist, merging
+                # with any already there; a failure leaves the old directory in use
+                if os.path.abspath(current_dir) != os.path.abspath(new_dir):
+                    old_store.copy_to(new_dir)
 
-                # Try to move existing favorites if they exist
-                old_favorites = os.path.join(current_dir, 'favorites.json')
-                new_favorites = os.path.join(new_dir, 'favorites.json')
+                # Save config (this also refreshes the cached data directory)
+                config.update(data_dir=new_dir)
 
-                if os.path.exists(old_favorites) and old_favorites != new_favorites:
-                    shutil.copy2(old_favorites, new_favorites)
+            def moved(error, result):
+                self.root.after(0, self.finish_data_directory_change, new_dir, error)
 
-                # Reload favorites from new location
-                self.load_favorites()
+            self.status_var.set(f"Moving favorites to {new_dir}...")
+            self.favorites_writer.call(move_favorites, moved)
 
-                # Update status
-                self.status_var.set(f"Data directory changed to {new_dir}")
+    def finish_data_directory_change(self, new_dir, error):
+        """Reload favorites once they have been moved to the new data directory"""
+        if error is not None:
+            messagebox.showerror("Error", f"Could not set data directory: {error}")
+            return
 
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not set data directory: {e}")
-                return
+        # Reload favorites from new location
+        self.load_favorites()
+        self.refresh_favorites_list()
 
-    def is_dark_color(self, hex_color):
-        """Determine if a color is dark (needing white text) or light (needing black text)"""
-        # Remove the # symbol if present
-        hex_color = hex_color.lstrip('#')
+        # Update status
+        self.status_var.set(f"Data directory changed to {new_dir}")
+
+    def set_magnifier_options(self):
+        """Ask for the magnifier grid size and zoom factor"""
+        grid_size = simpledialog.askinteger("Magnifier Settings",
+                                            "Pixels across the magnifier (odd number):",
+                                            initialvalue=self.magnifier_grid_size,
+                                            minvalue=3, maxvalue=63,
+                                            parent=self.root)
+        if grid_size is None:
+            return
 
-        # Convert hex to RGB
-        r = int(hex_color[0:2], 16) / 255.0
-        g = int(hex_color[2:4], 16) / 255.0
-        b = int(hex_color[4:6], 16) / 255.0
+        zoom = simpledialog.askinteger("Magnifier Settings",
+                                       "Zoom factor:",
+                                       initialvalue=self.magnifier_zoom,
+                                       minvalue=2, maxvalue=32,
+                                       parent=self.root)
+        if zoom is None:
+            return
 
-        # Calculate brightness using perceived luminance formula
-        # This formula takes into account human perception of different colors
-        brightness = (0.299 * r + 0.587 * g + 0.114 * b)
+        self.magnifier_grid_size = grid_size
+        self.magnifier_zoom = zoom
+        config.update(magnifier_grid_size=grid_size, magnifier_zoom=zoom)
 
-        # Return True if the color is dark (needing white text)
-        return brightness < 0.5
+        # Rebuild the loupe buffers for the new size
+        from magnifier import Magnifier
+        self.magnifier = Magnifier(self.preview, self.magnifier_grid_size, self.magnifier_zoom)
+        self.loupe_label.config(image=self.magnifier.photo)
+        self.status_var.set(f"Magnifier set to {self.magnifier.grid_size}x{self.magnifier.grid_size} at {zoom}x zoom")
 
-    def pick_color(self):
-        # Show a message that color picker is active
-        self.status_var.set("Color picker activated - press SHIFT to pick a color without clicking")
+    def set_capture_backend(self):
+        """Switch capture backends from the Settings menu, calibrating off the Tk thread"""
+        name = self.capture_backend_var.get()
+        config.update(capture_backend=name)
+        self.status_var.set("Selecting capture backend...")
+
+        def choose():
+            import capture
+            try:
+                chosen = capture.set_backend(name).name
+            except OSError as e:
+                chosen = e
+            finally:
+                capture.release_thread()
+            try:
+                self.root.after(0, self.show_capture_backend, chosen)
+            except (RuntimeError, tk.TclError):
+                pass  # The window is closing
+
+        threading.Thread(target=choose, name="capture-calibration", daemon=True).start()
+
+    def show_capture_backend(self, chosen):
+        if isinstance(chosen, Exception):
+            self.status_var.set(f"No capture backend available: {chosen}")
+        else:
+            self.status_var.set(f"Capturing with {chosen}")
+
+    def show_diagnostics(self):
+        if self.diagnostics_window is None:
+            from diagnostics_view import DiagnosticsWindow
+            self.diagnostics_window = DiagnosticsWindow(self.root, self.set_diagnostics_enabled,
+                                                        self.diagnostics_extra)
+        self.diagnostics_window.show()
+
+    def set_diagnostics_enabled(self, enabled):
+        probe.enabled = enabled
+        config.update(diagnostics=enabled)
+
+    def diagnostics_extra(self):
+        """Context saved alongside the stage timings"""
+        import capture
+        active = capture.active_backend()
+        return {
+            "capture_backend": active.name if active is not None else None,
+            "capture_calibration_ms": dict(capture.calibration),
+            "startup": dict(self.startup_times),
+            "last_activation_ms": self.activation_latency_ms,
+            "preview_rate": self.preview_rate,
+        }
+
+    def update_sample_options(self):
+        """Copy the sample menu choices into the attributes the picker reads"""
+        self.sample_size = self.sample_size_var.get()
+        self.sample_method = self.sample_method_var.get()
+        config.update(sample_size=self.sample_size, sample_method=self.sample_method)
+        if self.sample_size == 1:
+            self.status_var.set("Sampling a single pixel")
+        else:
+            self.status_var.set(f"Sampling the {self.sample_method} of a {self.sample_size}x{self.sample_size} area")
+
+    def set_custom_sample_size(self):
+        """Ask for a custom sample area size"""
+        size = simpledialog.askinteger("Sample Size",
+                                       "Pixels across the sampled area (odd number):",
+                                       initialvalue=self.sample_size,
+                                       minvalue=1, maxvalue=101,
+                                       parent=self.root)
+        if size is None:
+            return
 
-        # Disable the F2 hotkey temporarily to avoid multiple activations
-        keyboard.unhook_all()
+        # Keep the cursor pixel in the middle of the area
+        if size % 2 == 0:
+            size += 1
+        self.sample_size_var.set(size)
+        self.update_sample_options()
 
-        # Create a small preview window that will follow the cursor
-        preview = tk.Toplevel(self.root)
-        preview.overrideredirect(True)  # Remove window decorations
-        preview.attributes('-topmost', True)  # Keep on top of other windows
+    def sample_color(self, x, y):
+        """Sample the screen at (x, y) using the current sample size and method"""
+        import capture  # Region-limited screen sampling
+        return capture.sample_area(x, y, self.sample_size, self.sample_method)
+
+    def is_dark_color(self, hex_color):
+        """Determine if a color is dark (needing white text) or light (needing black text)"""
+        return is_dark(hex_to_rgb(hex_color))
+
+    def create_preview_window(self):
+        """Build the cursor-following preview once; each pick only shows and hides it"""
+        self.preview = tk.Toplevel(self.root)
+        self.preview.overrideredirect(True)  # Remove window decorations
+        self.preview.attributes('-topmost', True)  # Keep on top of other windows
+        self.preview.withdraw()  # Hidden until a pick is armed
 
         # Create a frame to show the color
-        color_preview = tk.Frame(preview, width=60, height=30, bg="#FFFFFF")
-        color_preview.pack(side=tk.TOP, pady=2, padx=2)
+        self.color_preview = tk.Frame(self.preview, width=60, height=30, bg="#FFFFFF")
+
+        # Zoomed loupe, shown instead of the flat swatch in magnifier mode
+        from magnifier import Magnifier
+        self.magnifier = Magnifier(self.preview, self.magnifier_grid_size, self.magnifier_zoom)
+        self.loupe_label = tk.Label(self.preview, image=self.magnifier.photo, bd=0)
 
         # Label to show hex code
-        hex_label = tk.Label(preview, text="#FFFFFF", bg="#F0F0F0", font=("Arial", 9))
-        hex_label.pack(side=tk.BOTTOM, pady=2, padx=2, fill=tk.X)
+        self.preview_hex_label = tk.Label(self.preview, text="#FFFFFF", bg="#F0F0F0", font=("Arial", 9))
+        self.preview_hex_label.pack(side=tk.BOTTOM, pady=2, padx=2, fill=tk.X)
 
-        # Position window near cursor but not directly under it
-        preview.geometry(f"80x50+{pyautogui.position()[0]+20}+{pyautogui.position()[1]-60}")
+        # Label to show the nearest named color
+        self.preview_name_label = tk.Label(self.preview, text="", bg="#F0F0F0", font=("Arial", 8))
 
-        # This flag tracks if we're exiting the listener
-        self.picking_active = True
+        # Label to show the closest saved favorite
+        self.preview_match_label = tk.Label(self.preview, text="", bg="#F0F0F0", font=("Arial", 8))
+        self.preview_size = (80, 50)
 
-        # Function to handle key press
-        def on_key_release(key):
-            try:
-                # Check if shift was pressed
-                if key == Key.shift and self.picking_active:
-                    self.picking_active = False
-
-                    # Get the current mouse position
-                    x, y = pyautogui.position()
-
-                    # Get the pixel color at position
-                    pixel_color = pyautogui.screenshot().getpixel((x, y))
-
-                    # Convert RGB to hex
-                    hex_color = '#{:02x}{:02x}{:02x}'.format(pixel_color[0], pixel_color[1], pixel_color[2])
-
-                    # Update the UI (need to schedule this for when window returns)
-                    def update_ui():
-                        self.color_frame.config(bg=hex_color)
-                        self.hex_var.set(hex_color.upper())
-                        self.status_var.set(f"Picked color at ({x}, {y})")
-                        # Re-register the F2 hotkey
-                        keyboard.add_hotkey('f2', self.pick_color)
-                        # Destroy the preview window
-                        preview.destroy()
-
-                    # Restore the window, bring to foreground, and update UI
-                    def restore_window():
-                        self.root.deiconify()
-                        self.root.lift()
-                        self.root.focus_force()  # Force focus to the window
-                        self.root.attributes('-topmost', True)  # Place window on top
-                        self.root.update()
-                        self.root.attributes('-topmost', False)  # Allow window to go behind others when user clicks elsewhere
-
-                    self.root.after(100, restore_window)
-                    self.root.after(200, update_ui)
-
-                    # Stop listening
-                    return False
-            except AttributeError:
-                # Handle case where key doesn't have the expected attributes
-                pass
+        # Redraws the preview from the Tk loop at most once per frame
+        self.preview_scheduler = PreviewScheduler(self.root, self.render_preview, rate=self.preview_rate)
 
-            # Check for Escape key to cancel
-            if key == Key.esc and self.picking_active:
-                self.picking_active = False
-                preview.destroy()
+        # The same preview over File > Open Image, fed by Tk pointer events instead of the listeners
+        self.image_preview_scheduler = PreviewScheduler(self.root, self.render_image_preview, rate=self.preview_rate)
+        self.image_preview_shown = False
 
-                def restore_on_cancel():
-                    self.root.deiconify()
-                    self.status_var.set("Color picking cancelled")
-                    # Re-register the F2 hotkey
-                    keyboard.add_hotkey('f2', self.pick_color)
+    def start_input_listeners(self):
+        """Start the keyboard and mouse listeners once; they stay idle until a pick is armed"""
+        from pynput import mouse
+        from pynput.keyboard import Key, Listener as KeyboardListener  # This is the pynput keyboard listener
 
-                self.root.after(100, restore_on_cancel)
-                return False
+        # Keys that finish and cancel a pick, and the one held to drag out a region
+        self.pick_key = Key.shift
+        self.cancel_key = Key.esc
+        self.region_keys = {Key.ctrl, Key.ctrl_l, Key.ctrl_r}
 
-            return True
+        # Reads the cursor position when a pick starts and ends
+        self.mouse_controller = mouse.Controller()
 
-        # Also handle mouse movement to show color preview in status bar
-        def on_mouse_move(x, y):
-            if not self.picking_active:
-                return False
+        self.key_listener = KeyboardListener(on_press=self.on_key_press, on_release=self.on_key_release)
+        self.key_listener.start()
 
-            try:
-                # Move the preview window to follow cursor
-                preview.geometry(f"80x50+{x+20}+{y-60}")
+        self.mouse_listener = mouse.Listener(on_move=self.on_mouse_move)
+        self.mouse_listener.start()
 
-                # Get color under cursor
-                pixel_color = pyautogui.screenshot().getpixel((x, y))
-                hex_color = '#{:02x}{:02x}{:02x}'.format(pixel_color[0], pixel_color[1], pixel_color[2])
+    def on_pick_hotkey(self):
+        # Runs on the keyboard hook thread, so hand activation over to the Tk loop
+        self.activation_started = time.perf_counter()
+        self.hotkey_event_at = probe.start()
+        self.root.after(0, self.pick_color)
 
-                # Update preview
-                color_preview.config(bg=hex_color)
-                hex_label.config(text=hex_color.upper())
-            except:
-                pass
-            return True
+    def pick_color(self):
+        # How long the hotkey waited for the Tk loop
+        probe.stop('hotkey_dispatch', self.hotkey_event_at)
+        self.hotkey_event_at = None
 
-        # Start listeners
-        key_listener = KeyboardListener(on_release=on_key_release)
-        key_listener.start()
+        # Arm the picker; ignore repeated F2 presses while a pick is in progress
+        if not self.picker_state.transition(PickerState.IDLE, PickerState.PICKING):
+            return
 
-        mouse_listener = mouse.Listener(on_move=on_mouse_move)
-        mouse_listener.start()
+        # A screen pick takes the preview over from the Open Image window
+        self.hide_image_preview()
+
+        # Show a message that color picker is active
+        self.status_var.set("Color picker activated - press SHIFT to pick a color, hold CTRL and move to select a region")
+        self.region_anchor = None
+
+        # Position window near cursor but not directly under it and draw the first frame right away
+        x, y = self.mouse_controller.position
+        self.awaiting_first_preview = True
+        self.move_event_at = None
+        self.last_frame_at = None
+        self.layout_preview()
+        self.preview.deiconify()
+        self.preview_scheduler.submit(x, y)
+        self.preview_scheduler.start()
 
         # Minimize the main window
         self.root.iconify()
 
+    def layout_preview(self):
+        # Show either the zoomed loupe or the flat swatch, sized to fit
+        self.color_preview.pack_forget()
+        self.loupe_label.pack_forget()
+        self.preview_name_label.pack_forget()
+        self.preview_match_label.pack_forget()
+
+        if self.magnifier_enabled.get():
+            self.loupe_label.pack(side=tk.TOP, pady=2, padx=2)
+            width, height = self.magnifier.size + 4, self.magnifier.size + 26
+        else:
+            self.color_preview.pack(side=tk.TOP, pady=2, padx=2)
+            width, height = 80, 50
+
+        # The color name sits just above the hex code
+        self.preview_name_label.pack(side=tk.BOTTOM, padx=2, fill=tk.X)
+        width, height = max(width, 150), height + 16
+
+        # Room for the closest favorite line when there are favorites to match
+        if len(self.favorite_index):
+            self.preview_match_label.pack(side=tk.BOTTOM, padx=2, fill=tk.X)
+            width, height = max(width, 170), height + 18
+        self.preview_size = (width, height)
+
+    def render_preview(self, x, y):
+        started = probe.start()
+        if started is not None:
+            if self.last_frame_at is not None:
+                probe.record('preview_frame_interval', (started - self.last_frame_at) * 1000.0)
+            self.last_frame_at = started
+
+        if self.magnifier_enabled.get():
+            # One capture of the whole grid; the centre pixel is the picked color
+            pixel_color = self.magnifier.render(x, y)
+
+            # Reuse the loupe's capture for the sample area when it fits and is all on the screen
+            if self.sample_size > 1:
+                if self.sample_size <= self.magnifier.grid_size and self.magnifier.complete:
+                    import capture
+                    pixel_color = capture.average_color(self.magnifier.tile, self.sample_size, self.sample_method)
+                else:
+                    pixel_color = self.sample_color(x, y)
+        else:
+            # Get color under cursor without grabbing the whole desktop
+            pixel_color = self.sample_color(x, y)
+        self.show_preview_color(x, y, pixel_color)
+
+        # Record how long it took from pressing F2 to the first preview frame
+        if self.awaiting_first_preview:
+            self.awaiting_first_preview = False
+            if self.activation_started is not None:
+                self.activation_latency_ms = (time.perf_counter() - self.activation_started) * 1000.0
+                if probe.enabled:
+                    # Idle callbacks run after the redraws queued above, so this is paint time
+                    self.root.after_idle(probe.stop, 'activation_to_paint', self.activation_started)
+                self.activation_started = None
+
+        probe.stop('preview_render', started)
+        if started is not None and self.move_event_at is not None:
+            self.root.after_idle(probe.stop, 'move_to_paint', self.move_event_at)
+            self.move_event_at = None
+
+    def show_preview_color(self, x, y, pixel_color):
+        """Move the preview next to the cursor at (x, y) and show a sampled color"""
+        # Follow the cursor, just above it
+        width, height = self.preview_size
+        self.preview.geometry(f"{width}x{height}+{x+20}+{y-height-10}")
+        hex_color = rgb_to_hex(pixel_color)
+
+        # Update preview; while a region is being dragged show its size instead
+        self.color_preview.config(bg=hex_color)
+        anchor = self.region_anchor
+        if anchor is None:
+            self.preview_hex_label.config(text=hex_color.upper())
+            from color_names import describe
+            self.preview_name_label.config(text=describe(pixel_color))
+        else:
+            from region import region_bounds
+            _, _, width, height = region_bounds(anchor, (x, y))
+            self.preview_hex_label.config(text=f"{width} x {height}")
+
+        # Show the perceptually closest favorite and how far away it is
+        match = self.favorite_index.nearest(pixel_color)
+        if match is not None:
+            favorite, distance = match
+            label = favorite["label"] if len(favorite["label"]) <= 18 else favorite["label"][:17] + "\u2026"
+            self.preview_match_label.config(text=f"\u2248 {label} (\u0394E {distance:.1f})")
+
+    def open_image(self):
+        # Pick from an image file, however large, rather than the screen
+        if self.image_window is None:
+            from image_view import ImageWindow
+            self.image_window = ImageWindow(self.root, self.hover_image, self.hide_image_preview,
+                                            self.pick_from_image, cache_tiles=config['image_tile_cache'])
+        self.image_window.show()
+        self.image_window.choose_file()
+
+    def hover_image(self, x, y):
+        # Tk pointer events over the image arrive at mouse rate; draw at most once per frame
+        self.image_preview_scheduler.submit(x, y)
+        self.image_preview_scheduler.start()
+
+    def render_image_preview(self, x, y):
+        # Leave the preview alone while a screen pick has it
+        if self.picker_state.state != PickerState.IDLE:
+            return
+        window = self.image_window
+        point = window.image_point(x, y)
+        if point is None:
+            if self.image_preview_shown:
+                self.image_preview_shown = False
+                self.preview.withdraw()
+            return
+        if not self.image_preview_shown:
+            self.image_preview_shown = True
+            self.layout_preview()
+            self.preview.deiconify()
+
+        # Sampled from the full-resolution image, whatever the zoom on screen
+        image = window.image
+        if self.magnifier_enabled.get():
+            pixel_color = self.magnifier.draw(image.tile_array(*point, self.magnifier.grid_size))
+            if self.sample_size > 1:
+                pixel_color = image.sample(*point, self.sample_size, self.sample_method)
+        else:
+            pixel_color = image.sample(*point, self.sample_size, self.sample_method)
+        self.show_preview_color(x, y, pixel_color)
+
+    def hide_image_preview(self):
+        self.image_preview_scheduler.stop()
+        if self.image_preview_shown:
+            self.image_preview_shown = False
+            if self.picker_state.state == PickerState.IDLE:
+                self.preview.withdraw()
+
+    def pick_from_image(self, x, y):
+        # SHIFT released over the Open Image window
+        point = self.image_window.image_point(x, y)
+        if point is None or self.picker_state.state != PickerState.IDLE:
+            return
+        image = self.image_window.image
+        pixel_color = image.sample(*point, self.sample_size, self.sample_method)
+        self.hide_image_preview()
+
+        hex_color = rgb_to_hex(pixel_color)
+        self.color_frame.config(bg=hex_color)
+        self.hex_var.set(hex_color.upper())
+        if self.sample_size > 1:
+            picked = f"{self.sample_size}x{self.sample_size} {self.sample_method}"
+        else:
+            picked = "color"
+        self.status_var.set(f"Picked {picked} at ({point[0]}, {point[1]}) in {os.path.basename(image.path)}")
+
+    def hide_preview(self):
+        # Stop preview updates and hide the preview window until the next pick
+        self.preview_scheduler.stop()
+        self.preview.withdraw()
+        self.picker_state.transition(PickerState.FINISHING, PickerState.IDLE)
+
+    def on_key_press(self, key):
+        # Holding CTRL during a pick anchors one corner of a region at the cursor
+        if key in self.region_keys and self.picker_state.picking and self.region_anchor is None:
+            self.region_anchor = self.mouse_controller.position
+        return True
+
+    def on_key_release(self, key):
+        # The listener stays alive between picks; only react while picking
+        if not self.picker_state.picking:
+            return True
+
+        # Check if shift was pressed
+        if key == self.pick_key and self.picker_state.transition(PickerState.PICKING, PickerState.FINISHING):
+            released_at = probe.start()
+
+            # Get the current mouse position
+            x, y = self.mouse_controller.position
+
+            # Get the pixel color at position (same sampling call as the preview)
+            try:
+                pixel_color = self.sample_color(x, y)
+            except Exception as e:
+                # An error here must not kill the listener or leave the picker stuck in FINISHING
+                error = e
+
+                def restore_on_error():
+                    self.hide_preview()
+                    self.root.deiconify()
+                    self.status_var.set(f"Could not sample ({x}, {y}): {error}")
+
+                try:
+                    self.root.after(100, restore_on_error)
+                except (RuntimeError, tk.TclError):
+                    self.picker_state.transition(PickerState.FINISHING, PickerState.IDLE)
+                return True
+            probe.stop('pick_capture', released_at)
+            if self.sample_size > 1:
+                picked = f"{self.sample_size}x{self.sample_size} {self.sample_method} at ({x}, {y})"
+            else:
+                picked = f"color at ({x}, {y})"
+
+            # Convert RGB to hex
+            hex_color = rgb_to_hex(pixel_color)
+
+            # Update the UI (need to schedule this for when window returns)
+            def update_ui():
+                self.color_frame.config(bg=hex_color)
+                self.hex_var.set(hex_color.upper())
+                self.status_var.set(f"Picked {picked}")
+                self.hide_preview()
+                if released_at is not None:
+                    self.root.after_idle(probe.stop, 'pick_to_display', released_at)
+
+            # Restore the window, bring to foreground, and update UI
+            def restore_window():
+                self.root.deiconify()
+                self.root.lift()
+                self.root.focus_force()  # Force focus to the window
+                self.root.attributes('-topmost', True)  # Place window on top
+                self.root.update()
+                self.root.attributes('-topmost', False)  # Allow window to go behind others when user clicks elsewhere
+
+            self.root.after(100, restore_window)
+            self.root.after(200, update_ui)
+
+        # Releasing CTRL selects the region between the anchor and the cursor
+        elif (key in self.region_keys and self.region_anchor is not None
+              and self.picker_state.transition(PickerState.PICKING, PickerState.FINISHING)):
+            from region import region_bounds
+            bounds = region_bounds(self.region_anchor, self.mouse_controller.position)
+            self.region_anchor = None
+            self.root.after(0, self.capture_region, bounds)
+
+        # Check for Escape key to cancel
+        elif key == self.cancel_key and self.picker_state.transition(PickerState.PICKING, PickerState.FINISHING):
+            self.region_anchor = None
+
+            def restore_on_cancel():
+                self.hide_preview()
+                self.root.deiconify()
+                self.status_var.set("Color picking cancelled")
+
+            self.root.after(100, restore_on_cancel)
+
+        return True
+
+    def capture_region(self, bounds):
+        """Hide the preview so it is not captured, then analyze the region off the Tk thread"""
+        self.hide_preview()
+        self.root.update_idletasks()
+        self.status_var.set(f"Analyzing {bounds[2]} x {bounds[3]} region...")
+
+        def analyze():
+            import capture
+            from region import analyze_region, preview_step
+            try:
+                pixels = capture.grab_region_array(*bounds)
+                # A quick look from a subsample first when the region is large
+                step = preview_step(bounds[2], bounds[3])
+                if step > 1:
+                    self.post_region_result(bounds, analyze_region(pixels, self.region_top_colors,
+                                                                   self.region_bits, step))
+                started = probe.start()
+                result = analyze_region(pixels, self.region_top_colors, self.region_bits)
+                probe.stop('region_analysis', started)
+                self.post_region_result(bounds, result)
+            except Exception as e:
+                self.post_region_result(bounds, e)
+            finally:
+                capture.release_thread()
+
+        # Give the window manager a moment to take the preview off screen
+        self.root.after(50, lambda: threading.Thread(target=analyze, name="region-analysis", daemon=True).start())
+
+    def post_region_result(self, bounds, result):
+        # Called from the analysis thread; hand the result to the Tk loop
+        try:
+            self.root.after(0, self.show_region_result, bounds, result)
+        except (RuntimeError, tk.TclError):
+            pass  # The window is closing
+
+    def show_region_result(self, bounds, result):
+        self.root.deiconify()
+        if isinstance(result, Exception):
+            self.status_var.set(f"Region analysis failed: {result}")
+            return
+
+        if self.region_window is None:
+            from region_view import RegionWindow
+            self.region_window = RegionWindow(self.root, self.copy_hex, self.add_region_to_favorites)
+        self.region_window.show(result, bounds)
+        if result["step"] == 1:
+            self.status_var.set(f"Analyzed {bounds[2]} x {bounds[3]} region")
+
+    def add_region_to_favorites(self, result, bounds):
+        """Add the top colors of a region in one batch, skipping colors already saved"""
+        if result is None:
+            return
+        added = 0
+        for rank, color in enumerate(result["top"], start=1):
+            if self.favorites.find_by_hex(color["hex"]):
+                continue
+            fav_id = self.favorites.add(f"Region {bounds[2]}x{bounds[3]} #{rank}", normalize_hex(color["hex"]))
+            self.index_favorite(fav_id)
+            self.favorites_search.add(fav_id, self.favorites.get(fav_id))
+            self.favorites_view.insert(fav_id, self.favorites.get(fav_id))
+            added += 1
+
+        if added:
+            self.save_favorites()
+            self.refilter_favorites()
+        self.status_var.set(f"Added {added} region colors to favorites")
+
+    def on_mouse_move(self, x, y):
+        # Only record the position here; the Tk loop does the capture and drawing
+        if self.picker_state.picking:
+            # Keep the oldest move not yet drawn, for move-to-paint latency
+            if self.move_event_at is None:
+                self.move_event_at = probe.start()
+            self.preview_scheduler.submit(x, y)
+        return True
+
+    def start_recording(self, follow):
+        """Sample continuously under the cursor or at a fixed point, streaming to a file"""
+        if self.recorder is not None and self.recorder.is_alive():
+            messagebox.showinfo("Recording", "A recording is already running.")
+            return
+
+        if follow:
+            position = lambda: self.mouse_controller.position
+        else:
+            x, y = self.mouse_controller.position
+            point = simpledialog.askstring("Record at Point", "Screen point to sample (x, y):",
+                                           initialvalue=f"{x}, {y}")
+            if not point:
+                return
+            try:
+                position = tuple(int(v) for v in point.replace(',', ' ').split())
+                if len(position) != 2:
+                    raise ValueError(point)
+            except ValueError:
+                messagebox.showerror("Error", f"Not a screen point: {point}")
+                return
+
+        path = filedialog.asksaveasfilename(title="Save Recording As", defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON lines", "*.jsonl")])
+        if not path:
+            return
+
+        from recorder import Recorder, open_sink
+        try:
+            sink = open_sink(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not open {path}: {e}")
+            return
+
+        # Same sampling call (size and method) as the SHIFT pick
+        self.recorder = Recorder(self.sample_color, position, rate=self.record_rate,
+                                 capacity=self.record_buffer, sink=sink)
+        self.recorder.start()
+        self.status_var.set(f"Recording to {os.path.basename(path)}...")
+        self.root.after(500, self.poll_recording)
+
+    def poll_recording(self):
+        # Show the latest color and the counters while the recorder runs
+        recorder = self.recorder
+        if recorder is None:
+            return
+
+        latest = recorder.ring.latest()
+        if latest is not None:
+            hex_color = rgb_to_hex(latest[2])
+            self.color_frame.config(bg=hex_color)
+            self.hex_var.set(hex_color.upper())
+
+        stats = recorder.stats()
+        summary = f"{stats['samples']} samples, {stats['dropped']} dropped, {stats['late']} late"
+        if recorder.is_alive():
+            self.status_var.set(f"Recording: {summary}")
+            self.root.after(500, self.poll_recording)
+        else:
+            self.recorder = None
+            if recorder.error is not None:
+                self.status_var.set(f"Recording failed: {recorder.error}")
+            else:
+                self.status_var.set(f"Recording stopped: {summary}, "
+                                    f"max jitter {stats['max_jitter_ms']:.1f} ms")
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            # The next poll reports the summary
+            self.recorder.stop()
+
+    def toggle_pixel_server(self):
+        """Start or stop the local pixel-query server to match the menu checkbox"""
+        enabled = self.server_enabled.get()
+        config.update(server_enabled=enabled)
+
+        if enabled and self.pixel_server is None:
+            from pixel_server import PixelServer
+            try:
+                self.pixel_server = PixelServer(config['server_port'], cache_ms=config['server_cache_ms'])
+            except OSError as e:
+                self.server_enabled.set(False)
+                messagebox.showerror("Error", f"Could not start the pixel query server: {e}")
+                return
+            self.pixel_server.start()
+            host, port = self.pixel_server.address
+            self.status_var.set(f"Pixel query server on http://{host}:{port}/pixels")
+        elif not enabled and self.pixel_server is not None:
+            self.stop_pixel_server()
+            self.status_var.set("Pixel query server stopped")
+
+    def stop_pixel_server(self):
+        # Shutting down waits for the serve loop to notice, so keep it off the Tk thread
+        server, self.pixel_server = self.pixel_server, None
+        if server is not None:
+            threading.Thread(target=server.stop, name="pixel-server-stop", daemon=True).start()
+
     def copy_to_clipboard(self):
         # Copy the hex code to clipboard
-        hex_code = self.hex_var.get()
+        self.copy_hex(self.hex_var.get())
+
+    def copy_hex(self, hex_code):
+        import pyperclip  # Clipboard backend
         pyperclip.copy(hex_code)
         self.status_var.set(f"Copied {hex_code} to clipboard")
 
+    def show_color_name(self, *args):
+        # Name the color in the hex field; typing a partial code clears it
+        try:
+            rgb = hex_to_rgb(self.hex_var.get().strip())
+        except ValueError:
+            self.color_name_var.set("")
+            return
+        from color_names import describe
+        self.color_name_var.set(describe(rgb))
+
     def add_to_favorites(self):
         # Get the current color
         hex_code = self.hex_var.get()
 
-        # Ask for a label
+        # Ask for a label, suggesting the nearest named color
+        try:
+            from color_names import nearest_name
+            suggested = nearest_name(hex_to_rgb(hex_code))[0]
+        except ValueError:
+            suggested = ""
         label = simpledialog.askstring("Add to Favorites",
                                       "Enter a label for this color:",
+                                      initialvalue=suggested,
                                       parent=self.root)
 
         # If user canceled, return
         if label is None:
             return
 
-        # Create favorite entry
-        favorite = {
-            "label": label,
-            "hex": hex_code
-        }
+        # Check whether this color is already saved
+        existing = self.favorites.find_by_hex(hex_code)
+        if existing:
+            saved_as = self.favorites.get(existing[0])["label"]
+            if not messagebox.askyesno("Duplicate Color",
+                                       f"{hex_code} is already saved as '{saved_as}'.\n\nAdd it again?"):
+                return
 
-        # Add to favorites list
-        self.favorites.append(favorite)
+        # Add to favorites, the closest-color index and the search index
+        fav_id = self.favorites.add(label, hex_code)
+        self.index_favorite(fav_id)
+        self.favorites_search.add(fav_id, self.favorites.get(fav_id))
 
         # Save favorites
         self.save_favorites()
 
-        # Refresh the displayed list
-        self.refresh_favorites_list()
+        # Add just this row to the displayed list
+        self.favorites_view.insert(fav_id, self.favorites.get(fav_id))
+        self.refilter_favorites()
 
         self.status_var.set(f"Added {hex_code} to favorites as '{label}'")
 
     def load_favorites(self):
+        # Retire the old writer first: its pending changes must reach the old
+        # store, and the old store's lock must be free before the directory
+        # (possibly the same one) is opened again. Its results no longer
+        # matter, and reporting them to the Tk loop while we wait would stall.
+        if self.favorites_writer is not None:
+            self.favorites_writer.on_result = None
+            self.favorites_writer.close()
+            self.favorites_store.lock.release()
+
         # Get data directory for storing favorites
         data_dir = get_data_directory()
-        favorites_file = os.path.join(data_dir, 'favorites.json')
+        self.favorites_store = FavoritesStore(data_dir)
+        self.favorites_read_only = False
 
-        # Check if file exists
-        if os.path.exists(favorites_file):
+        # Hold the store's lock while the app runs so headless imports cannot
+        # write to the journal behind our back
+        try:
+            locked = self.favorites_store.lock.acquire(LOCK_TIMEOUT)
+        except OSError as e:
+            print(f"Could not lock favorites in {data_dir}: {e}")
+            locked = False
+        if not locked:
+            self.favorites_read_only = True
+            messagebox.showwarning(
+                "Favorites In Use",
+                f"The favorites in {data_dir} are being changed by another program.\n\n"
+                "They are shown read-only; changes made now will not be saved.")
+
+        # Load the snapshot and replay the change journal (migrates old files)
+        if os.path.exists(self.favorites_store.snapshot_path) or os.path.exists(self.favorites_store.journal_path):
             try:
-                with open(favorites_file, 'r') as f:
-                    self.favorites = json.load(f)
-                self.status_var.set(f"Loaded favorites from {favorites_file}")
-            except Exception as e:
+                self.favorites_store.load(self.favorites)
+                self.status_var.set(f"Loaded favorites from {self.favorites_store.snapshot_path}")
+            except OSError as e:
+                # Unreadable rather than damaged; never write over what is there
                 print(f"Error loading favorites: {e}")
-                self.favorites = []
+                self.favorites.load([])
+                self.favorites_read_only = True
+                messagebox.showerror(
+                    "Error",
+                    f"Could not read favorites from {data_dir}:\n{e}\n\n"
+                    "Changes made now will not be saved.")
         else:
-            self.favorites = []
-            print(f"No favorites file found at {favorites_file}")
+            self.favorites.load([])
+            print(f"No favorites file found at {self.favorites_store.snapshot_path}")
+
+        if self.favorites_store.recovered_from is not None:
+            self.confirm_recovered_favorites()
+
+        # Rebuild the closest-color index for the new list
+        self.favorite_index.clear()
+        for fav_id, favorite in self.favorites:
+            self.index_favorite(fav_id)
+
+        # The search indexes are rebuilt when the filter box is next used
+        self.favorites_search.invalidate()
+
+        # Start a background writer for this store
+        self.favorites_writer = FavoritesWriter(self.favorites_store, self.favorites,
+                                                on_result=self.on_favorites_written)
+
+    def confirm_recovered_favorites(self):
+        """Ask before a damaged favorites file is replaced by what could be recovered"""
+        store = self.favorites_store
+        self.status_var.set(f"Favorites file was damaged; moved it to {store.recovered_from}")
+        # The store keeps appending to the journal but will not write a new
+        # snapshot until the user agrees the recovered list should replace the old one
+        if messagebox.askyesno(
+            "Favorites Damaged",
+            f"{store.snapshot_path} could not be read and was moved to:\n{store.recovered_from}\n\n"
+            f"Only {len(self.favorites)} favorites could be recovered from recent changes.\n\n"
+            "Save these as your new favorites file? Choose No to hold off while you try to "
+            "recover the old one; changes are still recorded in the journal meanwhile."):
+            store.compaction_held = False
+
+    def index_favorite(self, fav_id):
+        """Add one favorite to the closest-color index"""
+        favorite = self.favorites.get(fav_id)
+        try:
+            self.favorite_index.add(fav_id, hex_to_rgb(favorite["hex"]), favorite)
+        except ValueError:
+            # Skip malformed entries rather than failing the whole list
+            print(f"Skipping favorite with invalid color: {favorite}")
 
     def save_favorites(self):
-        # Get data directory for storing favorites
-        data_dir = get_data_directory()
-        favorites_file = os.path.join(data_dir, 'favorites.json')
+        # Hand the pending changes to the writer thread; bursts are written together
+        changes = self.favorites.take_changes()
+        if self.favorites_read_only:
+            self.status_var.set("Favorites are read-only; changes are not saved")
+            return
+        self.favorites_writer.submit(changes)
 
-        # Save to file
+    def on_favorites_written(self, error, message):
+        # Called on the writer thread, so pass the result to the Tk loop
         try:
-            with open(favorites_file, 'w') as f:
-                json.dump(self.favorites, f, indent=2)
-            # Show save location in status
-            self.status_var.set(f"Saved favorites to {favorites_file}")
-        except Exception as e:
-            print(f"Error saving favorites: {e}")
-            messagebox.showerror("Error", f"Could not save favorites: {e}")
+            self.root.after(0, self.show_save_result, error, message)
+        except (RuntimeError, tk.TclError):
+            # The window is already gone
+            print(message)
+
+    def show_save_result(self, error, message):
+        # Show save location (or the failure) in status
+        self.status_var.set(message)
+        if error is not None:
+            print(f"Error saving favorites: {error}")
+            messagebox.showerror("Error", message)
+
+    def on_close(self):
+        """Flush pending favorites, then close the window"""
+        if self.recorder is not None:
+            self.recorder.stop()
+        self.stop_pixel_server()
+        self.status_var.set("Saving favorites...")
+        self.favorites_writer.close(timeout=0)  # Start the final flush without blocking the Tk loop
+        self.wait_for_writer(time.monotonic() + 10)
+
+    def wait_for_writer(self, deadline):
+        # Keep the Tk loop running (the writer reports through it) until the flush is done
+        if self.favorites_writer.is_alive() and time.monotonic() < deadline:
+            self.root.after(50, self.wait_for_writer, deadline)
+            return
+        if self.favorites_writer.is_alive():
+            print("Timed out waiting for favorites to be saved")
+        self.root.destroy()
 
     def refresh_favorites_list(self):
-        # Clear current items
-        for item in self.favorites_list.get_children():
-            self.favorites_list.delete(item)
+        # Rebuild every row; only needed when a whole new list is loaded
+        self.favorites_view.reset(self.favorites)
+        self.refilter_favorites()
+
+    def prepare_favorites_search(self, event=None):
+        """Build the search indexes in the background when the filter box is first used"""
+        search = self.favorites_search
+        if search.built or self.search_build_generation == search.generation:
+            return
+        generation, records = search.snapshot()
+        self.search_build_generation = generation
+        threading.Thread(target=self.build_search_index, args=(generation, records),
+                         name="favorites-search-index", daemon=True).start()
+
+    def build_search_index(self, generation, records):
+        # Runs on a worker thread; only the Tk thread touches the search object
+        indexes = FavoritesSearch.build_indexes(records)
+        try:
+            self.root.after(0, self.install_search_index, generation, indexes)
+        except (RuntimeError, tk.TclError):
+            pass  # The window is already gone
 
-        # Add favorites to list
-        for favorite in self.favorites:
-            hex_code = favorite["hex"]
-            is_dark = self.is_dark_color(hex_code)
+    def install_search_index(self, generation, indexes):
+        if self.favorites_search.install(generation, indexes):
+            self.refilter_favorites()
 
-            # Create a unique tag for this item combining color and text color info
-            tag_name = f"{hex_code}_{is_dark}"
+    def apply_favorites_filter(self, *args):
+        """Show only the favorites matching the filter box, or all of them when it is empty"""
+        started = probe.start()
+        try:
+            keys = self.favorites_search.search(self.filter_var.get())
+        except ValueError as e:
+            self.status_var.set(str(e))
+            return
+        self.favorites_view.show_only(keys)
+        probe.stop('favorites_filter', started)
+        if keys is not None:
+            self.status_var.set(f"{len(keys)} of {len(self.favorites)} favorites match")
+        elif self.filter_var.get().strip() and not self.favorites_search.built:
+            # Show everything until the background build installs, which refilters
+            self.prepare_favorites_search()
+            self.status_var.set("Indexing favorites...")
+
+    def refilter_favorites(self):
+        # After the list changes, hide rows the current filter doesn't match
+        if self.filter_var.get().strip():
+            self.apply_favorites_filter()
+
+    def import_palette(self):
+        """Read a palette file off the Tk thread, then add its new colors in one batch"""
+        import palette_io
+        path = filedialog.askopenfilename(title="Import Palette",
+                                          filetypes=palette_io.FILE_TYPES + [("All files", "*.*")])
+        if not path:
+            return
 
-            # Insert with wrapped text
-            self.favorites_list.insert("", "end", values=(favorite["label"], hex_code),
-                                     tags=(tag_name,))
+        # Colors already saved; the reader thread gets its own copy of the set
+        seen = self.favorites.hex_codes()
+        self.status_var.set(f"Importing {os.path.basename(path)}...")
 
-            # Configure the tag with appropriate background and foreground colors
-            text_color = "white" if is_dark else "black"
-            self.favorites_list.tag_configure(tag_name, background=hex_code, foreground=text_color)
+        def read():
+            try:
+                result = palette_io.new_entries(palette_io.read_palette(path), seen)
+            except Exception as e:
+                result = e
+            self.post_palette_result(self.finish_palette_import, path, result)
 
-        # Set row height to accommodate wrapped text - using style instead of direct configuration
-        style = ttk.Style()
-        style.configure('Treeview', rowheight=40)
+        threading.Thread(target=read, name="palette-import", daemon=True).start()
+
+    def finish_palette_import(self, path, result):
+        name = os.path.basename(path)
+        if isinstance(result, Exception):
+            self.status_var.set(f"Could not import {name}")
+            messagebox.showerror("Error", f"Could not import {path}:\n{result}")
+            return
+
+        entries, duplicates = result
+        added = []
+        for label, hex_code in entries:
+            # Colors saved while the file was being read count as duplicates too
+            if self.favorites.find_by_hex(hex_code):
+                duplicates += 1
+                continue
+            fav_id = self.favorites.add(label, hex_code)
+            self.index_favorite(fav_id)
+            added.append(fav_id)
+
+        if added:
+            # Cheaper to rebuild on the next search than to re-index one favorite at a time
+            self.favorites_search.invalidate()
+            self.save_favorites()
+            # One view update for the whole import
+            self.favorites_view.extend((fav_id, self.favorites.get(fav_id)) for fav_id in added)
+            self.refilter_favorites()
+        self.status_var.set(f"Imported {len(added)} colors from {name} ({duplicates} duplicates skipped)")
+
+    def export_palette(self):
+        """Write the favorites to a palette file off the Tk thread"""
+        import palette_io
+        path = filedialog.asksaveasfilename(title="Export Palette", defaultextension=".gpl",
+                                            filetypes=palette_io.FILE_TYPES)
+        if not path:
+            return
+        try:
+            palette_io.detect_format(path)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        entries = [(favorite["label"], favorite["hex"]) for _, favorite in self.favorites]
+        self.status_var.set(f"Exporting {len(entries)} favorites...")
+
+        def write():
+            try:
+                result = palette_io.write_palette(path, entries)
+            except Exception as e:
+                result = e
+            self.post_palette_result(self.finish_palette_export, path, result)
+
+        threading.Thread(target=write, name="palette-export", daemon=True).start()
+
+    def finish_palette_export(self, path, result):
+        if isinstance(result, Exception):
+            self.status_var.set(f"Could not export to {os.path.basename(path)}")
+            messagebox.showerror("Error", f"Could not export to {path}:\n{result}")
+            return
+        self.status_var.set(f"Exported {result} favorites to {os.path.basename(path)}")
+
+    def show_contrast_report(self):
+        if self.contrast_window is None:
+            from contrast_view import ContrastWindow
+            self.contrast_window = ContrastWindow(self.root, self.contrast_entries)
+        self.contrast_window.show()
+
+    def contrast_entries(self, selected):
+        """(label, hex) pairs of all favorites, or of the ones selected in the list"""
+        if selected:
+            keys = [self.favorites_view.key_for(item) for item in self.favorites_list.selection()]
+            favorites = [self.favorites.get(key) for key in keys]
+        else:
+            favorites = [favorite for _, favorite in self.favorites]
+        return [(favorite["label"], favorite["hex"]) for favorite in favorites if favorite is not None]
+
+    def post_palette_result(self, callback, path, result):
+        # Called from an import or export thread; hand the result to the Tk loop
+        try:
+            self.root.after(0, callback, path, result)
+        except (RuntimeError, tk.TclError):
+            pass  # The window is closing
 
     def load_selected_color(self, event):
         # Get selected item
@@ -525,24 +1416,24 @@ class ColorPickerApp:
             messagebox.showinfo("Info", "Please select a favorite to delete")
             return
 
-        # Get values of selected item
-        values = self.favorites_list.item(selected[0], 'values')
+        # The Treeview item ID is the favorite's ID
+        fav_id = self.favorites_view.key_for(selected[0])
+        favorite = self.favorites.get(fav_id)
 
-        if not values:
+        if favorite is None:
             return
 
         # Ask for confirmation
-        if messagebox.askyesno("Confirm", f"Delete '{values[0]}' ({values[1]})?"):
-            # Find and remove from favorites
-            for i, favorite in enumerate(self.favorites):
-                if favorite["label"] == values[0] and favorite["hex"] == values[1]:
-                    del self.favorites[i]
-                    break
-
-            # Save and refresh
+        if messagebox.askyesno("Confirm", f"Delete '{favorite['label']}' ({favorite['hex']})?"):
+            # Remove from favorites, the closest-color and search indexes and the list
+            self.favorites.delete(fav_id)
+            self.favorite_index.remove(fav_id)
+            self.favorites_search.remove(fav_id)
+            self.favorites_view.remove(fav_id)
+
+            # Save the change
             self.save_favorites()
-            self.refresh_favorites_list()
-            self.status_var.set(f"Deleted '{values[0]}' from favorites")
+            self.status_var.set(f"Deleted '{favorite['label']}' from favorites")
 
     def edit_favorite_label(self):
         # Get selected item
@@ -552,31 +1443,31 @@ class ColorPickerApp:
             messagebox.showinfo("Info", "Please select a favorite to edit")
             return
 
-        # Get values of selected item
-        values = self.favorites_list.item(selected[0], 'values')
+        # The Treeview item ID is the favorite's ID
+        fav_id = self.favorites_view.key_for(selected[0])
+        favorite = self.favorites.get(fav_id)
 
-        if not values:
+        if favorite is None:
             return
 
         # Ask for new label
         new_label = simpledialog.askstring("Edit Label",
                                          "Enter a new label:",
-                                         initialvalue=values[0],
+                                         initialvalue=favorite["label"],
                                          parent=self.root)
 
         # If user canceled, return
         if new_label is None:
             return
 
-        # Find and update in favorites
-        for favorite in self.favorites:
-            if favorite["label"] == values[0] and favorite["hex"] == values[1]:
-                favorite["label"] = new_label
-                break
+        # Update the favorite and its row
+        self.favorites.update(fav_id, label=new_label)
+        self.favorites_search.update(fav_id, favorite)
+        self.favorites_view.update(fav_id, favorite)
+        self.refilter_favorites()
 
-        # Save and refresh
+        # Save the change
         self.save_favorites()
-        self.refresh_favorites_list()
         self.status_var.set(f"Updated label to '{new_label}'")
 
     def show_context_menu(self, event):
@@ -617,14 +1508,49 @@ class ColorPickerApp:
             return
 
         # Copy hex code to clipboard
-        hex_code = values[1]
-        pyperclip.copy(hex_code)
-        self.status_var.set(f"Copied {hex_code} to clipboard")
+        self.copy_hex(values[1])
 
 def main():
     root = tk.Tk()
     app = ColorPickerApp(root)
     root.mainloop()
 
+def extract_main(argv=None):
+    """Headless palette extraction: color-picker.py extract <files or directories> ..."""
+    # palette only needs Pillow and numpy, never a display or input hooks
+    import palette
+    return palette.main(argv)
+
+def record_main(argv=None):
+    """Headless recording: color-picker.py record --point X Y | --follow -o out.csv ..."""
+    import recorder
+    return recorder.main(argv)
+
+def palette_main(argv=None):
+    """Headless palette import/export: color-picker.py import|export <file>"""
+    import palette_io
+    return palette_io.main(argv)
+
+def contrast_main(argv=None):
+    """Headless contrast report: color-picker.py contrast [--level AA --failing] [-o pairs.csv]"""
+    import contrast
+    return contrast.main(argv)
+
+def serve_main(argv=None):
+    """Headless pixel-query server: color-picker.py serve [--port N] [--cache-ms MS]"""
+    import pixel_server
+    return pixel_server.main(argv)
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for the extraction process pool in the frozen build
+    if len(sys.argv) > 1 and sys.argv[1] == 'extract':
+        sys.exit(extract_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'record':
+        sys.exit(record_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] in ('import', 'export'):
+        sys.exit(palette_main(sys.argv[1:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'contrast':
+        sys.exit(contrast_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        sys.exit(serve_main(sys.argv[2:]))
     main()
\ No newline at end of file
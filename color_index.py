@@ -0,0 +1,208 @@
+"""Nearest-color lookup over a changing set of colors."""
+import math
+
+from colors import rgb_to_lab
+
+# Below this many distinct colors a plain scan is faster than walking the grid
+LINEAR_SCAN_LIMIT = 64
+
+# Aim for about this many distinct colors per grid cell
+COLORS_PER_CELL = 4
+
+# Approximate volume of the sRGB gamut in CIELAB, used to pick a cell size
+LAB_GAMUT_VOLUME = 820000.0
+
+# Extent of CIELAB values reachable from sRGB
+LAB_BOUNDS = ((0.0, 100.0), (-87.0, 99.0), (-108.0, 95.0))
+
+
+class NearestColorIndex:
+    """Find the stored color perceptually closest to a query color.
+
+    Distinct colors are bucketed on a uniform grid in CIELAB and a query
+    walks outwards shell by shell from its own cell, stopping as soon as no
+    unvisited cell can hold anything closer. Adds and removes only touch one
+    bucket; the grid is re-bucketed only when the number of distinct colors
+    doubles or halves, so the cell size keeps tracking the density.
+
+    Distances are CIE76 delta E (Euclidean distance in CIELAB).
+    """
+
+    def __init__(self):
+        self._keys = {}    # key -> lab
+        self._values = {}  # key -> value returned by nearest()
+        self._colors = {}  # lab -> keys stored with that color
+        self._cells = {}   # cell -> labs in that cell
+        self._cell_size = None
+        self._sized_for = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        self._keys.clear()
+        self._values.clear()
+        self._colors.clear()
+        self._cells.clear()
+        self._cell_size = None
+        self._sized_for = 0
+
+    def rebuild(self, items):
+        """Replace the contents with (key, rgb, value) items"""
+        self.clear()
+        for key, rgb, value in items:
+            self._insert(key, rgb_to_lab(rgb), value)
+        self._resize()
+
+    def add(self, key, rgb, value=None):
+        """Add or replace the color stored under key"""
+        if key in self._keys:
+            self.remove(key)
+        self._insert(key, rgb_to_lab(rgb), key if value is None else value)
+        if len(self._colors) > 2 * max(self._sized_for, LINEAR_SCAN_LIMIT):
+            self._resize()
+
+    def remove(self, key):
+        """Remove the color stored under key, if any"""
+        lab = self._keys.pop(key, None)
+        if lab is None:
+            return
+        del self._values[key]
+
+        keys = self._colors[lab]
+        del keys[key]
+        if not keys:
+            # Last key with this color, so drop the color from its cell too
+            del self._colors[lab]
+            if self._cell_size is not None:
+                cell = self._cell_of(lab)
+                bucket = self._cells[cell]
+                bucket.discard(lab)
+                if not bucket:
+                    del self._cells[cell]
+
+        if self._sized_for > LINEAR_SCAN_LIMIT and len(self._colors) < self._sized_for // 2:
+            self._resize()
+
+    def nearest(self, rgb):
+        """Return (value, delta_e) of the closest stored color, or None if empty"""
+        if not self._keys:
+            return None
+
+        lab = rgb_to_lab(rgb)
+        if self._cell_size is None or len(self._colors) <= LINEAR_SCAN_LIMIT:
+            best_lab, best_d2 = self._scan(lab, self._colors)
+        else:
+            best_lab, best_d2 = self._walk(lab)
+
+        # Several keys can share a color; any of them is an equally close match
+        key = next(iter(self._colors[best_lab]))
+        return self._values[key], math.sqrt(best_d2)
+
+    def within(self, rgb, delta_e):
+        """Return (key, delta_e) for every stored color within delta_e, closest first"""
+        lab = rgb_to_lab(rgb)
+        limit = delta_e * delta_e
+        if self._cell_size is None or len(self._colors) <= LINEAR_SCAN_LIMIT:
+            labs = self._colors
+        else:
+            # Only the cells overlapping the cube around the query can hold matches
+            size = self._cell_size
+            ranges = [range(max(math.floor((lab[i] - delta_e) / size), math.floor(LAB_BOUNDS[i][0] / size)),
+                            min(math.floor((lab[i] + delta_e) / size), math.floor(LAB_BOUNDS[i][1] / size)) + 1)
+                      for i in range(3)]
+            if len(ranges[0]) * len(ranges[1]) * len(ranges[2]) > len(self._cells):
+                labs = self._colors
+            else:
+                labs = [other for i in ranges[0] for j in ranges[1] for k in ranges[2]
+                        for other in self._cells.get((i, j, k), ())]
+
+        l0, a0, b0 = lab
+        found = []
+        for other in labs:
+            d2 = (other[0] - l0) ** 2 + (other[1] - a0) ** 2 + (other[2] - b0) ** 2
+            if d2 <= limit:
+                distance = math.sqrt(d2)
+                found.extend((key, distance) for key in self._colors[other])
+        found.sort(key=lambda match: match[1])
+        return found
+
+    def _walk(self, lab):
+        size = self._cell_size
+        center = self._cell_of(lab)
+        lows = [math.floor(low / size) for low, _ in LAB_BOUNDS]
+        highs = [math.floor(high / size) for _, high in LAB_BOUNDS]
+        max_ring = max(max(center[i] - lows[i], highs[i] - center[i]) for i in range(3))
+
+        best_lab, best_d2 = None, math.inf
+        for ring in range(max_ring + 1):
+            for cell in self._shell(center, ring, lows, highs):
+                bucket = self._cells.get(cell)
+                if bucket:
+                    found, d2 = self._scan(lab, bucket)
+                    if d2 < best_d2:
+                        best_lab, best_d2 = found, d2
+
+            # Anything outside this shell is at least ring * size away
+            if best_lab is not None and best_d2 <= (ring * size) ** 2:
+                break
+
+        return best_lab, best_d2
+
+    def _insert(self, key, lab, value):
+        self._keys[key] = lab
+        self._values[key] = value
+        keys = self._colors.get(lab)
+        if keys is None:
+            keys = self._colors[lab] = {}
+            if self._cell_size is not None:
+                self._cells.setdefault(self._cell_of(lab), set()).add(lab)
+        keys[key] = None  # dict as an insertion-ordered set
+
+    def _resize(self):
+        # Pick a cell size for the current number of distinct colors and re-bucket them
+        count = max(len(self._colors), 1)
+        self._cell_size = (COLORS_PER_CELL * LAB_GAMUT_VOLUME / count) ** (1.0 / 3.0)
+        self._sized_for = len(self._colors)
+
+        # Dicts never shrink on delete, so copy them to drop freed slots
+        self._keys = dict(self._keys)
+        self._values = dict(self._values)
+        self._colors = dict(self._colors)
+
+        self._cells = {}
+        for lab in self._colors:
+            self._cells.setdefault(self._cell_of(lab), set()).add(lab)
+
+    def _cell_of(self, lab):
+        size = self._cell_size
+        return math.floor(lab[0] / size), math.floor(lab[1] / size), math.floor(lab[2] / size)
+
+    @staticmethod
+    def _scan(lab, labs):
+        # Linear search over CIELAB tuples using squared distances
+        l0, a0, b0 = lab
+        best_lab, best_d2 = None, math.inf
+        for other in labs:
+            d2 = (other[0] - l0) ** 2 + (other[1] - a0) ** 2 + (other[2] - b0) ** 2
+            if d2 < best_d2:
+                best_lab, best_d2 = other, d2
+        return best_lab, best_d2
+
+    @staticmethod
+    def _shell(center, ring, lows, highs):
+        # Cells whose Chebyshev distance from center is exactly ring, clipped to the gamut
+        ci, cj, ck = center
+        if ring == 0:
+            yield center
+            return
+        for i in range(max(ci - ring, lows[0]), min(ci + ring, highs[0]) + 1):
+            edge_i = abs(i - ci) == ring
+            for j in range(max(cj - ring, lows[1]), min(cj + ring, highs[1]) + 1):
+                if edge_i or abs(j - cj) == ring:
+                    for k in range(max(ck - ring, lows[2]), min(ck + ring, highs[2]) + 1):
+                        yield i, j, k
+                else:
+                    for k in (ck - ring, ck + ring):
+                        if lows[2] <= k <= highs[2]:
+                            yield i, j, k
@@ -0,0 +1,572 @@
+"""Named colors for color_names: the CSS named colors, then the X11 ones.
+
+One "RRGGBB Name" per line. X11 colors that share a CSS name but not its
+value are marked (X11); "grey" spellings are left out as duplicates of
+"gray". More names can be appended in the same form.
+"""
+
+NAMED_COLORS = """\
+F0F8FF Alice Blue
+FAEBD7 Antique White
+00FFFF Aqua
+7FFFD4 Aquamarine
+F0FFFF Azure
+F5F5DC Beige
+FFE4C4 Bisque
+000000 Black
+FFEBCD Blanched Almond
+0000FF Blue
+8A2BE2 Blue Violet
+A52A2A Brown
+DEB887 Burlywood
+5F9EA0 Cadet Blue
+7FFF00 Chartreuse
+D2691E Chocolate
+FF7F50 Coral
+6495ED Cornflower Blue
+FFF8DC Cornsilk
+DC143C Crimson
+00FFFF Cyan
+00008B Dark Blue
+008B8B Dark Cyan
+B8860B Dark Goldenrod
+A9A9A9 Dark Gray
+006400 Dark Green
+BDB76B Dark Khaki
+8B008B Dark Magenta
+556B2F Dark Olive Green
+FF8C00 Dark Orange
+9932CC Dark Orchid
+8B0000 Dark Red
+E9967A Dark Salmon
+8FBC8F Dark Sea Green
+483D8B Dark Slate Blue
+2F4F4F Dark Slate Gray
+00CED1 Dark Turquoise
+9400D3 Dark Violet
+FF1493 Deep Pink
+00BFFF Deep Sky Blue
+696969 Dim Gray
+1E90FF Dodger Blue
+B22222 Firebrick
+FFFAF0 Floral White
+228B22 Forest Green
+FF00FF Fuchsia
+DCDCDC Gainsboro
+F8F8FF Ghost White
+FFD700 Gold
+DAA520 Goldenrod
+808080 Gray
+008000 Green
+ADFF2F Green Yellow
+F0FFF0 Honeydew
+FF69B4 Hot Pink
+CD5C5C Indian Red
+4B0082 Indigo
+FFFFF0 Ivory
+F0E68C Khaki
+E6E6FA Lavender
+FFF0F5 Lavender Blush
+7CFC00 Lawn Green
+FFFACD Lemon Chiffon
+ADD8E6 Light Blue
+F08080 Light Coral
+E0FFFF Light Cyan
+FAFAD2 Light Goldenrod Yellow
+90EE90 Light Green
+D3D3D3 Light Gray
+FFB6C1 Light Pink
+FFA07A Light Salmon
+20B2AA Light Sea Green
+87CEFA Light Sky Blue
+778899 Light Slate Gray
+B0C4DE Light Steel Blue
+FFFFE0 Light Yellow
+00FF00 Lime
+32CD32 Lime Green
+FAF0E6 Linen
+FF00FF Magenta
+800000 Maroon
+66CDAA Medium Aquamarine
+0000CD Medium Blue
+BA55D3 Medium Orchid
+9370DB Medium Purple
+3CB371 Medium Sea Green
+7B68EE Medium Slate Blue
+00FA9A Medium Spring Green
+48D1CC Medium Turquoise
+C71585 Medium Violet Red
+191970 Midnight Blue
+F5FFFA Mint Cream
+FFE4E1 Misty Rose
+FFE4B5 Moccasin
+FFDEAD Navajo White
+000080 Navy
+FDF5E6 Old Lace
+808000 Olive
+6B8E23 Olive Drab
+FFA500 Orange
+FF4500 Orange Red
+DA70D6 Orchid
+EEE8AA Pale Goldenrod
+98FB98 Pale Green
+AFEEEE Pale Turquoise
+DB7093 Pale Violet Red
+FFEFD5 Papaya Whip
+FFDAB9 Peach Puff
+CD853F Peru
+FFC0CB Pink
+DDA0DD Plum
+B0E0E6 Powder Blue
+800080 Purple
+663399 Rebecca Purple
+FF0000 Red
+BC8F8F Rosy Brown
+4169E1 Royal Blue
+8B4513 Saddle Brown
+FA8072 Salmon
+F4A460 Sandy Brown
+2E8B57 Sea Green
+FFF5EE Seashell
+A0522D Sienna
+C0C0C0 Silver
+87CEEB Sky Blue
+6A5ACD Slate Blue
+708090 Slate Gray
+FFFAFA Snow
+00FF7F Spring Green
+4682B4 Steel Blue
+D2B48C Tan
+008080 Teal
+D8BFD8 Thistle
+FF6347 Tomato
+40E0D0 Turquoise
+EE82EE Violet
+F5DEB3 Wheat
+FFFFFF White
+F5F5F5 White Smoke
+FFFF00 Yellow
+9ACD32 Yellow Green
+BEBEBE Gray (X11)
+000080 Navy Blue
+8470FF Light Slate Blue
+00FF00 Green (X11)
+EEDD82 Light Goldenrod
+B03060 Maroon (X11)
+D02090 Violet Red
+A020F0 Purple (X11)
+FFFAFA Snow 1
+EEE9E9 Snow 2
+CDC9C9 Snow 3
+8B8989 Snow 4
+FFF5EE Seashell 1
+EEE5DE Seashell 2
+CDC5BF Seashell 3
+8B8682 Seashell 4
+FFEFDB Antique White 1
+EEDFCC Antique White 2
+CDC0B0 Antique White 3
+8B8378 Antique White 4
+FFE4C4 Bisque 1
+EED5B7 Bisque 2
+CDB79E Bisque 3
+8B7D6B Bisque 4
+FFDAB9 Peach Puff 1
+EECBAD Peach Puff 2
+CDAF95 Peach Puff 3
+8B7765 Peach Puff 4
+FFDEAD Navajo White 1
+EECFA1 Navajo White 2
+CDB38B Navajo White 3
+8B795E Navajo White 4
+FFFACD Lemon Chiffon 1
+EEE9BF Lemon Chiffon 2
+CDC9A5 Lemon Chiffon 3
+8B8970 Lemon Chiffon 4
+FFF8DC Cornsilk 1
+EEE8CD Cornsilk 2
+CDC8B1 Cornsilk 3
+8B8878 Cornsilk 4
+FFFFF0 Ivory 1
+EEEEE0 Ivory 2
+CDCDC1 Ivory 3
+8B8B83 Ivory 4
+F0FFF0 Honeydew 1
+E0EEE0 Honeydew 2
+C1CDC1 Honeydew 3
+838B83 Honeydew 4
+FFF0F5 Lavender Blush 1
+EEE0E5 Lavender Blush 2
+CDC1C5 Lavender Blush 3
+8B8386 Lavender Blush 4
+FFE4E1 Misty Rose 1
+EED5D2 Misty Rose 2
+CDB7B5 Misty Rose 3
+8B7D7B Misty Rose 4
+F0FFFF Azure 1
+E0EEEE Azure 2
+C1CDCD Azure 3
+838B8B Azure 4
+836FFF Slate Blue 1
+7A67EE Slate Blue 2
+6959CD Slate Blue 3
+473C8B Slate Blue 4
+4876FF Royal Blue 1
+436EEE Royal Blue 2
+3A5FCD Royal Blue 3
+27408B Royal Blue 4
+0000FF Blue 1
+0000EE Blue 2
+0000CD Blue 3
+00008B Blue 4
+1E90FF Dodger Blue 1
+1C86EE Dodger Blue 2
+1874CD Dodger Blue 3
+104E8B Dodger Blue 4
+63B8FF Steel Blue 1
+5CACEE Steel Blue 2
+4F94CD Steel Blue 3
+36648B Steel Blue 4
+00BFFF Deep Sky Blue 1
+00B2EE Deep Sky Blue 2
+009ACD Deep Sky Blue 3
+00688B Deep Sky Blue 4
+87CEFF Sky Blue 1
+7EC0EE Sky Blue 2
+6CA6CD Sky Blue 3
+4A708B Sky Blue 4
+B0E2FF Light Sky Blue 1
+A4D3EE Light Sky Blue 2
+8DB6CD Light Sky Blue 3
+607B8B Light Sky Blue 4
+C6E2FF Slate Gray 1
+B9D3EE Slate Gray 2
+9FB6CD Slate Gray 3
+6C7B8B Slate Gray 4
+CAE1FF Light Steel Blue 1
+BCD2EE Light Steel Blue 2
+A2B5CD Light Steel Blue 3
+6E7B8B Light Steel Blue 4
+BFEFFF Light Blue 1
+B2DFEE Light Blue 2
+9AC0CD Light Blue 3
+68838B Light Blue 4
+E0FFFF Light Cyan 1
+D1EEEE Light Cyan 2
+B4CDCD Light Cyan 3
+7A8B8B Light Cyan 4
+BBFFFF Pale Turquoise 1
+AEEEEE Pale Turquoise 2
+96CDCD Pale Turquoise 3
+668B8B Pale Turquoise 4
+98F5FF Cadet Blue 1
+8EE5EE Cadet Blue 2
+7AC5CD Cadet Blue 3
+53868B Cadet Blue 4
+00F5FF Turquoise 1
+00E5EE Turquoise 2
+00C5CD Turquoise 3
+00868B Turquoise 4
+00FFFF Cyan 1
+00EEEE Cyan 2
+00CDCD Cyan 3
+008B8B Cyan 4
+97FFFF Dark Slate Gray 1
+8DEEEE Dark Slate Gray 2
+79CDCD Dark Slate Gray 3
+528B8B Dark Slate Gray 4
+7FFFD4 Aquamarine 1
+76EEC6 Aquamarine 2
+66CDAA Aquamarine 3
+458B74 Aquamarine 4
+C1FFC1 Dark Sea Green 1
+B4EEB4 Dark Sea Green 2
+9BCD9B Dark Sea Green 3
+698B69 Dark Sea Green 4
+54FF9F Sea Green 1
+4EEE94 Sea Green 2
+43CD80 Sea Green 3
+2E8B57 Sea Green 4
+9AFF9A Pale Green 1
+90EE90 Pale Green 2
+7CCD7C Pale Green 3
+548B54 Pale Green 4
+00FF7F Spring Green 1
+00EE76 Spring Green 2
+00CD66 Spring Green 3
+008B45 Spring Green 4
+00FF00 Green 1
+00EE00 Green 2
+00CD00 Green 3
+008B00 Green 4
+7FFF00 Chartreuse 1
+76EE00 Chartreuse 2
+66CD00 Chartreuse 3
+458B00 Chartreuse 4
+C0FF3E Olive Drab 1
+B3EE3A Olive Drab 2
+9ACD32 Olive Drab 3
+698B22 Olive Drab 4
+CAFF70 Dark Olive Green 1
+BCEE68 Dark Olive Green 2
+A2CD5A Dark Olive Green 3
+6E8B3D Dark Olive Green 4
+FFF68F Khaki 1
+EEE685 Khaki 2
+CDC673 Khaki 3
+8B864E Khaki 4
+FFEC8B Light Goldenrod 1
+EEDC82 Light Goldenrod 2
+CDBE70 Light Goldenrod 3
+8B814C Light Goldenrod 4
+FFFFE0 Light Yellow 1
+EEEED1 Light Yellow 2
+CDCDB4 Light Yellow 3
+8B8B7A Light Yellow 4
+FFFF00 Yellow 1
+EEEE00 Yellow 2
+CDCD00 Yellow 3
+8B8B00 Yellow 4
+FFD700 Gold 1
+EEC900 Gold 2
+CDAD00 Gold 3
+8B7500 Gold 4
+FFC125 Goldenrod 1
+EEB422 Goldenrod 2
+CD9B1D Goldenrod 3
+8B6914 Goldenrod 4
+FFB90F Dark Goldenrod 1
+EEAD0E Dark Goldenrod 2
+CD950C Dark Goldenrod 3
+8B6508 Dark Goldenrod 4
+FFC1C1 Rosy Brown 1
+EEB4B4 Rosy Brown 2
+CD9B9B Rosy Brown 3
+8B6969 Rosy Brown 4
+FF6A6A Indian Red 1
+EE6363 Indian Red 2
+CD5555 Indian Red 3
+8B3A3A Indian Red 4
+FF8247 Sienna 1
+EE7942 Sienna 2
+CD6839 Sienna 3
+8B4726 Sienna 4
+FFD39B Burlywood 1
+EEC591 Burlywood 2
+CDAA7D Burlywood 3
+8B7355 Burlywood 4
+FFE7BA Wheat 1
+EED8AE Wheat 2
+CDBA96 Wheat 3
+8B7E66 Wheat 4
+FFA54F Tan 1
+EE9A49 Tan 2
+CD853F Tan 3
+8B5A2B Tan 4
+FF7F24 Chocolate 1
+EE7621 Chocolate 2
+CD661D Chocolate 3
+8B4513 Chocolate 4
+FF3030 Firebrick 1
+EE2C2C Firebrick 2
+CD2626 Firebrick 3
+8B1A1A Firebrick 4
+FF4040 Brown 1
+EE3B3B Brown 2
+CD3333 Brown 3
+8B2323 Brown 4
+FF8C69 Salmon 1
+EE8262 Salmon 2
+CD7054 Salmon 3
+8B4C39 Salmon 4
+FFA07A Light Salmon 1
+EE9572 Light Salmon 2
+CD8162 Light Salmon 3
+8B5742 Light Salmon 4
+FFA500 Orange 1
+EE9A00 Orange 2
+CD8500 Orange 3
+8B5A00 Orange 4
+FF7F00 Dark Orange 1
+EE7600 Dark Orange 2
+CD6600 Dark Orange 3
+8B4500 Dark Orange 4
+FF7256 Coral 1
+EE6A50 Coral 2
+CD5B45 Coral 3
+8B3E2F Coral 4
+FF6347 Tomato 1
+EE5C42 Tomato 2
+CD4F39 Tomato 3
+8B3626 Tomato 4
+FF4500 Orange Red 1
+EE4000 Orange Red 2
+CD3700 Orange Red 3
+8B2500 Orange Red 4
+FF0000 Red 1
+EE0000 Red 2
+CD0000 Red 3
+8B0000 Red 4
+D70751 Debian Red
+FF1493 Deep Pink 1
+EE1289 Deep Pink 2
+CD1076 Deep Pink 3
+8B0A50 Deep Pink 4
+FF6EB4 Hot Pink 1
+EE6AA7 Hot Pink 2
+CD6090 Hot Pink 3
+8B3A62 Hot Pink 4
+FFB5C5 Pink 1
+EEA9B8 Pink 2
+CD919E Pink 3
+8B636C Pink 4
+FFAEB9 Light Pink 1
+EEA2AD Light Pink 2
+CD8C95 Light Pink 3
+8B5F65 Light Pink 4
+FF82AB Pale Violet Red 1
+EE799F Pale Violet Red 2
+CD6889 Pale Violet Red 3
+8B475D Pale Violet Red 4
+FF34B3 Maroon 1
+EE30A7 Maroon 2
+CD2990 Maroon 3
+8B1C62 Maroon 4
+FF3E96 Violet Red 1
+EE3A8C Violet Red 2
+CD3278 Violet Red 3
+8B2252 Violet Red 4
+FF00FF Magenta 1
+EE00EE Magenta 2
+CD00CD Magenta 3
+8B008B Magenta 4
+FF83FA Orchid 1
+EE7AE9 Orchid 2
+CD69C9 Orchid 3
+8B4789 Orchid 4
+FFBBFF Plum 1
+EEAEEE Plum 2
+CD96CD Plum 3
+8B668B Plum 4
+E066FF Medium Orchid 1
+D15FEE Medium Orchid 2
+B452CD Medium Orchid 3
+7A378B Medium Orchid 4
+BF3EFF Dark Orchid 1
+B23AEE Dark Orchid 2
+9A32CD Dark Orchid 3
+68228B Dark Orchid 4
+9B30FF Purple 1
+912CEE Purple 2
+7D26CD Purple 3
+551A8B Purple 4
+AB82FF Medium Purple 1
+9F79EE Medium Purple 2
+8968CD Medium Purple 3
+5D478B Medium Purple 4
+FFE1FF Thistle 1
+EED2EE Thistle 2
+CDB5CD Thistle 3
+8B7B8B Thistle 4
+000000 Gray 0
+030303 Gray 1
+050505 Gray 2
+080808 Gray 3
+0A0A0A Gray 4
+0D0D0D Gray 5
+0F0F0F Gray 6
+121212 Gray 7
+141414 Gray 8
+171717 Gray 9
+1A1A1A Gray 10
+1C1C1C Gray 11
+1F1F1F Gray 12
+212121 Gray 13
+242424 Gray 14
+262626 Gray 15
+292929 Gray 16
+2B2B2B Gray 17
+2E2E2E Gray 18
+303030 Gray 19
+333333 Gray 20
+363636 Gray 21
+383838 Gray 22
+3B3B3B Gray 23
+3D3D3D Gray 24
+404040 Gray 25
+424242 Gray 26
+454545 Gray 27
+474747 Gray 28
+4A4A4A Gray 29
+4D4D4D Gray 30
+4F4F4F Gray 31
+525252 Gray 32
+545454 Gray 33
+575757 Gray 34
+595959 Gray 35
+5C5C5C Gray 36
+5E5E5E Gray 37
+616161 Gray 38
+636363 Gray 39
+666666 Gray 40
+696969 Gray 41
+6B6B6B Gray 42
+6E6E6E Gray 43
+707070 Gray 44
+737373 Gray 45
+757575 Gray 46
+787878 Gray 47
+7A7A7A Gray 48
+7D7D7D Gray 49
+7F7F7F Gray 50
+828282 Gray 51
+858585 Gray 52
+878787 Gray 53
+8A8A8A Gray 54
+8C8C8C Gray 55
+8F8F8F Gray 56
+919191 Gray 57
+949494 Gray 58
+969696 Gray 59
+999999 Gray 60
+9C9C9C Gray 61
+9E9E9E Gray 62
+A1A1A1 Gray 63
+A3A3A3 Gray 64
+A6A6A6 Gray 65
+A8A8A8 Gray 66
+ABABAB Gray 67
+ADADAD Gray 68
+B0B0B0 Gray 69
+B3B3B3 Gray 70
+B5B5B5 Gray 71
+B8B8B8 Gray 72
+BABABA Gray 73
+BDBDBD Gray 74
+BFBFBF Gray 75
+C2C2C2 Gray 76
+C4C4C4 Gray 77
+C7C7C7 Gray 78
+C9C9C9 Gray 79
+CCCCCC Gray 80
+CFCFCF Gray 81
+D1D1D1 Gray 82
+D4D4D4 Gray 83
+D6D6D6 Gray 84
+D9D9D9 Gray 85
+DBDBDB Gray 86
+DEDEDE Gray 87
+E0E0E0 Gray 88
+E3E3E3 Gray 89
+E5E5E5 Gray 90
+E8E8E8 Gray 91
+EBEBEB Gray 92
+EDEDED Gray 93
+F0F0F0 Gray 94
+F2F2F2 Gray 95
+F5F5F5 Gray 96
+F7F7F7 Gray 97
+FAFAFA Gray 98
+FCFCFC Gray 99
+FFFFFF Gray 100
+"""
@@ -0,0 +1,46 @@
+"""Name the closest named color to any RGB value.
+
+The names are bundled in color_name_data. They are indexed once, on first
+use, in the same CIELAB grid the preview uses to find the closest favorite,
+and lookups are cached by RGB value. Moving the cursor over one color costs
+a dict lookup per frame, and a cache miss walks a few grid cells.
+"""
+import functools
+
+from color_index import NearestColorIndex
+
+# RGB values remembered; a preview session rarely sees more distinct colors than this
+CACHE_SIZE = 4096
+
+# Below this delta E two colors are hard to tell apart, so the name is exact enough
+EXACT_DELTA_E = 1.0
+
+
+def named_colors():
+    """Return the bundled (name, (r, g, b)) pairs in dictionary order"""
+    from color_name_data import NAMED_COLORS
+
+    entries = []
+    for line in NAMED_COLORS.splitlines():
+        code, _, name = line.partition(' ')
+        entries.append((name, (int(code[0:2], 16), int(code[2:4], 16), int(code[4:6], 16))))
+    return entries
+
+
+@functools.lru_cache(maxsize=None)
+def _index():
+    index = NearestColorIndex()
+    index.rebuild((name, rgb, name) for name, rgb in named_colors())
+    return index
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def nearest_name(rgb):
+    """Return (name, delta_e) of the named color closest to an (r, g, b) tuple"""
+    return _index().nearest(rgb)
+
+
+def describe(rgb):
+    """A short caption for a color: its name, marked ≈ when only approximate"""
+    name, distance = nearest_name(rgb)
+    return name if distance < EXACT_DELTA_E else f"≈ {name}"
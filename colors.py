@@ -0,0 +1,424 @@
+"""Color conversions shared by the picker, favorites and palette tools.
+
+Every conversion comes in two forms. The scalar functions take and return
+plain tuples and only need the standard library, so the GUI can import this
+module at startup. The `*_array` functions take numpy arrays shaped
+(..., 3) and convert millions of colors per call; numpy is imported the
+first time one of them runs.
+
+RGB values are 0-255 channels. Array inputs are rounded to 8 bits, so the
+sRGB transfer function and the luminance weights are table lookups instead
+of per-pixel powers. Hue is in degrees (0-360); saturation, value and
+lightness are 0-1. CIELAB uses the D65 white point; OKLab is Björn
+Ottosson's perceptual space.
+"""
+import colorsys
+import functools
+
+# Linear sRGB to XYZ, and its inverse
+_RGB_TO_XYZ = (
+    (0.4124564, 0.3575761, 0.1804375),
+    (0.2126729, 0.7151522, 0.0721750),
+    (0.0193339, 0.1191920, 0.9503041),
+)
+_XYZ_TO_RGB = (
+    (3.2404542, -1.5371385, -0.4985314),
+    (-0.9692660, 1.8760108, 0.0415560),
+    (0.0556434, -0.2040259, 1.0572252),
+)
+_D65_WHITE = (0.95047, 1.0, 1.08883)
+_LAB_EPSILON = 216.0 / 24389.0
+_LAB_KAPPA = 24389.0 / 27.0
+
+# Linear sRGB to LMS cone response, LMS' to OKLab, and their inverses
+_RGB_TO_LMS = (
+    (0.4122214708, 0.5363325363, 0.0514459929),
+    (0.2119034982, 0.6806995451, 0.1073969566),
+    (0.0883024619, 0.2817188376, 0.6299787005),
+)
+_LMS_TO_OKLAB = (
+    (0.2104542553, 0.7936177850, -0.0040720468),
+    (1.9779984951, -2.4285922050, 0.4505937099),
+    (0.0259040371, 0.7827717662, -0.8086757660),
+)
+_OKLAB_TO_LMS = (
+    (1.0, 0.3963377774, 0.2158037573),
+    (1.0, -0.1055613458, -0.0638541728),
+    (1.0, -0.0894841775, -1.2914855480),
+)
+_LMS_TO_RGB = (
+    (4.0767416621, -3.3077115913, 0.2309699292),
+    (-1.2684380046, 2.6097574011, -0.3413193965),
+    (-0.0041960863, -0.7034186147, 1.7076147010),
+)
+
+# Weights for WCAG relative luminance (linear) and perceived brightness (gamma encoded)
+_LUMINANCE_WEIGHTS = (0.2126, 0.7152, 0.0722)
+_BRIGHTNESS_WEIGHTS = (299, 587, 114)  # Per mille, so the dark test stays in integers
+_DARK_THRESHOLD = 1000 * 255 // 2
+
+
+def _decode(c):
+    c = c / 255.0
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+def _encode(v):
+    v = 12.92 * v if v <= 0.0031308 else 1.055 * v ** (1.0 / 2.4) - 0.055
+    return min(255, max(0, round(v * 255.0)))
+
+
+# sRGB transfer function for every 8-bit channel value
+_LINEAR = tuple(_decode(c) for c in range(256))
+
+
+def _mul(matrix, v):
+    return tuple(row[0] * v[0] + row[1] * v[1] + row[2] * v[2] for row in matrix)
+
+
+def _cbrt(v):
+    return v ** (1.0 / 3.0) if v >= 0 else -((-v) ** (1.0 / 3.0))
+
+
+def _lab_f(t):
+    return t ** (1.0 / 3.0) if t > _LAB_EPSILON else (_LAB_KAPPA * t + 16.0) / 116.0
+
+
+def _lab_f_inverse(f):
+    t = f ** 3
+    return t if t > _LAB_EPSILON else (116.0 * f - 16.0) / _LAB_KAPPA
+
+
+def _channel(c):
+    # 8-bit channel values index the table; anything else uses the formula
+    return _LINEAR[c] if isinstance(c, int) and 0 <= c <= 255 else _decode(c)
+
+
+# Scalar conversions
+
+def hex_to_rgb(hex_color):
+    """Convert '#RRGGBB' (or 'RRGGBB') to an (r, g, b) tuple of ints"""
+    hex_color = hex_color.lstrip('#')
+    if len(hex_color) != 6:
+        raise ValueError(f"Not a #RRGGBB color: {hex_color!r}")
+    return int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
+
+
+def rgb_to_hex(rgb):
+    """Convert (r, g, b) to a lower-case '#rrggbb' string"""
+    return '#{:02x}{:02x}{:02x}'.format(int(rgb[0]), int(rgb[1]), int(rgb[2]))
+
+
+def srgb_to_linear(rgb):
+    """Convert sRGB (r, g, b) to linear-light channels in 0-1"""
+    return tuple(_channel(c) for c in rgb[:3])
+
+
+def linear_to_srgb(linear):
+    """Convert linear-light channels in 0-1 to 8-bit sRGB (r, g, b)"""
+    return tuple(_encode(v) for v in linear[:3])
+
+
+def rgb_to_hsv(rgb):
+    """Convert (r, g, b) to (hue, saturation, value)"""
+    h, s, v = colorsys.rgb_to_hsv(rgb[0] / 255.0, rgb[1] / 255.0, rgb[2] / 255.0)
+    return h * 360.0, s, v
+
+
+def hsv_to_rgb(hsv):
+    """Convert (hue, saturation, value) to (r, g, b)"""
+    r, g, b = colorsys.hsv_to_rgb((hsv[0] % 360.0) / 360.0, hsv[1], hsv[2])
+    return round(r * 255.0), round(g * 255.0), round(b * 255.0)
+
+
+def rgb_to_hsl(rgb):
+    """Convert (r, g, b) to (hue, saturation, lightness)"""
+    h, l, s = colorsys.rgb_to_hls(rgb[0] / 255.0, rgb[1] / 255.0, rgb[2] / 255.0)
+    return h * 360.0, s, l
+
+
+def hsl_to_rgb(hsl):
+    """Convert (hue, saturation, lightness) to (r, g, b)"""
+    r, g, b = colorsys.hls_to_rgb((hsl[0] % 360.0) / 360.0, hsl[2], hsl[1])
+    return round(r * 255.0), round(g * 255.0), round(b * 255.0)
+
+
+def rgb_to_lab(rgb):
+    """Convert sRGB (r, g, b) to CIELAB (L, a, b) under D65"""
+    x, y, z = _mul(_RGB_TO_XYZ, srgb_to_linear(rgb))
+    fx = _lab_f(x / _D65_WHITE[0])
+    fy = _lab_f(y / _D65_WHITE[1])
+    fz = _lab_f(z / _D65_WHITE[2])
+    return 116.0 * fy - 16.0, 500.0 * (fx - fy), 200.0 * (fy - fz)
+
+
+def lab_to_rgb(lab):
+    """Convert CIELAB (L, a, b) under D65 to sRGB (r, g, b), clipped to the gamut"""
+    fy = (lab[0] + 16.0) / 116.0
+    fx = fy + lab[1] / 500.0
+    fz = fy - lab[2] / 200.0
+    xyz = (_lab_f_inverse(fx) * _D65_WHITE[0],
+           _lab_f_inverse(fy) * _D65_WHITE[1],
+           _lab_f_inverse(fz) * _D65_WHITE[2])
+    return linear_to_srgb(_mul(_XYZ_TO_RGB, xyz))
+
+
+def rgb_to_oklab(rgb):
+    """Convert sRGB (r, g, b) to OKLab (L, a, b)"""
+    lms = tuple(_cbrt(v) for v in _mul(_RGB_TO_LMS, srgb_to_linear(rgb)))
+    return _mul(_LMS_TO_OKLAB, lms)
+
+
+def oklab_to_rgb(lab):
+    """Convert OKLab (L, a, b) to sRGB (r, g, b), clipped to the gamut"""
+    lms = tuple(v ** 3 for v in _mul(_OKLAB_TO_LMS, lab))
+    return linear_to_srgb(_mul(_LMS_TO_RGB, lms))
+
+
+def relative_luminance(rgb):
+    """WCAG relative luminance of (r, g, b), from 0 (black) to 1 (white)"""
+    r, g, b = srgb_to_linear(rgb)
+    return _LUMINANCE_WEIGHTS[0] * r + _LUMINANCE_WEIGHTS[1] * g + _LUMINANCE_WEIGHTS[2] * b
+
+
+def contrast_ratio(rgb1, rgb2):
+    """WCAG contrast ratio between two colors, from 1 to 21"""
+    l1, l2 = relative_luminance(rgb1), relative_luminance(rgb2)
+    if l1 < l2:
+        l1, l2 = l2, l1
+    return (l1 + 0.05) / (l2 + 0.05)
+
+
+def perceived_brightness(rgb):
+    """Perceived brightness of (r, g, b) from 0 to 1, weighting channels by how bright they look"""
+    w = _BRIGHTNESS_WEIGHTS
+    return (w[0] * rgb[0] + w[1] * rgb[1] + w[2] * rgb[2]) / (1000.0 * 255.0)
+
+
+def is_dark(rgb):
+    """True if a color is dark enough to need white text on it"""
+    w = _BRIGHTNESS_WEIGHTS
+    return w[0] * rgb[0] + w[1] * rgb[1] + w[2] * rgb[2] < _DARK_THRESHOLD
+
+
+# Batch conversions
+
+@functools.lru_cache(maxsize=None)
+def _tables():
+    """Lookup tables for the array conversions, built on first use"""
+    import numpy as np
+
+    linear = np.array(_LINEAR, dtype=np.float64)
+    hex_digits = np.full(256, 255, dtype=np.uint8)  # 255 marks a byte that is not a hex digit
+    for value, digit in enumerate('0123456789ABCDEF'):
+        hex_digits[ord(digit)] = value
+        hex_digits[ord(digit.lower())] = value
+
+    return {
+        'linear': linear,
+        # Per-channel weighted values, so a color's total is three lookups and two adds
+        'luminance': linear[:, None] * np.array(_LUMINANCE_WEIGHTS),
+        'brightness': np.arange(256, dtype=np.int32)[:, None] * np.array(_BRIGHTNESS_WEIGHTS, dtype=np.int32),
+        'hex_digits': hex_digits,
+        'hex_pairs': np.frombuffer(''.join('{:02x}'.format(i) for i in range(256)).encode('ascii'),
+                                   dtype=np.uint8).reshape(256, 2),
+    }
+
+
+def _as_rgb8(rgb):
+    # Round to 8-bit channels so they can index the lookup tables
+    import numpy as np
+
+    rgb = np.asarray(rgb)
+    if rgb.shape[-1:] != (3,):
+        raise ValueError(f"Expected an array of (r, g, b) colors, got shape {rgb.shape}")
+    if rgb.dtype == np.uint8:
+        return rgb
+    if rgb.dtype.kind == 'f':
+        rgb = np.rint(rgb)
+    return np.clip(rgb, 0, 255).astype(np.uint8)
+
+
+def _encode_array(linear):
+    import numpy as np
+
+    linear = np.clip(linear, 0.0, 1.0)
+    srgb = np.where(linear <= 0.0031308, 12.92 * linear, 1.055 * np.power(linear, 1.0 / 2.4) - 0.055)
+    return np.rint(srgb * 255.0).astype(np.uint8)
+
+
+def _weighted_sum(table, rgb):
+    return table[rgb[..., 0], 0] + table[rgb[..., 1], 1] + table[rgb[..., 2], 2]
+
+
+def _apply(matrix, values):
+    import numpy as np
+    return values @ np.array(matrix).T
+
+
+def hex_to_rgb_array(hex_codes):
+    """Convert a sequence of '#RRGGBB' (or 'RRGGBB') strings to an (n, 3) uint8 array"""
+    import numpy as np
+
+    hex_codes = list(hex_codes)
+    count = len(hex_codes)
+    buf = np.frombuffer(''.join(hex_codes).encode('ascii'), dtype=np.uint8)
+
+    # Normalised codes all have the '#'; otherwise strip it code by code
+    if buf.size == 7 * count and (buf[::7] == ord('#')).all():
+        digits = buf.reshape(count, 7)[:, 1:]
+    else:
+        stripped = [code.lstrip('#') for code in hex_codes]
+        bad = next((code for code in stripped if len(code) != 6), None)
+        if bad is not None:
+            raise ValueError(f"Not a #RRGGBB color: {bad!r}")
+        digits = np.frombuffer(''.join(stripped).encode('ascii'), dtype=np.uint8).reshape(count, 6)
+
+    values = _tables()['hex_digits'][digits]
+    if (values > 15).any():
+        row = int((values > 15).any(axis=1).argmax())
+        raise ValueError(f"Not a #RRGGBB color: {hex_codes[row]!r}")
+    return values[:, 0::2] * 16 + values[:, 1::2]
+
+
+def rgb_to_hex_array(rgb):
+    """Convert an array of (r, g, b) colors to a list of lower-case '#rrggbb' strings"""
+    import numpy as np
+
+    rgb = _as_rgb8(rgb).reshape(-1, 3)
+    count = len(rgb)
+    out = np.empty((count, 7), dtype=np.uint8)
+    out[:, 0] = ord('#')
+    out[:, 1:] = _tables()['hex_pairs'][rgb].reshape(count, 6)
+    text = out.tobytes().decode('ascii')
+    return [text[i:i + 7] for i in range(0, 7 * count, 7)]
+
+
+def srgb_to_linear_array(rgb):
+    """Convert sRGB colors to linear-light channels in 0-1 (one table lookup per channel)"""
+    return _tables()['linear'][_as_rgb8(rgb)]
+
+
+def linear_to_srgb_array(linear):
+    """Convert linear-light channels in 0-1 to 8-bit sRGB"""
+    return _encode_array(linear)
+
+
+def _hue(rgb, high, delta):
+    # Hue in degrees from the channel holding the maximum
+    import numpy as np
+
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    safe = np.where(delta == 0, 1.0, delta)
+    hue = np.where(high == r, ((g - b) / safe) % 6.0,
+                   np.where(high == g, (b - r) / safe + 2.0, (r - g) / safe + 4.0))
+    return np.where(delta == 0, 0.0, hue * 60.0)
+
+
+def rgb_to_hsv_array(rgb):
+    """Convert an array of (r, g, b) colors to (hue, saturation, value)"""
+    import numpy as np
+
+    rgb = _as_rgb8(rgb) / 255.0
+    high, low = rgb.max(axis=-1), rgb.min(axis=-1)
+    delta = high - low
+    saturation = np.divide(delta, high, out=np.zeros_like(high), where=high > 0)
+    return np.stack((_hue(rgb, high, delta), saturation, high), axis=-1)
+
+
+def hsv_to_rgb_array(hsv):
+    """Convert an array of (hue, saturation, value) colors to 8-bit (r, g, b)"""
+    import numpy as np
+
+    hsv = np.asarray(hsv, dtype=np.float64)
+    h, s, v = (hsv[..., i, None] for i in range(3))
+    k = (np.array([5.0, 3.0, 1.0]) + (h % 360.0) / 60.0) % 6.0
+    rgb = v - v * s * np.clip(np.minimum(k, 4.0 - k), 0.0, 1.0)
+    return np.rint(np.clip(rgb, 0.0, 1.0) * 255.0).astype(np.uint8)
+
+
+def rgb_to_hsl_array(rgb):
+    """Convert an array of (r, g, b) colors to (hue, saturation, lightness)"""
+    import numpy as np
+
+    rgb = _as_rgb8(rgb) / 255.0
+    high, low = rgb.max(axis=-1), rgb.min(axis=-1)
+    delta = high - low
+    lightness = (high + low) / 2.0
+    spread = 1.0 - np.abs(2.0 * lightness - 1.0)
+    saturation = np.divide(delta, spread, out=np.zeros_like(delta), where=delta > 0)
+    return np.stack((_hue(rgb, high, delta), saturation, lightness), axis=-1)
+
+
+def hsl_to_rgb_array(hsl):
+    """Convert an array of (hue, saturation, lightness) colors to 8-bit (r, g, b)"""
+    import numpy as np
+
+    hsl = np.asarray(hsl, dtype=np.float64)
+    h, s, l = (hsl[..., i, None] for i in range(3))
+    k = (np.array([0.0, 8.0, 4.0]) + (h % 360.0) / 30.0) % 12.0
+    a = s * np.minimum(l, 1.0 - l)
+    rgb = l - a * np.clip(np.minimum(k - 3.0, 9.0 - k), -1.0, 1.0)
+    return np.rint(np.clip(rgb, 0.0, 1.0) * 255.0).astype(np.uint8)
+
+
+def rgb_to_lab_array(rgb):
+    """Convert an array of sRGB colors to CIELAB (L, a, b) under D65"""
+    import numpy as np
+
+    xyz = _apply(_RGB_TO_XYZ, srgb_to_linear_array(rgb)) / np.array(_D65_WHITE)
+    f = np.where(xyz > _LAB_EPSILON, np.cbrt(xyz), (_LAB_KAPPA * xyz + 16.0) / 116.0)
+    fx, fy, fz = f[..., 0], f[..., 1], f[..., 2]
+    return np.stack((116.0 * fy - 16.0, 500.0 * (fx - fy), 200.0 * (fy - fz)), axis=-1)
+
+
+def lab_to_rgb_array(lab):
+    """Convert an array of CIELAB colors under D65 to 8-bit sRGB, clipped to the gamut"""
+    import numpy as np
+
+    lab = np.asarray(lab, dtype=np.float64)
+    fy = (lab[..., 0] + 16.0) / 116.0
+    f = np.stack((fy + lab[..., 1] / 500.0, fy, fy - lab[..., 2] / 200.0), axis=-1)
+    cubed = f ** 3
+    xyz = np.where(cubed > _LAB_EPSILON, cubed, (116.0 * f - 16.0) / _LAB_KAPPA) * np.array(_D65_WHITE)
+    return _encode_array(_apply(_XYZ_TO_RGB, xyz))
+
+
+def rgb_to_oklab_array(rgb):
+    """Convert an array of sRGB colors to OKLab (L, a, b)"""
+    import numpy as np
+
+    lms = np.cbrt(_apply(_RGB_TO_LMS, srgb_to_linear_array(rgb)))
+    return _apply(_LMS_TO_OKLAB, lms)
+
+
+def oklab_to_rgb_array(lab):
+    """Convert an array of OKLab colors to 8-bit sRGB, clipped to the gamut"""
+    import numpy as np
+
+    lms = _apply(_OKLAB_TO_LMS, np.asarray(lab, dtype=np.float64)) ** 3
+    return _encode_array(_apply(_LMS_TO_RGB, lms))
+
+
+def relative_luminance_array(rgb):
+    """WCAG relative luminance of each color in an array"""
+    return _weighted_sum(_tables()['luminance'], _as_rgb8(rgb))
+
+
+def contrast_ratio_array(rgb1, rgb2):
+    """WCAG contrast ratios between two arrays of colors (broadcast against each other)"""
+    import numpy as np
+
+    l1 = relative_luminance_array(rgb1)
+    l2 = relative_luminance_array(rgb2)
+    return (np.maximum(l1, l2) + 0.05) / (np.minimum(l1, l2) + 0.05)
+
+
+def perceived_brightness_array(rgb):
+    """Perceived brightness (0-1) of each color in an array"""
+    return _weighted_sum(_tables()['brightness'], _as_rgb8(rgb)) / (1000.0 * 255.0)
+
+
+def is_dark_array(rgb):
+    """Boolean array, True where a color needs white text on it"""
+    return _weighted_sum(_tables()['brightness'], _as_rgb8(rgb)) < _DARK_THRESHOLD
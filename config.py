@@ -0,0 +1,145 @@
+"""Application configuration and data-directory resolution."""
+import json
+import os
+import threading
+import time
+
+# config.json lives next to the application
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+
+# Settings used when config.json does not set them
+DEFAULTS = {
+    'data_dir': None,
+    'hotkey': 'f2',
+    'preview_rate': 60,
+    'sample_size': 1,
+    'sample_method': 'mean',
+    'magnifier': False,
+    'magnifier_grid_size': 11,
+    'magnifier_zoom': 8,
+    'record_rate': 30,
+    'record_buffer': 10000,
+    'region_top_colors': 10,
+    'region_bits': 5,
+    'image_tile_cache': 256,
+    'server_enabled': False,
+    'server_port': 8765,
+    'server_cache_ms': 0,
+    'capture_backend': 'auto',
+    'diagnostics': False,
+}
+
+
+class Config:
+    """Settings from config.json, read once and cached in memory.
+
+    The file is only read again when this process changes it through
+    `update`, or when its modification time changes. The mtime is checked
+    at most once every `check_interval` seconds, so looking up a setting
+    normally does not touch the filesystem.
+    """
+
+    def __init__(self, path=CONFIG_PATH, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._values = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._data_dir = None
+
+    def get(self, key):
+        """Return a setting, falling back to its default"""
+        with self._lock:
+            self._refresh()
+            return self._values.get(key, DEFAULTS.get(key))
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def update(self, **values):
+        """Change settings and write config.json, keeping settings not mentioned"""
+        with self._lock:
+            self._refresh()
+            settings = dict(self._values)
+            settings.update(values)
+
+            # Write to a temporary file and rename so readers never see half a file
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(settings, f, indent=2)
+            os.replace(temp_path, self.path)
+
+            self._set(settings, self._stat())
+
+    def invalidate(self):
+        """Forget the cached settings so the next lookup reads the file"""
+        with self._lock:
+            self._values = None
+
+    def data_directory(self):
+        """Get the directory to store application data (resolved once per config change)"""
+        with self._lock:
+            self._refresh()
+            if self._data_dir is None:
+                self._data_dir = self._resolve_data_directory(self._values.get('data_dir'))
+            return self._data_dir
+
+    def _refresh(self):
+        # Reload on first use, after invalidate() or when the file changed on disk
+        now = time.monotonic()
+        if self._values is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        mtime = self._stat()
+        if self._values is not None and mtime == self._mtime:
+            return
+
+        settings = {}
+        if mtime is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    settings = json.load(f)
+            except Exception as e:
+                print(f"Error reading config: {e}")
+        self._set(settings, mtime)
+
+    def _set(self, settings, mtime):
+        self._values = settings
+        self._mtime = mtime
+        self._checked_at = time.monotonic()
+        self._data_dir = None
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _resolve_data_directory(configured):
+        # Use the configured directory if it exists
+        if configured and os.path.exists(configured):
+            return configured
+
+        # Use AppData on Windows as fallback
+        appdata = os.getenv('APPDATA')
+        if appdata:
+            data_dir = os.path.join(appdata, "ColorPickerTool")
+        else:
+            # Fallback to user's home directory
+            data_dir = os.path.join(os.path.expanduser("~"), ".colorpickertool")
+
+        # Create directory if it doesn't exist
+        os.makedirs(data_dir, exist_ok=True)
+        return data_dir
+
+
+# Shared instance used by the application
+config = Config()
+
+
+def get_data_directory():
+    """Get the directory to store application data."""
+    return config.data_directory()
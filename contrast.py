@@ -0,0 +1,207 @@
+"""WCAG contrast ratios between many colors at once.
+
+A few thousand favorites make millions of pairs, so ratios are computed
+with numpy a block of rows at a time: each block is at most `max_cells`
+ratios, which bounds memory whatever the number of colors. Luminances are
+computed once per color up front.
+
+    python color-picker.py contrast --level AA --failing -o failing.csv
+"""
+import argparse
+import csv
+import io
+import sys
+
+import numpy as np
+
+from colors import hex_to_rgb_array, relative_luminance_array
+
+# WCAG 2 minimum contrast ratios, in the order reports list them
+LEVELS = (
+    ('AA', 4.5),
+    ('AA large', 3.0),
+    ('AAA', 7.0),
+    ('AAA large', 4.5),
+)
+
+# Ratios per block; 4M float64 values is 32 MB
+MAX_CELLS = 4000000
+
+CSV_HEADER = ["foreground_label", "foreground_hex", "background_label", "background_hex",
+              "ratio", "aa", "aa_large", "aaa", "aaa_large"]
+
+
+# Distinct minimums; how many of them a ratio reaches decides every level's pass/fail
+_STEPS = sorted({minimum for _, minimum in LEVELS})
+
+# The trailing pass/fail CSV columns for each number of steps reached
+_PASS_COLUMNS = [','.join('pass' if minimum <= reached else 'fail' for _, minimum in LEVELS)
+                 for reached in [0.0] + _STEPS]
+
+
+class ContrastMatrix:
+    """Contrast ratios between foreground and background colors.
+
+    Both sides are lists of (label, hex) pairs. Without a background list
+    every pair of foreground colors is compared once, as the ratio is the
+    same either way round and a color against itself is always 1:1.
+    """
+
+    def __init__(self, foreground, background=None, max_cells=MAX_CELLS):
+        self.foreground = list(foreground)
+        self.symmetric = background is None
+        self.background = self.foreground if self.symmetric else list(background)
+        self.max_cells = max_cells
+        self._fg = self._luminances(self.foreground)
+        self._bg = self._fg if self.symmetric else self._luminances(self.background)
+
+    @staticmethod
+    def _luminances(entries):
+        if not entries:
+            return np.zeros(0)
+        return relative_luminance_array(hex_to_rgb_array([hex_code for _, hex_code in entries])) + 0.05
+
+    @property
+    def pairs(self):
+        n, m = len(self.foreground), len(self.background)
+        return n * (n - 1) // 2 if self.symmetric else n * m
+
+    def _blocks(self):
+        # Yield (first row, first column, ratios, valid) for blocks of rows; in the
+        # symmetric case valid masks out the pairs on or below the diagonal
+        n, m = len(self._fg), len(self._bg)
+        if not n or not m:
+            return
+        rows_per_block = max(1, self.max_cells // m)
+        for start in range(0, n, rows_per_block):
+            end = min(n, start + rows_per_block)
+            first_column = start + 1 if self.symmetric else 0
+            if first_column >= m:
+                break
+            fg = self._fg[start:end, None]
+            bg = self._bg[None, first_column:]
+            # Luminances already include the +0.05 offset
+            ratios = np.maximum(fg, bg) / np.minimum(fg, bg)
+            valid = None
+            if self.symmetric:
+                valid = np.arange(first_column, m)[None, :] > np.arange(start, end)[:, None]
+            yield start, first_column, ratios, valid
+
+    def summary(self):
+        """Count the pairs passing each level: {"pairs": n, "AA": passing, ...}"""
+        counts = {"pairs": self.pairs}
+        counts.update((name, 0) for name, _ in LEVELS)
+        for _, _, ratios, valid in self._blocks():
+            for name, minimum in LEVELS:
+                passing = ratios >= minimum
+                if valid is not None:
+                    passing &= valid
+                counts[name] += int(np.count_nonzero(passing))
+        return counts
+
+    def select(self, level=None, passing=True):
+        """Yield (rows, columns, ratios) arrays, a block at a time, for the pairs that
+        pass (or fail) a level. rows and columns index the foreground and background
+        lists. level None selects every pair.
+        """
+        minimum = dict(LEVELS)[level] if level is not None else None
+        for start, first_column, ratios, valid in self._blocks():
+            if minimum is None:
+                keep = valid if valid is not None else np.ones(ratios.shape, dtype=bool)
+            else:
+                keep = ratios >= minimum if passing else ratios < minimum
+                if valid is not None:
+                    keep &= valid
+            rows, columns = np.nonzero(keep)
+            if len(rows):
+                yield rows + start, columns + first_column, ratios[rows, columns]
+
+    def pairs_list(self, level=None, passing=True, limit=1000):
+        """Up to `limit` selected pairs as (fg entry, bg entry, ratio), highest contrast first"""
+        kept = None
+        for block in self.select(level, passing):
+            merged = block if kept is None else tuple(np.concatenate(parts) for parts in zip(kept, block))
+            if len(merged[2]) > limit:
+                # Keep only the best `limit` so far; memory stays at one block plus the list
+                best = np.argpartition(-merged[2], limit - 1)[:limit]
+                merged = tuple(part[best] for part in merged)
+            kept = merged
+        if kept is None:
+            return []
+        order = np.argsort(-kept[2], kind='stable')
+        return [(self.foreground[i], self.background[j], float(r))
+                for i, j, r in zip(kept[0][order].tolist(), kept[1][order].tolist(), kept[2][order].tolist())]
+
+    def write_csv(self, path, level=None, passing=True):
+        """Write the selected pairs to a CSV file, a block at a time; return the rows written"""
+        # Quote each color's label and hex once rather than once per pair
+        fg_cells = self._csv_cells(self.foreground)
+        bg_cells = fg_cells if self.symmetric else self._csv_cells(self.background)
+        written = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(CSV_HEADER)
+            for rows, columns, ratios in self.select(level, passing):
+                steps = np.searchsorted(_STEPS, ratios, side='right')
+                f.write(''.join(f"{fg_cells[i]},{bg_cells[j]},{r:.2f},{_PASS_COLUMNS[k]}\r\n"
+                                for i, j, r, k in zip(rows.tolist(), columns.tolist(), ratios.tolist(),
+                                                      steps.tolist())))
+                written += len(ratios)
+        return written
+
+    @staticmethod
+    def _csv_cells(entries):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='')
+        cells = []
+        for label, hex_code in entries:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([label, hex_code])
+            cells.append(buffer.getvalue())
+        return cells
+
+
+def main(argv=None):
+    from config import get_data_directory
+    from favorites import FavoritesModel, FavoritesStore
+
+    parser = argparse.ArgumentParser(description="Report WCAG contrast between favorites.")
+    parser.add_argument('--level', choices=[name for name, _ in LEVELS],
+                        help="Only export pairs that pass this level (or fail it, with --failing)")
+    parser.add_argument('--failing', action='store_true', help="Export the pairs failing --level")
+    parser.add_argument('--foreground', nargs='+', metavar='HEX',
+                        help="Compare these colors against the favorites instead of all pairs of favorites")
+    parser.add_argument('-o', '--output', help="Write the selected pairs here as CSV")
+    parser.add_argument('--data-dir', help="Favorites directory (default: the app's)")
+    args = parser.parse_args(argv)
+
+    favorites = FavoritesModel()
+    try:
+        FavoritesStore(args.data_dir or get_data_directory()).load(favorites)
+    except OSError as e:
+        print(f"Could not read favorites: {e}", file=sys.stderr)
+        return 1
+    entries = [(favorite["label"], favorite["hex"]) for _, favorite in favorites]
+    try:
+        if args.foreground:
+            matrix = ContrastMatrix([(code, code) for code in args.foreground], entries)
+        else:
+            matrix = ContrastMatrix(entries)
+    except ValueError as e:
+        print(f"Invalid color: {e}", file=sys.stderr)
+        return 1
+
+    summary = matrix.summary()
+    print(f"{summary['pairs']} pairs", file=sys.stderr)
+    for name, minimum in LEVELS:
+        print(f"  {name:<10} (>= {minimum}:1)  {summary[name]} pass, {summary['pairs'] - summary[name]} fail",
+              file=sys.stderr)
+
+    if args.output:
+        written = matrix.write_csv(args.output, args.level, not args.failing)
+        print(f"Wrote {written} pairs to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
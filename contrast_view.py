@@ -0,0 +1,173 @@
+"""Favorites > Contrast Report window: WCAG contrast between favorites."""
+import threading
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+from contrast import LEVELS, ContrastMatrix
+
+# Pairs shown in the list; the CSV export has all of them
+SHOWN_PAIRS = 500
+
+COLOR_SETS = ("All favorites", "Selected favorites")
+
+# Filter choices: label -> (level, passing)
+FILTERS = {"All pairs": (None, True)}
+FILTERS.update((f"{'Pass' if passing else 'Fail'} {name} ({minimum}:1)", (name, passing))
+               for name, minimum in LEVELS for passing in (True, False))
+DEFAULT_FILTER = "Fail AA (4.5:1)"
+
+
+class ContrastWindow:
+    """Summarizes and lists contrast ratios; the work runs on a worker thread.
+
+    `entries(selected)` returns the favorites to compare as (label, hex)
+    pairs: all of them, or just the ones selected in the list.
+    """
+
+    def __init__(self, master, entries):
+        self.master = master
+        self.entries = entries
+        self.matrix = None
+        self._running = False
+
+        self.window = tk.Toplevel(master)
+        self.window.title("Contrast Report")
+        self.window.protocol("WM_DELETE_WINDOW", self.window.withdraw)
+
+        options = ttk.Frame(self.window)
+        options.pack(fill=tk.X, padx=10, pady=(10, 5))
+        self.foreground_var = tk.StringVar(value=COLOR_SETS[0])
+        self.background_var = tk.StringVar(value=COLOR_SETS[0])
+        self.filter_var = tk.StringVar(value=DEFAULT_FILTER)
+        for column, (text, variable, values) in enumerate((
+                ("Text", self.foreground_var, COLOR_SETS),
+                ("Background", self.background_var, COLOR_SETS),
+                ("Show", self.filter_var, list(FILTERS)))):
+            ttk.Label(options, text=text).grid(row=0, column=2 * column, padx=(0 if column == 0 else 10, 5))
+            ttk.Combobox(options, textvariable=variable, values=values, state="readonly",
+                         width=20).grid(row=0, column=2 * column + 1)
+        ttk.Button(options, text="Run", command=self.run).grid(row=0, column=6, padx=(10, 0))
+
+        self.summary_var = tk.StringVar(value="Choose the colors to compare and press Run.")
+        tk.Label(self.window, textvariable=self.summary_var, font=("Arial", 10), justify="left").pack(
+            anchor="w", padx=10, pady=5)
+
+        list_frame = ttk.Frame(self.window)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        scrollbar = ttk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        columns = ("Text", "Background", "Ratio")
+        self.table = ttk.Treeview(list_frame, columns=columns, show="headings", height=15,
+                                  yscrollcommand=scrollbar.set)
+        for column in columns:
+            self.table.heading(column, text=column)
+            self.table.column(column, width=80 if column == "Ratio" else 220,
+                              anchor="e" if column == "Ratio" else "w")
+        self.table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.table.yview)
+
+        buttons = ttk.Frame(self.window)
+        buttons.pack(fill=tk.X, padx=10, pady=10)
+        self.export_button = ttk.Button(buttons, text="Export CSV...", command=self.export, state="disabled")
+        self.export_button.pack(side=tk.RIGHT)
+
+    def show(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def build_matrix(self):
+        foreground = self.entries(self.foreground_var.get() == COLOR_SETS[1])
+        if self.foreground_var.get() == self.background_var.get():
+            # The same set on both sides: compare each pair once
+            return ContrastMatrix(foreground)
+        return ContrastMatrix(foreground, self.entries(self.background_var.get() == COLOR_SETS[1]))
+
+    def run(self):
+        if self._running:
+            return
+        try:
+            matrix = self.build_matrix()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid color: {e}", parent=self.window)
+            return
+        if not matrix.pairs:
+            self.summary_var.set("Nothing to compare: choose at least two colors.")
+            return
+
+        level, passing = FILTERS[self.filter_var.get()]
+        self._running = True
+        self.export_button.config(state="disabled")
+        self.summary_var.set(f"Comparing {matrix.pairs:,} pairs...")
+
+        def compute():
+            try:
+                result = (matrix.summary(), matrix.pairs_list(level, passing, SHOWN_PAIRS))
+            except Exception as e:
+                result = e
+            self.post(self.show_result, matrix, result)
+
+        threading.Thread(target=compute, name="contrast-report", daemon=True).start()
+
+    def post(self, callback, *args):
+        # Called from a worker thread; hand the result to the Tk loop
+        try:
+            self.master.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):
+            pass  # The window is closing
+
+    def show_result(self, matrix, result):
+        self._running = False
+        if isinstance(result, Exception):
+            self.summary_var.set(f"Contrast report failed: {result}")
+            return
+        summary, pairs = result
+        self.matrix = matrix
+        self.export_button.config(state="normal")
+
+        total = summary["pairs"]
+        lines = [f"{total:,} pairs"]
+        for name, minimum in LEVELS:
+            lines.append(f"{name} ({minimum}:1): {summary[name]:,} pass, {total - summary[name]:,} fail")
+        self.summary_var.set("\n".join(lines))
+
+        # Each row is drawn in its own text and background colors
+        self.table.delete(*self.table.get_children())
+        for (fg_label, fg_hex), (bg_label, bg_hex), ratio in pairs:
+            tag = f"{fg_hex}_on_{bg_hex}"
+            self.table.tag_configure(tag, foreground=fg_hex, background=bg_hex)
+            self.table.insert("", "end", tags=(tag,),
+                              values=(f"{fg_label} {fg_hex}", f"{bg_label} {bg_hex}", f"{ratio:.2f}"))
+        if len(pairs) == SHOWN_PAIRS:
+            lines.append(f"Showing the {SHOWN_PAIRS} highest-contrast matches; export CSV for all of them.")
+            self.summary_var.set("\n".join(lines))
+
+    def export(self):
+        if self.matrix is None or self._running:
+            return
+        path = filedialog.asksaveasfilename(parent=self.window, title="Export Contrast Report",
+                                            defaultextension=".csv", filetypes=[("CSV", "*.csv")])
+        if not path:
+            return
+
+        matrix = self.matrix
+        level, passing = FILTERS[self.filter_var.get()]
+        self._running = True
+        self.summary_var.set(self.summary_var.get() + "\nExporting...")
+
+        def write():
+            try:
+                result = matrix.write_csv(path, level, passing)
+            except Exception as e:
+                result = e
+            self.post(self.finish_export, path, result)
+
+        threading.Thread(target=write, name="contrast-export", daemon=True).start()
+
+    def finish_export(self, path, result):
+        self._running = False
+        if isinstance(result, Exception):
+            messagebox.showerror("Error", f"Could not export to {path}:\n{result}", parent=self.window)
+            return
+        lines = self.summary_var.get().splitlines()
+        lines[-1] = f"Exported {result:,} pairs to {path}"
+        self.summary_var.set("\n".join(lines))
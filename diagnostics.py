@@ -0,0 +1,119 @@
+"""Timing hooks for the pick and preview pipeline.
+
+Call sites bracket a stage with `probe.start()` and `probe.stop(name, t)`.
+While the probe is disabled `start` returns None and `stop` returns at once,
+so the hooks cost two trivial calls. When enabled, each sample goes into a
+fixed-size log-scale histogram, so recording is O(1) and memory does not
+grow however long the app runs.
+"""
+import json
+import math
+import threading
+import time
+
+# Histogram buckets grow by 5% from 1 microsecond up to 100 seconds
+_MIN_MS = 0.001
+_GROWTH = 1.05
+_LOG_GROWTH = math.log(_GROWTH)
+_BUCKETS = int(math.log(100000.0 / _MIN_MS) / _LOG_GROWTH) + 1
+
+
+class LatencyHistogram:
+    """Millisecond samples in log-spaced buckets; percentiles are within 5%"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * _BUCKETS
+            self.count = 0
+            self.total = 0.0
+            self.min = None
+            self.max = None
+
+    def record(self, ms):
+        index = 0 if ms <= _MIN_MS else min(_BUCKETS - 1, int(math.log(ms / _MIN_MS) / _LOG_GROWTH))
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += ms
+            if self.max is None or ms > self.max:
+                self.max = ms
+            if self.min is None or ms < self.min:
+                self.min = ms
+
+    def percentile(self, p):
+        """Approximate p-th percentile (0-100) in ms, or None without samples"""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = p / 100.0 * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if count and seen >= rank:
+                    # Geometric middle of the bucket, kept inside the observed range
+                    value = _MIN_MS * _GROWTH ** (index + 0.5)
+                    return min(max(value, self.min), self.max)
+            return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max,
+        }
+
+
+class Probe:
+    """Named latency histograms that are only fed while `enabled` is set"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Timestamp to hand back to `stop`, or None while disabled"""
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, name, started):
+        """Record the time since `started` under `name` (no-op if started is None)"""
+        if started is None:
+            return
+        self.record(name, (time.perf_counter() - started) * 1000.0)
+
+    def record(self, name, ms):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        histogram.record(ms)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self):
+        """Per-stage counts and percentiles, by stage name"""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histograms[name].summary() for name in sorted(histograms)}
+
+    def dump(self, path, extra=None):
+        """Write the summary, plus any extra sections, to a JSON file"""
+        report = {"recorded_at": time.strftime('%Y-%m-%dT%H:%M:%S'), "enabled": self.enabled,
+                  "stages": self.summary()}
+        if extra:
+            report.update(extra)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+# Shared probe; the app enables it from the diagnostics setting
+probe = Probe()
@@ -0,0 +1,113 @@
+"""Settings > Diagnostics window: live latency percentiles per pipeline stage."""
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+from diagnostics import probe
+
+# Stage names recorded by the app, in pipeline order, with their descriptions
+STAGES = (
+    ('hotkey_dispatch', "Hotkey event to Tk handler"),
+    ('activation_to_paint', "Hotkey to first preview painted"),
+    ('move_to_paint', "Mouse move to preview painted"),
+    ('preview_render', "Preview frame render"),
+    ('preview_frame_interval', "Time between preview frames"),
+    ('capture', "Screen capture (any caller)"),
+    ('pick_capture', "SHIFT pick capture"),
+    ('pick_to_display', "SHIFT release to color shown"),
+    ('region_analysis', "Region analysis"),
+    ('favorites_filter', "Favorites filter keystroke"),
+    ('image_tile', "Open Image tile render"),
+)
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+class DiagnosticsWindow:
+    """Refreshes once a second while shown; hidden rather than destroyed on close"""
+
+    def __init__(self, master, on_toggle, extra):
+        self.master = master
+        self.extra = extra
+        self._after_id = None
+
+        self.window = tk.Toplevel(master)
+        self.window.title("Diagnostics")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+
+        self.enabled_var = tk.BooleanVar(value=probe.enabled)
+        ttk.Checkbutton(self.window, text="Record pipeline timings", variable=self.enabled_var,
+                        command=lambda: on_toggle(self.enabled_var.get())).pack(anchor="w", padx=10, pady=(10, 5))
+
+        columns = ("Stage", "Count", "p50", "p95", "p99", "Max")
+        self.table = ttk.Treeview(self.window, columns=columns, show="headings", height=len(STAGES))
+        for column in columns:
+            self.table.heading(column, text=column if column in ("Stage", "Count") else f"{column} (ms)")
+            self.table.column(column, width=220 if column == "Stage" else 70,
+                              anchor="w" if column == "Stage" else "e")
+        self.table.pack(padx=10, pady=5)
+
+        self.info_var = tk.StringVar()
+        tk.Label(self.window, textvariable=self.info_var, font=("Arial", 9), justify="left").pack(
+            anchor="w", padx=10)
+
+        buttons = ttk.Frame(self.window)
+        buttons.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(buttons, text="Reset", command=self.reset).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Save JSON...", command=self.save).pack(side=tk.RIGHT)
+
+    def show(self):
+        self.enabled_var.set(probe.enabled)
+        self.window.deiconify()
+        self.window.lift()
+        if self._after_id is None:
+            self.refresh()
+
+    def hide(self):
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+            self._after_id = None
+        self.window.withdraw()
+
+    def refresh(self):
+        summary = probe.summary()
+        self.table.delete(*self.table.get_children())
+        for name, description in STAGES:
+            stats = summary.get(name)
+            if stats is None:
+                self.table.insert("", "end", values=(description, 0, "-", "-", "-", "-"))
+            else:
+                self.table.insert("", "end", values=(description, stats["count"], _ms(stats["p50_ms"]),
+                                                     _ms(stats["p95_ms"]), _ms(stats["p99_ms"]),
+                                                     _ms(stats["max_ms"])))
+
+        lines = []
+        frames = summary.get('preview_frame_interval')
+        if frames and frames["p50_ms"]:
+            lines.append(f"Preview frame rate: {1000.0 / frames['p50_ms']:.1f} fps (median)")
+        extra = self.extra()
+        if extra.get("capture_backend"):
+            lines.append(f"Capture backend: {extra['capture_backend']}")
+        for key, value in extra.get("startup", {}).items():
+            lines.append(f"Startup {key.replace('_ms', '').replace('_', ' ')}: {value:.0f} ms")
+        self.info_var.set("\n".join(lines))
+
+        self._after_id = self.master.after(1000, self.refresh)
+
+    def reset(self):
+        probe.reset()
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+        self.refresh()
+
+    def save(self):
+        path = filedialog.asksaveasfilename(parent=self.window, title="Save Diagnostics",
+                                            defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            probe.dump(path, self.extra())
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save diagnostics: {e}", parent=self.window)
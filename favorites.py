@@ -0,0 +1,608 @@
+"""Favorites model and its on-disk storage."""
+import contextlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# Snapshot of all favorites; also the name used by older versions for the plain list
+SNAPSHOT_FILE = 'favorites.json'
+
+# Append-only log of changes made since the snapshot was written
+JOURNAL_FILE = 'favorites.journal'
+
+# Held by whichever process is writing the favorites in a directory
+LOCK_FILE = 'favorites.lock'
+
+SNAPSHOT_VERSION = 2
+
+# Seconds to wait for another process to finish with the favorites
+LOCK_TIMEOUT = 2.0
+
+
+class StoreBusyError(OSError):
+    """Another process is writing the favorites in this directory"""
+
+
+def normalize_hex(hex_code):
+    """Canonical form used to compare colors: upper-case with a leading '#'"""
+    return '#' + hex_code.strip().lstrip('#').upper()
+
+
+class FavoritesModel:
+    """Favorites keyed by stable per-entry IDs.
+
+    Every entry gets an integer ID when it is added or loaded; the ID never
+    changes while the entry exists and is never reused, so it can double as
+    the Treeview item ID. Entries are also indexed by color, which makes
+    lookup, update, delete and duplicate detection O(1).
+
+    Entries are plain {"label": ..., "hex": ...} dicts and are updated in
+    place, so other structures may keep references to them.
+
+    Every add, update and delete is also recorded as a change record that
+    storage can take with `take_changes` and journal.
+    """
+
+    def __init__(self):
+        self._entries = {}  # ID -> favorite, in display order
+        self._by_hex = {}   # normalized hex -> {ID: None}
+        self._next_id = 1
+        self._changes = []
+
+    @property
+    def next_id(self):
+        return self._next_id
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        """Yield (ID, favorite) pairs in display order"""
+        return iter(self._entries.items())
+
+    def __contains__(self, fav_id):
+        return fav_id in self._entries
+
+    def get(self, fav_id):
+        """Return the favorite with this ID, or None"""
+        return self._entries.get(fav_id)
+
+    def find_by_hex(self, hex_code):
+        """Return the IDs of all favorites with this color"""
+        return list(self._by_hex.get(normalize_hex(hex_code), ()))
+
+    def hex_codes(self):
+        """Return a new set of every saved color, normalized"""
+        return set(self._by_hex)
+
+    def add(self, label, hex_code):
+        """Add a favorite and return its new ID"""
+        fav_id = self._next_id
+        self._put(fav_id, label, hex_code)
+        self._changes.append({"op": "add", "id": fav_id, "label": label, "hex": hex_code})
+        return fav_id
+
+    def update(self, fav_id, label=None, hex_code=None):
+        """Change the label and/or color of a favorite in place and return it"""
+        favorite = self._entries[fav_id]
+        if label is not None:
+            favorite["label"] = label
+        if hex_code is not None and hex_code != favorite["hex"]:
+            self._unindex(fav_id, favorite["hex"])
+            favorite["hex"] = hex_code
+            self._index(fav_id, hex_code)
+        self._changes.append({"op": "update", "id": fav_id, "label": favorite["label"], "hex": favorite["hex"]})
+        return favorite
+
+    def delete(self, fav_id):
+        """Remove a favorite and return it"""
+        favorite = self._entries.pop(fav_id)
+        self._unindex(fav_id, favorite["hex"])
+        self._changes.append({"op": "delete", "id": fav_id})
+        return favorite
+
+    def load(self, entries, next_id=None):
+        """Replace all favorites with a list of {"label", "hex"} dicts.
+
+        Entries that carry an "id" keep it; the rest get new IDs. Loading is
+        not recorded as a change.
+        """
+        self._entries = {}
+        self._by_hex = {}
+        self._next_id = 1
+        for entry in entries:
+            self._put(entry.get("id", self._next_id), entry["label"], entry["hex"])
+        if next_id is not None:
+            self._next_id = max(self._next_id, next_id)
+        self._changes = []
+
+    def apply(self, change):
+        """Replay one change record, e.g. from the journal.
+
+        Replaying is idempotent, so a journal that overlaps its snapshot
+        still gives the right result.
+        """
+        fav_id = change["id"]
+        if change["op"] == "delete":
+            favorite = self._entries.pop(fav_id, None)
+            if favorite is not None:
+                self._unindex(fav_id, favorite["hex"])
+        else:
+            current = self._entries.get(fav_id)
+            if current is None:
+                self._put(fav_id, change["label"], change["hex"])
+            else:
+                self._unindex(fav_id, current["hex"])
+                current["label"] = change["label"]
+                current["hex"] = change["hex"]
+                self._index(fav_id, change["hex"])
+            self._next_id = max(self._next_id, fav_id + 1)
+
+    def take_changes(self):
+        """Return the change records made since the last call and forget them"""
+        changes, self._changes = self._changes, []
+        return changes
+
+    def to_records(self):
+        """Favorites as {"id", "label", "hex"} dicts, in display order"""
+        return [{"id": fav_id, "label": favorite["label"], "hex": favorite["hex"]}
+                for fav_id, favorite in self._entries.items()]
+
+    def to_list(self):
+        """Favorites as a list of {"label", "hex"} dicts, in display order"""
+        return [{"label": favorite["label"], "hex": favorite["hex"]} for favorite in self._entries.values()]
+
+    def _put(self, fav_id, label, hex_code):
+        self._entries[fav_id] = {"label": label, "hex": hex_code}
+        self._index(fav_id, hex_code)
+        self._next_id = max(self._next_id, fav_id + 1)
+
+    def _index(self, fav_id, hex_code):
+        self._by_hex.setdefault(normalize_hex(hex_code), {})[fav_id] = None
+
+    def _unindex(self, fav_id, hex_code):
+        key = normalize_hex(hex_code)
+        ids = self._by_hex[key]
+        del ids[fav_id]
+        if not ids:
+            del self._by_hex[key]
+
+
+class StoreLock:
+    """Exclusive advisory lock on the favorites in one data directory.
+
+    IDs come from each process's own counter, so two processes appending
+    to the same journal would reuse IDs and overwrite each other's entries
+    on replay. The app holds this lock for as long as it has the
+    directory's favorites open, and headless commands hold it while they
+    load, change and save them. The operating system drops the lock when
+    the process exits, so a crash never leaves it stuck.
+    """
+
+    def __init__(self, data_dir):
+        self.path = os.path.join(data_dir, LOCK_FILE)
+        self._file = None
+
+    @property
+    def held(self):
+        return self._file is not None
+
+    def acquire(self, timeout=0.0):
+        """Take the lock, waiting up to timeout seconds; return False if another process has it"""
+        if self._file is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        f = open(self.path, 'a+')
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if os.name == 'nt':
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                if time.monotonic() >= deadline:
+                    f.close()
+                    return False
+                time.sleep(0.05)
+                continue
+            self._file = f
+            return True
+
+    def release(self):
+        f, self._file = self._file, None
+        if f is None:
+            return
+        try:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        finally:
+            f.close()
+
+
+class FavoritesStore:
+    """Favorites on disk as a snapshot plus an append-only journal.
+
+    Each change is appended to the journal as one JSON line, so saving costs
+    one small write no matter how many favorites there are. Once the
+    journal grows past `compact_after` records it is folded into a new
+    snapshot, which is written to a temporary file and renamed over the old
+    one so a crash never leaves a half-written snapshot behind.
+
+    Older versions stored favorites.json as a plain list; it is migrated to
+    the snapshot format the first time it is loaded and the original is kept
+    as favorites.json.v1.
+
+    Appends and compactions happen under the directory's StoreLock; a
+    process that does not hold it for its whole session takes it for each
+    write and gets StoreBusyError if another process has it.
+
+    A snapshot that cannot be parsed is moved aside (its path is kept in
+    `recovered_from`) and compaction is held off, so the journal alone is
+    never folded over it, until the caller clears `compaction_held`.
+    """
+
+    def __init__(self, data_dir, compact_after=1000):
+        self.data_dir = data_dir
+        self.snapshot_path = os.path.join(data_dir, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(data_dir, JOURNAL_FILE)
+        self.compact_after = compact_after
+        self.journal_records = 0
+        self.lock = StoreLock(data_dir)
+        self.recovered_from = None
+        self.compaction_held = False
+        self._torn_tail = False  # The journal ends mid-record
+
+    def load(self, model):
+        """Load the snapshot and replay the journal into model.
+
+        Raises OSError if the files cannot be read at all.
+        """
+        try:
+            entries, next_id, legacy = self._read_snapshot()
+            model.load(entries, next_id)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # Keep the damaged file for recovery and never compact over it unasked.
+            # Only the process that may write here moves it; a reader leaves it alone.
+            try:
+                with self._exclusive():
+                    backup = f"{self.snapshot_path}.corrupt-{int(time.time())}"
+                    os.replace(self.snapshot_path, backup)
+            except StoreBusyError:
+                raise StoreBusyError(f"{self.snapshot_path} is damaged ({e}) and open in another process") from e
+            print(f"Could not read {self.snapshot_path} ({e}); moved it to {backup}")
+            self.recovered_from = backup
+            self.compaction_held = True
+            model.load([])
+            legacy = False
+
+        self.journal_records = 0
+        self._torn_tail = False
+        damaged = False
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._torn_tail = not line.endswith('\n')
+                    try:
+                        model.apply(json.loads(line))
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        # A torn last line from a crash mid-append; everything before it is intact
+                        print(f"Skipping damaged journal record in {self.journal_path}")
+                        damaged = True
+                        continue
+                    self.journal_records += 1
+
+        if legacy:
+            # Keep the old-format file around in case anything still needs it
+            shutil.copy2(self.snapshot_path, self.snapshot_path + '.v1')
+
+        # Fold the journal (and any old-format file) into a fresh snapshot.
+        # A damaged journal is folded right away so new records never get
+        # appended to a torn line.
+        if legacy or damaged or self.journal_records >= self.compact_after:
+            try:
+                self.compact(model)
+            except StoreBusyError:
+                pass  # A reader only; the process holding the lock compacts its own copy
+
+    @contextlib.contextmanager
+    def _exclusive(self):
+        # Writes need the directory lock; take it for just this write unless already held
+        if self.lock.held:
+            yield
+            return
+        if not self.lock.acquire(LOCK_TIMEOUT):
+            raise StoreBusyError(f"The favorites in {self.data_dir} are in use by another process")
+        try:
+            yield
+        finally:
+            self.lock.release()
+
+    def save(self, model):
+        """Journal the model's pending changes, compacting when the journal gets long"""
+        changes = model.take_changes()
+        if not changes:
+            return
+        self.append(changes)
+        if self.journal_records >= self.compact_after:
+            self.compact(model)
+
+    def append(self, changes):
+        """Append change records to the journal in a single write"""
+        data = ''.join(json.dumps(change) + '\n' for change in changes)
+        if self._torn_tail:
+            # Start on a fresh line rather than after a torn record
+            data = '\n' + data
+        with self._exclusive():
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        self._torn_tail = False
+        self.journal_records += len(changes)
+
+    def compact(self, model):
+        """Write a new snapshot atomically, then start an empty journal.
+
+        Does nothing while `compaction_held` is set.
+        """
+        if self.compaction_held:
+            return
+        # One favorite per line keeps the file readable without the cost of indent=2
+        header = json.dumps({"version": SNAPSHOT_VERSION, "next_id": model.next_id})[:-1]
+        rows = ',\n'.join(json.dumps(record) for record in model.to_records())
+        with self._exclusive():
+            self._write_atomic(self.snapshot_path, f'{header}, "favorites": [\n{rows}\n]}}\n')
+
+            # A crash before this point only leaves journal records that are
+            # already in the snapshot, and replaying them is harmless
+            with open(self.journal_path, 'w', encoding='utf-8'):
+                pass
+        self._torn_tail = False
+        self.journal_records = 0
+
+    def exists(self):
+        """Whether there is a snapshot or journal on disk"""
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def copy_to(self, data_dir):
+        """Merge the current favorites into another data directory; return how many were added.
+
+        Nothing is written when there are no favorites here. Favorites
+        already in the target are kept, and its files are first copied to
+        favorites.json.backup-<time> and favorites.journal.backup-<time>.
+        """
+        if not self.exists():
+            return 0
+        model = FavoritesModel()
+        self.load(model)
+
+        target = FavoritesStore(data_dir, self.compact_after)
+        with target._exclusive():
+            merged = FavoritesModel()
+            if target.exists():
+                target.load(merged)
+                if target.compaction_held:
+                    raise OSError(f"{target.snapshot_path} is damaged (moved to {target.recovered_from}); "
+                                  "recover it before moving favorites there")
+                stamp = int(time.time())
+                for path in (target.snapshot_path, target.journal_path):
+                    if os.path.exists(path):
+                        shutil.copy2(path, f"{path}.backup-{stamp}")
+
+            # Skip favorites the target already has under the same label
+            added = 0
+            for _, favorite in model:
+                if not any(merged.get(fav_id)["label"] == favorite["label"]
+                           for fav_id in merged.find_by_hex(favorite["hex"])):
+                    merged.add(favorite["label"], favorite["hex"])
+                    added += 1
+            merged.take_changes()
+            target.compact(merged)
+        return added
+
+    def _read_snapshot(self):
+        # Returns (entries, next_id, is_legacy_format)
+        if not os.path.exists(self.snapshot_path):
+            return [], None, False
+
+        # Parse errors propagate to load, which sets the file aside
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if isinstance(data, list):
+            # Plain list written by older versions
+            return data, None, True
+        return data["favorites"], data.get("next_id"), False
+
+    @staticmethod
+    def _write_atomic(path, text):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+
+class FavoritesWriter:
+    """Write favorites changes to a FavoritesStore on a background thread.
+
+    The Tk thread hands over change records with `submit` and returns
+    immediately. The writer waits until no new changes have arrived for
+    `delay` seconds (or `max_delay` has passed since the first one) and then
+    journals everything pending in a single write, so a burst of edits costs
+    one write.
+
+    Compaction needs the full list, so the writer keeps its own copy of the
+    favorites, updated from the records it writes; the caller's model is
+    never read from this thread.
+
+    `on_result(error, message)` is called from the writer thread after each
+    write or task; error is None on success. A failed batch is kept and
+    retried with the next write, flush or close.
+    """
+
+    def __init__(self, store, model, on_result=None, delay=0.3, max_delay=2.0):
+        self.store = store
+        self.on_result = on_result
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self._replica = FavoritesModel()
+        self._replica.load(model.to_records(), model.next_id)
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._tasks = deque()
+        self._first_submit = None
+        self._last_submit = None
+        self._held = False   # Last write failed; wait for a reason to retry
+        self._flush_requested = False
+        self._busy = False
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="favorites-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, changes):
+        """Queue change records to be written after the debounce delay"""
+        if not changes:
+            return
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Favorites writer is closed")
+            now = time.monotonic()
+            self._pending.extend(changes)
+            if self._first_submit is None:
+                self._first_submit = now
+            self._last_submit = now
+            self._held = False
+            self._cond.notify_all()
+
+    def call(self, func, on_done=None):
+        """Run func() on the writer thread once everything submitted so far is written.
+
+        on_done(error, result) is called on the writer thread afterwards.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Favorites writer is closed")
+            self._tasks.append((func, on_done))
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Write pending changes now and wait; return False if still busy after timeout"""
+        with self._cond:
+            self._flush_requested = True
+            self._held = False
+            self._cond.notify_all()
+            return self._cond.wait_for(self._idle, timeout)
+
+    def close(self, timeout=5.0):
+        """Flush everything and stop the thread; safe to call more than once"""
+        with self._cond:
+            self._closed = True
+            self._held = False
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _idle(self):
+        return not self._busy and not self._tasks and (not self._pending or self._held)
+
+    def _due(self, now):
+        if not self._pending or self._held:
+            return False
+        if self._flush_requested or self._closed or self._tasks:
+            return True
+        return now - self._last_submit >= self.delay or now - self._first_submit >= self.max_delay
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    if self._due(now) or self._tasks:
+                        break
+                    if self._closed:
+                        return
+                    timeout = None
+                    if self._pending and not self._held:
+                        timeout = max(0.0, min(self._last_submit + self.delay,
+                                               self._first_submit + self.max_delay) - now)
+                    self._cond.wait(timeout)
+
+                # Changes are always written before any task queued after them
+                batch, task = None, None
+                if self._due(now):
+                    batch, self._pending = self._pending, []
+                    self._first_submit = self._last_submit = None
+                else:
+                    task = self._tasks.popleft()
+                self._busy = True
+
+            try:
+                if batch is not None:
+                    self._write(batch)
+                else:
+                    self._call(*task)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    if self._idle():
+                        self._flush_requested = False
+                    self._cond.notify_all()
+
+    def _write(self, batch):
+        try:
+            self.store.append(batch)
+            for change in batch:
+                self._replica.apply(change)
+            if self.store.journal_records >= self.store.compact_after:
+                self.store.compact(self._replica)
+        except Exception as e:
+            # Keep the batch in front of anything newer and retry later
+            with self._cond:
+                self._pending[:0] = batch
+                self._first_submit = self._last_submit = time.monotonic()
+                self._held = True
+            self._report(e, f"Could not save favorites: {e}")
+            if self._closed:
+                # Nothing else will retry once the app is shutting down
+                with self._cond:
+                    self._pending = []
+            return
+        self._report(None, f"Saved favorites to {self.store.data_dir}")
+
+    def _call(self, func, on_done):
+        try:
+            result = func()
+        except Exception as e:
+            if on_done is not None:
+                on_done(e, None)
+            return
+        if on_done is not None:
+            on_done(None, result)
+
+    def _report(self, error, message):
+        if self.on_result is not None:
+            try:
+                self.on_result(error, message)
+            except Exception as e:
+                print(f"Error reporting favorites save: {e}")
@@ -0,0 +1,257 @@
+"""Search over the favorites by label, hex prefix or color distance.
+
+Queries typed into the filter box:
+
+    brand blue        labels containing the text (case-insensitive); if none
+                      do, labels sharing most of its trigrams (typos)
+    #3A               colors whose hex code starts with 3A
+    ~#3366CC          colors within delta E 10 of #3366CC, closest first
+    ~#3366CC 4        the same within delta E 4
+"""
+import bisect
+import math
+import re
+from collections import Counter
+
+from colors import hex_to_rgb
+from favorites import normalize_hex
+
+# Radius used by "~#RRGGBB" queries that don't give one
+DEFAULT_DELTA_E = 10.0
+
+# Fraction of a query's trigrams a label must share to be a fuzzy match
+FUZZY_MIN_SHARED = 0.3
+
+# Fuzzy matches are ranked, so only the best ones are worth showing
+FUZZY_LIMIT = 200
+
+_NEAR_QUERY = re.compile(r'~\s*(#?[0-9a-fA-F]{6})(?:\s+(\d+(?:\.\d*)?))?$')
+_HEX_QUERY = re.compile(r'#[0-9a-fA-F]{0,6}$')
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class FavoritesSearch:
+    """Indexes over the favorites, kept up to date one change at a time.
+
+    Labels are indexed by trigram: a substring query only verifies the
+    labels holding all of its trigrams, and the same postings rank fuzzy
+    matches. Hex codes are kept sorted so a prefix is a bisect range.
+    Distance queries use the app's NearestColorIndex grid.
+
+    Building the label index takes about a second per 100k favorites, so
+    the app builds it on a background thread from a `snapshot` and hands the
+    result to `install`. Changes made meanwhile are remembered and replayed
+    on install; `invalidate` discards the indexes, and any build still
+    running, after the model is replaced. Until the indexes are installed,
+    only ~ queries (which use the color index) are answered; `build` is for
+    callers that can afford to wait.
+
+    Results are favorite IDs. IDs grow in display order, so sorting them
+    restores the list order.
+    """
+
+    def __init__(self, model, color_index):
+        self.model = model
+        self.color_index = color_index
+        self._generation = 0
+        self.invalidate()
+
+    @property
+    def built(self):
+        return self._built
+
+    @property
+    def generation(self):
+        """Bumped by every invalidate; snapshots from older generations are stale"""
+        return self._generation
+
+    def invalidate(self):
+        """Forget the indexes; they are rebuilt from the model when next needed"""
+        self._generation += 1
+        self._built = False
+        self._touched = set()  # IDs changed since the last snapshot
+        self._labels = {}      # ID -> lower-case label, in display order
+        self._hex_codes = {}   # ID -> RRGGBB as indexed
+        self._grams = {}       # trigram -> IDs whose padded label contains it
+        self._hexes = []       # sorted (RRGGBB, ID)
+
+    def snapshot(self):
+        """Return (generation, records) to build indexes from on another thread"""
+        self._touched = set()
+        return self._generation, [(key, favorite["label"], favorite["hex"]) for key, favorite in self.model]
+
+    @staticmethod
+    def build_indexes(records):
+        """Build the indexes for (ID, label, hex) records; safe off the Tk thread"""
+        labels, hex_codes, grams = {}, {}, {}
+        for key, label, hex_code in records:
+            label = labels[key] = label.lower()
+            hex_codes[key] = normalize_hex(hex_code)[1:]
+            padded = f" {label} "
+            for gram in {padded[i:i + 3] for i in range(len(padded) - 2)}:
+                ids = grams.get(gram)
+                if ids is None:
+                    ids = grams[gram] = set()
+                ids.add(key)
+        hexes = sorted((code, key) for key, code in hex_codes.items())
+        return labels, hex_codes, grams, hexes
+
+    def install(self, generation, indexes):
+        """Start using indexes built from the snapshot of this generation.
+
+        Returns False, leaving things as they are, if the model was replaced
+        or the indexes were built some other way in the meantime.
+        """
+        if generation != self._generation or self._built:
+            return False
+        self._labels, self._hex_codes, self._grams, self._hexes = indexes
+        self._built = True
+
+        # Catch up with changes made while the indexes were being built
+        touched, self._touched = self._touched, set()
+        for key in touched:
+            favorite = self.model.get(key)
+            if favorite is None:
+                self.remove(key)
+            elif key in self._labels:
+                self.update(key, favorite)
+            else:
+                self.add(key, favorite)
+        return True
+
+    def build(self):
+        """Build and install the indexes on the calling thread"""
+        generation, records = self.snapshot()
+        self.install(generation, self.build_indexes(records))
+
+    def add(self, key, favorite):
+        if not self._built:
+            self._touched.add(key)
+            return
+        self._index_label(key, favorite["label"])
+        self._index_hex(key, favorite["hex"])
+
+    def update(self, key, favorite):
+        """Re-index a favorite whose label or color changed in place"""
+        if not self._built:
+            self._touched.add(key)
+            return
+        if key not in self._labels:
+            return
+        # Assigning over the old label keeps the entry's place in display order
+        self._unindex_label(key)
+        self._index_label(key, favorite["label"])
+        self._unindex_hex(key)
+        self._index_hex(key, favorite["hex"])
+
+    def remove(self, key):
+        if not self._built:
+            self._touched.add(key)
+            return
+        if key not in self._labels:
+            return
+        self._unindex_label(key)
+        del self._labels[key]
+        self._unindex_hex(key)
+
+    def search(self, query):
+        """Return the matching favorite IDs in display order (closest first for ~),
+        or None when everything should show: the query is empty, or it needs
+        indexes that are not installed yet (see `built`).
+
+        Raises ValueError for a malformed ~ query.
+        """
+        query = query.strip()
+        if not query:
+            return None
+
+        if query.startswith('~'):
+            match = _NEAR_QUERY.match(query)
+            if match is None:
+                raise ValueError("Use ~#RRGGBB or ~#RRGGBB <delta E>")
+            delta_e = float(match.group(2)) if match.group(2) else DEFAULT_DELTA_E
+            return [key for key, _ in self.color_index.within(hex_to_rgb(match.group(1)), delta_e)]
+        if not self._built:
+            # Building takes about a second per 100k favorites; never do it on the caller's thread
+            return None
+        if _HEX_QUERY.match(query):
+            return self.hex_prefix(query)
+        return self.label_matches(query)
+
+    def hex_prefix(self, prefix):
+        prefix = prefix.lstrip('#').upper()
+        start = bisect.bisect_left(self._hexes, (prefix,))
+        end = bisect.bisect_left(self._hexes, (prefix + '\x7f',))
+        return sorted(key for _, key in self._hexes[start:end])
+
+    def label_matches(self, text):
+        """Labels containing text, or the best fuzzy matches when none do"""
+        text = text.lower()
+        grams = _trigrams(text)
+        if not grams:
+            # Too short for trigrams; a scan of a few characters is quick anyway
+            return [key for key, label in self._labels.items() if text in label]
+
+        postings = sorted((self._grams.get(gram, ()) for gram in grams), key=len)
+        if len(postings[0]) * 2 > len(self._labels):
+            # Most labels qualify, so scanning in order beats intersecting and sorting
+            matches = [key for key, label in self._labels.items() if text in label]
+        else:
+            candidates = set(postings[0])
+            for ids in postings[1:]:
+                candidates.intersection_update(ids)
+                if not candidates:
+                    break
+            labels = self._labels
+            matches = sorted(key for key in candidates if text in labels[key])
+
+        return matches if matches else self.fuzzy_matches(text)
+
+    def fuzzy_matches(self, text):
+        """Labels sharing most of the padded query's trigrams, best first"""
+        grams = _trigrams(f" {text} ")
+        needed = max(2, math.ceil(len(grams) * FUZZY_MIN_SHARED))
+        shared = Counter()
+        for gram in grams:
+            ids = self._grams.get(gram)
+            if not ids:
+                continue
+            if len(ids) * 2 > len(self._labels):
+                # Counting a trigram most labels have costs the most and ranks nothing;
+                # credit it to every label instead
+                needed -= 1
+                continue
+            shared.update(ids)
+        needed = max(1, needed)
+        ranked = sorted((-count, key) for key, count in shared.items() if count >= needed)
+        return [key for _, key in ranked[:FUZZY_LIMIT]]
+
+    def _index_label(self, key, label):
+        label = label.lower()
+        self._labels[key] = label
+        # Padding gives word starts and ends their own trigrams, which helps fuzzy matching
+        for gram in _trigrams(f" {label} "):
+            ids = self._grams.get(gram)
+            if ids is None:
+                ids = self._grams[gram] = set()
+            ids.add(key)
+
+    def _unindex_label(self, key):
+        for gram in _trigrams(f" {self._labels[key]} "):
+            ids = self._grams[gram]
+            ids.discard(key)
+            if not ids:
+                del self._grams[gram]
+
+    def _index_hex(self, key, hex_code):
+        code = self._hex_codes[key] = normalize_hex(hex_code)[1:]
+        bisect.insort(self._hexes, (code, key))
+
+    def _unindex_hex(self, key):
+        entry = (self._hex_codes.pop(key), key)
+        index = bisect.bisect_left(self._hexes, entry)
+        if index < len(self._hexes) and self._hexes[index] == entry:
+            del self._hexes[index]
@@ -0,0 +1,103 @@
+"""Treeview presentation of the favorites list."""
+from colors import hex_to_rgb, hex_to_rgb_array, is_dark, is_dark_array
+
+
+class FavoritesView:
+    """Keep a ttk.Treeview in step with the favorites by changing single rows.
+
+    Each favorite gets a row whose item ID is its model ID, so an add,
+    edit or delete touches exactly one row. Rows are colored with one tag per
+    distinct color, configured the first time that color is shown and reused
+    after that; a full reset works out the text color of every new color in
+    one batch.
+
+    `show_only` filters the list by detaching rows rather than deleting
+    them, so clearing the filter never rebuilds rows.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._tags = {}  # hex code -> tag name
+        self._keys = {}  # key of every row, attached or not, in display order
+
+    @staticmethod
+    def item_id(key):
+        """Treeview item ID for the favorite stored under key"""
+        return str(key)
+
+    @staticmethod
+    def key_for(item):
+        """Key of the favorite shown in a Treeview item"""
+        return int(item)
+
+    def tag_for(self, hex_code):
+        """Return the row tag for a color, configuring it on first use"""
+        tag_name = self._tags.get(hex_code)
+        if tag_name is None:
+            tag_name = self._configure_tag(hex_code, is_dark(hex_to_rgb(hex_code)))
+        return tag_name
+
+    def prepare_tags(self, hex_codes):
+        """Configure the tags for many colors at once, classifying them in one batch"""
+        new_codes = list({code for code in hex_codes if code not in self._tags})
+        if not new_codes:
+            return
+        try:
+            dark = is_dark_array(hex_to_rgb_array(new_codes))
+        except ValueError:
+            # A malformed code somewhere; fall back to one color at a time
+            for code in new_codes:
+                self.tag_for(code)
+            return
+        for code, code_is_dark in zip(new_codes, dark.tolist()):
+            self._configure_tag(code, code_is_dark)
+
+    def _configure_tag(self, hex_code, dark):
+        # One tag per color combining background and text color
+        tag_name = f"{hex_code}_{dark}"
+        text_color = "white" if dark else "black"
+        self.tree.tag_configure(tag_name, background=hex_code, foreground=text_color)
+        self._tags[hex_code] = tag_name
+        return tag_name
+
+    def insert(self, key, favorite, index="end"):
+        """Add a row for a new favorite"""
+        self._keys[key] = None
+        self.tree.insert("", index, iid=self.item_id(key),
+                         values=(favorite["label"], favorite["hex"]),
+                         tags=(self.tag_for(favorite["hex"]),))
+
+    def update(self, key, favorite):
+        """Redraw the row of a favorite whose label or color changed"""
+        self.tree.item(self.item_id(key),
+                       values=(favorite["label"], favorite["hex"]),
+                       tags=(self.tag_for(favorite["hex"]),))
+
+    def remove(self, key):
+        """Remove the row of a deleted favorite"""
+        self._keys.pop(key, None)
+        item = self.item_id(key)
+        if self.tree.exists(item):
+            self.tree.delete(item)
+
+    def reset(self, items):
+        """Replace every row with (ID, favorite) items, e.g. after loading a new file"""
+        if self._keys:
+            # A single delete call for all rows, including ones a filter hides
+            self.tree.delete(*map(self.item_id, self._keys))
+            self._keys = {}
+        self.extend(items)
+
+    def extend(self, items):
+        """Append rows for many new (ID, favorite) items, classifying their colors in one batch"""
+        items = list(items)
+        self.prepare_tags(favorite["hex"] for _, favorite in items)
+        for key, favorite in items:
+            self.insert(key, favorite)
+
+    def show_only(self, keys):
+        """Show just the rows for keys, in that order, or every row if keys is None"""
+        if keys is None:
+            keys = self._keys
+        # Replacing the root's children in one call detaches everything else
+        self.tree.set_children("", *map(self.item_id, keys))
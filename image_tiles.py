@@ -0,0 +1,137 @@
+"""Large image files cut into display tiles for the Open Image window.
+
+The file is decoded once, on a worker thread, into a single RGB image that
+sampling and picking read full-resolution pixels from. Below it sits a
+pyramid of half-size copies (a third more memory in all), so a zoomed-out
+view resizes from the nearest level instead of the whole image. The
+window asks for one TILE_SIZE square of the zoomed view at a time and
+only for the squares in sight.
+"""
+import math
+
+import numpy as np
+from PIL import Image
+
+from capture import average_color
+
+# Side of a display tile in screen pixels
+TILE_SIZE = 256
+
+# Largest image accepted; at 3 bytes a pixel this is 3 GB decoded. Pillow's own
+# decompression-bomb limit (Image.MAX_IMAGE_PIXELS) applies first and is lower
+# by default; it is process-wide, so it is left as configured.
+MAX_PIXELS = 1 << 30
+
+# Zoom levels the window steps through: quarter powers of two from 1/1024 to 32
+ZOOM_STEPS = tuple(2.0 ** (step / 4) for step in range(-40, 21))
+
+# Color of the loupe outside the image
+PAD_COLOR = (64, 64, 64)
+
+
+class TiledImage:
+    """A decoded image plus its pyramid of reduced copies.
+
+    Loading a 20k x 20k file takes seconds, so construct it off the Tk
+    thread; everything after that is quick enough for the Tk loop.
+    """
+
+    def __init__(self, path, tile_size=TILE_SIZE):
+        self.path = path
+        self.tile_size = tile_size
+
+        try:
+            image = Image.open(path)
+        except Image.DecompressionBombError as e:
+            raise ValueError(f"The image is too large to open safely: {e}") from e
+        try:
+            # Only the header has been read so far; check the size before decoding
+            width, height = image.size
+            if width * height > MAX_PIXELS:
+                raise ValueError(f"{width} x {height} is too large to open (at most {MAX_PIXELS:,} pixels)")
+            # A JPEG can decode straight to RGB, skipping the conversion copy
+            image.draft('RGB', image.size)
+            # convert() copies, so an RGB image is used as decoded; otherwise
+            # the decoded original is dropped as soon as the copy exists
+            base = image if image.mode == 'RGB' else image.convert('RGB')
+        except BaseException:
+            image.close()
+            raise
+        if base is not image:
+            image.close()
+        del image
+        base.load()
+
+        self.size = base.size
+        self.levels = [base]
+        while max(self.levels[-1].size) > tile_size:
+            self.levels.append(self.levels[-1].reduce(2))
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def fit_zoom(self, width, height):
+        """The largest zoom step that shows the whole image in width x height"""
+        fit = min(width / self.width, height / self.height)
+        fitting = [zoom for zoom in ZOOM_STEPS if zoom <= fit]
+        return fitting[-1] if fitting else ZOOM_STEPS[0]
+
+    def display_size(self, zoom):
+        """Size of the whole image in screen pixels at a zoom"""
+        return max(1, round(self.width * zoom)), max(1, round(self.height * zoom))
+
+    def visible_tiles(self, zoom, left, top, width, height):
+        """(column, row) of the tiles overlapping a view of the zoomed image"""
+        display_width, display_height = self.display_size(zoom)
+        size = self.tile_size
+        columns = range(max(0, left // size), min(math.ceil(display_width / size), (left + width - 1) // size + 1))
+        rows = range(max(0, top // size), min(math.ceil(display_height / size), (top + height - 1) // size + 1))
+        return [(column, row) for row in rows for column in columns]
+
+    def render_tile(self, zoom, column, row):
+        """Render one tile of the zoomed view as an RGB image (smaller at the right and bottom edges)"""
+        display_width, display_height = self.display_size(zoom)
+        size = self.tile_size
+        left, top = column * size, row * size
+        right, bottom = min(left + size, display_width), min(top + size, display_height)
+
+        # The smallest level that still has at least one pixel per screen pixel
+        level = 0 if zoom >= 1 else min(len(self.levels) - 1, int(math.log2(1 / zoom)))
+        source = self.levels[level]
+        scale_x = source.width / (self.width * zoom)
+        scale_y = source.height / (self.height * zoom)
+        # Display sizes are rounded, so clamp the far edge to the source
+        box = (left * scale_x, top * scale_y,
+               min(source.width, right * scale_x), min(source.height, bottom * scale_y))
+
+        # Zoomed in, keep pixels square and sharp so the one being picked is easy to see
+        resample = Image.NEAREST if zoom >= 1 else Image.BILINEAR
+        return source.resize((right - left, bottom - top), resample, box=box)
+
+    def pixel(self, x, y):
+        """(r, g, b) of a full-resolution pixel"""
+        return self.levels[0].getpixel((x, y))
+
+    def sample(self, x, y, size=1, method='mean'):
+        """Mean or median (r, g, b) of the size x size area centred on (x, y), clipped to the image"""
+        if size <= 1:
+            return self.pixel(x, y)
+        half = size // 2
+        box = (max(0, x - half), max(0, y - half), min(self.width, x - half + size), min(self.height, y - half + size))
+        return average_color(np.asarray(self.levels[0].crop(box)), method=method)
+
+    def tile_array(self, x, y, size):
+        """A (size, size, 3) array centred on (x, y) for the loupe, padded outside the image"""
+        half = size // 2
+        tile = np.empty((size, size, 3), dtype=np.uint8)
+        tile[...] = PAD_COLOR
+        left, top = x - half, y - half
+        box = (max(0, left), max(0, top), min(self.width, left + size), min(self.height, top + size))
+        if box[0] < box[2] and box[1] < box[3]:
+            tile[box[1] - top:box[3] - top, box[0] - left:box[2] - left] = np.asarray(self.levels[0].crop(box))
+        return tile
@@ -0,0 +1,285 @@
+"""File > Open Image window: pan and zoom around a large image and pick from it."""
+import os
+import threading
+import time
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk, filedialog, messagebox
+
+from PIL import ImageTk
+
+from diagnostics import probe
+from image_tiles import TILE_SIZE, ZOOM_STEPS, TiledImage
+
+# Tile images kept for reuse; 256 tiles of 256 x 256 is about 64 MB
+CACHE_TILES = 256
+
+# Time spent drawing tiles per turn of the Tk loop before yielding to input
+DRAW_BUDGET = 0.03
+
+# Image types offered by the file dialog
+FILE_TYPES = [("Images", "*.png *.tif *.tiff *.jpg *.jpeg *.bmp *.gif *.webp"), ("All files", "*.*")]
+
+
+class ImageWindow:
+    """A canvas showing only the tiles of the image in view.
+
+    Tiles are rendered on demand at the current zoom and kept in an LRU
+    cache of PhotoImages, so panning back over an area reuses them and
+    memory stays bounded however large the image is. Tiles on the canvas
+    hold their own reference, so eviction never blanks one in view.
+
+    The window reports the pointer to the app, which draws the usual pick
+    preview: `on_hover(x_root, y_root)` as it moves, `on_leave()` when it
+    leaves the image, and `on_pick(x_root, y_root)` when SHIFT is released.
+    `image_point` maps those screen positions to image pixels.
+    """
+
+    def __init__(self, master, on_hover, on_leave, on_pick, cache_tiles=CACHE_TILES):
+        self.master = master
+        self.on_hover = on_hover
+        self.on_leave = on_leave
+        self.on_pick = on_pick
+        self.cache_tiles = cache_tiles
+
+        self.image = None
+        self.zoom = 1.0
+        self.origin = (0, 0)  # Position in the zoomed image of the canvas's top-left corner
+        self.tiles = OrderedDict()  # (zoom, column, row) -> PhotoImage, least recently used first
+        self.items = {}  # (column, row) -> (canvas item, PhotoImage) at the current zoom
+        self._pending = []
+        self._draw_id = None
+        self._drag = None
+        self._loading = False
+
+        self.window = tk.Toplevel(master)
+        self.window.title("Open Image")
+        self.window.geometry("900x650")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        toolbar = ttk.Frame(self.window)
+        toolbar.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Button(toolbar, text="Open...", command=self.choose_file).pack(side=tk.LEFT)
+        ttk.Button(toolbar, text="Zoom Out", command=lambda: self.zoom_by(-1)).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(toolbar, text="Zoom In", command=lambda: self.zoom_by(1)).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(toolbar, text="Fit", command=self.fit).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(toolbar, text="100%", command=lambda: self.set_zoom(1.0)).pack(side=tk.LEFT, padx=(5, 0))
+
+        self.status_var = tk.StringVar(value="Open a PNG, TIFF or JPEG file to pick colors from it.")
+        tk.Label(self.window, textvariable=self.status_var, font=("Arial", 10), anchor="w").pack(
+            side=tk.BOTTOM, fill=tk.X, padx=5, pady=(0, 5))
+
+        self.canvas = tk.Canvas(self.window, bg="#404040", highlightthickness=0, cursor="crosshair")
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        # Drag to pan, wheel to zoom around the pointer, SHIFT to pick
+        self.canvas.bind("<Configure>", self.resized)
+        self.canvas.bind("<ButtonPress-1>", self.start_drag)
+        self.canvas.bind("<B1-Motion>", self.drag)
+        self.canvas.bind("<ButtonRelease-1>", self.end_drag)
+        self.canvas.bind("<MouseWheel>", lambda event: self.zoom_by(1 if event.delta > 0 else -1, event.x, event.y))
+        self.canvas.bind("<Button-4>", lambda event: self.zoom_by(1, event.x, event.y))
+        self.canvas.bind("<Button-5>", lambda event: self.zoom_by(-1, event.x, event.y))
+        self.canvas.bind("<Enter>", lambda event: self.canvas.focus_set())
+        self.canvas.bind("<Motion>", self.pointer_moved)
+        self.canvas.bind("<Leave>", lambda event: self.on_leave())
+        for key in ("<KeyRelease-Shift_L>", "<KeyRelease-Shift_R>"):
+            self.canvas.bind(key, lambda event: self.on_pick(event.x_root, event.y_root))
+        self.canvas.bind("<Escape>", lambda event: self.on_leave())
+        for key in ("<plus>", "<equal>", "<KP_Add>"):
+            self.canvas.bind(key, lambda event: self.zoom_by(1))
+        for key in ("<minus>", "<KP_Subtract>"):
+            self.canvas.bind(key, lambda event: self.zoom_by(-1))
+
+    def show(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def close(self):
+        # Let go of the decoded image and every tile; they can be hundreds of megabytes
+        self.on_leave()
+        self.window.withdraw()
+        self.set_image(None)
+
+    def choose_file(self):
+        if self._loading:
+            return
+        path = filedialog.askopenfilename(parent=self.window, title="Open Image", filetypes=FILE_TYPES)
+        if path:
+            self.open(path)
+
+    def open(self, path):
+        """Decode a file on a worker thread and show it when ready"""
+        self._loading = True
+        self.set_image(None)  # Free the old image first so two are never held at once
+        self.status_var.set(f"Loading {os.path.basename(path)}...")
+
+        def load():
+            started = time.perf_counter()
+            try:
+                result = TiledImage(path)
+            except Exception as e:
+                result = e
+            self.post(self.finish_open, path, result, time.perf_counter() - started)
+
+        threading.Thread(target=load, name="image-load", daemon=True).start()
+
+    def post(self, callback, *args):
+        # Called from a worker thread; hand the result to the Tk loop
+        try:
+            self.master.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):
+            pass  # The app is closing
+
+    def finish_open(self, path, result, seconds):
+        self._loading = False
+        if isinstance(result, Exception):
+            self.status_var.set("Could not open the image.")
+            messagebox.showerror("Error", f"Could not open {path}:\n{result}", parent=self.window)
+            return
+        self.set_image(result)
+        self.window.title(f"Open Image - {os.path.basename(path)}")
+        self.fit()
+        self.status_var.set(f"{os.path.basename(path)}: {result.width} x {result.height}, loaded in {seconds:.1f} s. "
+                            "Drag to pan, scroll to zoom, SHIFT to pick.")
+
+    def set_image(self, image):
+        self.image = image
+        self.tiles.clear()
+        self.clear_items()
+
+    def clear_items(self):
+        self.canvas.delete("tile")
+        self.items.clear()
+        self._pending = []
+
+    def image_point(self, x_root, y_root):
+        """Image pixel under a screen position, or None outside the image"""
+        if self.image is None:
+            return None
+        x, y = x_root - self.canvas.winfo_rootx(), y_root - self.canvas.winfo_rooty()
+        if not (0 <= x < self.canvas.winfo_width() and 0 <= y < self.canvas.winfo_height()):
+            return None
+        image_x = int((x + self.origin[0]) // self.zoom)
+        image_y = int((y + self.origin[1]) // self.zoom)
+        if 0 <= image_x < self.image.width and 0 <= image_y < self.image.height:
+            return image_x, image_y
+        return None
+
+    def pointer_moved(self, event):
+        point = self.image_point(event.x_root, event.y_root)
+        if point is None:
+            self.on_leave()
+            return
+        self.on_hover(event.x_root, event.y_root)
+
+    def resized(self, event):
+        # Re-centre or re-clamp the view for the new canvas size
+        if self.image is not None:
+            self.pan_to(*self.origin)
+            self.refresh()
+
+    def start_drag(self, event):
+        self._drag = (event.x, event.y)
+
+    def drag(self, event):
+        if self._drag is None or self.image is None:
+            return
+        x, y = self._drag
+        self._drag = (event.x, event.y)
+        self.pan_to(self.origin[0] + x - event.x, self.origin[1] + y - event.y)
+
+    def end_drag(self, event):
+        self._drag = None
+
+    def pan_to(self, left, top):
+        left, top = self.clamp_origin(left, top)
+        dx, dy = left - self.origin[0], top - self.origin[1]
+        if dx or dy:
+            self.origin = (left, top)
+            self.canvas.move("tile", -dx, -dy)
+            self.refresh()
+
+    def clamp_origin(self, left, top):
+        # Centre the image when it is smaller than the canvas, otherwise keep it filling the view
+        width, height = self.image.display_size(self.zoom)
+        view_width, view_height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        left = -((view_width - width) // 2) if width <= view_width else min(max(0, left), width - view_width)
+        top = -((view_height - height) // 2) if height <= view_height else min(max(0, top), height - view_height)
+        return int(left), int(top)
+
+    def fit(self):
+        if self.image is not None:
+            self.set_zoom(self.image.fit_zoom(max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height())))
+
+    def zoom_by(self, steps, x=None, y=None):
+        """Step the zoom in (positive) or out, keeping the point under (x, y) in place"""
+        if self.image is None:
+            return
+        index = min(range(len(ZOOM_STEPS)), key=lambda i: abs(ZOOM_STEPS[i] - self.zoom))
+        self.set_zoom(ZOOM_STEPS[min(len(ZOOM_STEPS) - 1, max(0, index + steps))], x, y)
+
+    def set_zoom(self, zoom, x=None, y=None):
+        if self.image is None:
+            return
+        if x is None:
+            x, y = self.canvas.winfo_width() // 2, self.canvas.winfo_height() // 2
+        scale = zoom / self.zoom
+        left, top = (self.origin[0] + x) * scale - x, (self.origin[1] + y) * scale - y
+        self.zoom = zoom
+        self.clear_items()
+        self.origin = self.clamp_origin(left, top)
+        self.refresh()
+
+    def refresh(self):
+        """Drop tiles that left the view and queue the ones that came into it"""
+        if self.image is None:
+            return
+        left, top = self.origin
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        visible = self.image.visible_tiles(self.zoom, left, top, width, height)
+        in_view = set(visible)
+        for key in [key for key in self.items if key not in in_view]:
+            self.canvas.delete(self.items.pop(key)[0])
+
+        # Draw from the centre outwards so the part being looked at appears first
+        center_x, center_y = left + width / 2, top + height / 2
+        self._pending = sorted((key for key in visible if key not in self.items),
+                               key=lambda key: ((key[0] + 0.5) * TILE_SIZE - center_x) ** 2
+                               + ((key[1] + 0.5) * TILE_SIZE - center_y) ** 2, reverse=True)
+        if self._pending and self._draw_id is None:
+            self._draw_id = self.canvas.after_idle(self.draw_pending)
+
+    def draw_pending(self):
+        # Draw queued tiles for up to DRAW_BUDGET, then let input through before the rest
+        self._draw_id = None
+        deadline = time.perf_counter() + DRAW_BUDGET
+        left, top = self.origin
+        while self._pending:
+            key = self._pending.pop()
+            if key in self.items:
+                continue
+            photo = self.tile_photo(*key)
+            item = self.canvas.create_image(key[0] * TILE_SIZE - left, key[1] * TILE_SIZE - top,
+                                            image=photo, anchor="nw", tags="tile")
+            self.items[key] = (item, photo)
+            if time.perf_counter() > deadline:
+                break
+        if self._pending:
+            self._draw_id = self.canvas.after(1, self.draw_pending)
+
+    def tile_photo(self, column, row):
+        """A tile of the current view as a PhotoImage, from the cache when possible"""
+        key = (self.zoom, column, row)
+        photo = self.tiles.get(key)
+        if photo is not None:
+            self.tiles.move_to_end(key)
+            return photo
+
+        started = probe.start()
+        photo = ImageTk.PhotoImage(self.image.render_tile(self.zoom, column, row), master=self.canvas)
+        probe.stop('image_tile', started)
+        self.tiles[key] = photo
+        while len(self.tiles) > self.cache_tiles:
+            self.tiles.popitem(last=False)
+        return photo
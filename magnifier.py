@@ -0,0 +1,85 @@
+"""Zoomed loupe shown in the pick preview."""
+import numpy as np
+from PIL import Image, ImageTk
+
+import capture
+
+# Color of the lines between magnified pixels
+GRID_COLOR = (128, 128, 128)
+
+
+class Magnifier:
+    """Render an enlarged grid_size x grid_size tile around the cursor.
+
+    One RGBA pixel buffer and one PhotoImage are allocated up front and reused
+    for every frame; each frame only rewrites their contents.
+    """
+
+    def __init__(self, master, grid_size=11, zoom=8):
+        # Keep an odd grid so there is a centre pixel for the crosshair
+        if grid_size % 2 == 0:
+            grid_size += 1
+        self.grid_size = grid_size
+        self.zoom = zoom
+        self.size = grid_size * zoom
+
+        # Last tile drawn, so callers can reuse the capture, and whether all of it was on the screen
+        self.tile = None
+        self.complete = True
+        self._padded = np.empty((grid_size, grid_size, 3), dtype=np.uint8)
+
+        self.buffer = np.zeros((self.size, self.size, 4), dtype=np.uint8)
+        self.buffer[..., 3] = 255
+
+        # The same memory viewed as one zoom x zoom block per source pixel
+        self._cells = self.buffer.reshape(grid_size, zoom, grid_size, zoom, 4)
+
+        # PIL image mapped onto the buffer, so it never needs to be rebuilt
+        self._image = Image.frombuffer('RGBA', (self.size, self.size), self.buffer, 'raw', 'RGBA', 0, 1)
+        self.photo = ImageTk.PhotoImage(self._image, master=master)
+
+        # Pixel bounds of the centre cell
+        self._lo = (grid_size // 2) * zoom
+        self._hi = self._lo + zoom - 1
+
+    def render(self, x, y):
+        """Capture around (x, y) and draw it; return the (r, g, b) of the centre pixel.
+
+        Near a screen edge only the part on the screen is captured and the
+        rest of the grid shows capture.OFF_SCREEN_COLOR; `complete` says
+        whether the whole tile was on the screen.
+        """
+        size = self.grid_size
+        half = size // 2
+        pixels, column, row = capture.grab_on_screen(x - half, y - half, size, size)
+        self.complete = pixels.shape[:2] == (size, size)
+        if not self.complete:
+            # Reuse one padded tile rather than allocating per frame
+            self._padded[...] = capture.OFF_SCREEN_COLOR
+            self._padded[row:row + pixels.shape[0], column:column + pixels.shape[1]] = pixels
+            pixels = self._padded
+        return self.draw(pixels)
+
+    def draw(self, tile):
+        """Draw a (grid_size, grid_size, 3) RGB tile into the loupe"""
+        self.tile = tile
+
+        # Enlarge every source pixel into its zoom x zoom block in place
+        self._cells[..., :3] = tile[:, None, :, None, :]
+
+        # Grid lines between pixels once they are large enough to tell apart
+        if self.zoom >= 4:
+            self.buffer[::self.zoom, :, :3] = GRID_COLOR
+            self.buffer[:, ::self.zoom, :3] = GRID_COLOR
+
+        # Outline the centre pixel in its inverted color so it stays visible
+        center = tile[self.grid_size // 2, self.grid_size // 2]
+        outline = 255 - center
+        lo, hi = self._lo, self._hi
+        self.buffer[lo, lo:hi + 1, :3] = outline
+        self.buffer[hi, lo:hi + 1, :3] = outline
+        self.buffer[lo:hi + 1, lo, :3] = outline
+        self.buffer[lo:hi + 1, hi, :3] = outline
+
+        self.photo.paste(self._image)
+        return int(center[0]), int(center[1]), int(center[2])
@@ -0,0 +1,204 @@
+"""Headless palette extraction from image files.
+
+Extracts the dominant colors of every image given on the command line (files
+or directories) and streams one JSON object per image. Nothing here needs a
+display, global hotkeys or input listeners, so it can run on a build server:
+
+    python palette.py screenshots/ logo.png -k 8 --output palettes.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from colors import rgb_to_hex
+from config import get_data_directory
+from favorites import LOCK_TIMEOUT, FavoritesModel, FavoritesStore, StoreBusyError, normalize_hex
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp'}
+
+
+def iter_image_paths(paths):
+    """Yield image files from a mix of file and directory paths"""
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                        yield os.path.join(dirpath, filename)
+        else:
+            yield path
+
+
+def load_pixels(path, max_size=256):
+    """Load an image as an (n, 3) uint8 array, downsampled to at most max_size per side"""
+    with Image.open(path) as image:
+        image.draft('RGB', (max_size, max_size))  # Let JPEG decode at reduced size
+        image = image.convert('RGB')
+        image.thumbnail((max_size, max_size))
+        return np.asarray(image, dtype=np.uint8).reshape(-1, 3), image.size
+
+
+def median_cut(pixels, count):
+    """Return up to `count` palette colors and a label per pixel using median cut"""
+    # Pillow's median cut runs in C over the whole buffer
+    strip = Image.fromarray(pixels.reshape(1, -1, 3), 'RGB')
+    quantized = strip.quantize(colors=count, method=Image.Quantize.MEDIANCUT)
+    labels = np.asarray(quantized, dtype=np.intp).reshape(-1)
+    palette = np.asarray(quantized.getpalette()[:3 * count], dtype=np.float64).reshape(-1, 3)
+    return palette, labels
+
+
+def kmeans(pixels, count, iterations=10):
+    """Refine a median-cut palette with k-means (Lloyd) iterations"""
+    centers, labels = median_cut(pixels, count)
+    centers = centers[:max(labels.max() + 1, 1)]
+    data = pixels.astype(np.float64)
+
+    for _ in range(iterations):
+        # Nearest center for every pixel in one pass; |x|^2 is the same for
+        # every center so it can be left out of the comparison
+        distances = (centers ** 2).sum(axis=1)[None, :] - 2.0 * data @ centers.T
+        labels = distances.argmin(axis=1)
+
+        # Mean of each cluster; empty clusters keep their old center
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, data)
+        occupied = counts > 0
+        updated = centers.copy()
+        updated[occupied] = sums[occupied] / counts[occupied, None]
+
+        if np.allclose(updated, centers, atol=0.5):
+            centers = updated
+            break
+        centers = updated
+
+    return centers, labels
+
+
+METHODS = {'mediancut': median_cut, 'kmeans': kmeans}
+
+
+def extract_palette(path, count=5, method='mediancut', max_size=256):
+    """Return a JSON-serialisable dict with the top `count` colors of one image"""
+    try:
+        pixels, size = load_pixels(path, max_size)
+        palette, labels = METHODS[method](pixels, count)
+
+        # Rank palette entries by how many pixels they cover
+        counts = np.bincount(labels, minlength=len(palette))
+        order = np.argsort(counts)[::-1]
+        colors = []
+        for index in order[:count]:
+            if counts[index] == 0:
+                break
+            r, g, b = (int(v) for v in np.rint(palette[index]))
+            colors.append({
+                "hex": rgb_to_hex((r, g, b)),
+                "rgb": [r, g, b],
+                "fraction": round(float(counts[index]) / len(labels), 4),
+            })
+        return {"path": path, "size": list(size), "colors": colors}
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+
+def _extract_job(job):
+    # Top-level so it can be pickled for the process pool
+    path, count, method, max_size = job
+    return extract_palette(path, count, method, max_size)
+
+
+def extract_all(paths, count=5, method='mediancut', max_size=256, workers=None):
+    """Extract palettes across a process pool, yielding results in input order"""
+    jobs = ((path, count, method, max_size) for path in iter_image_paths(paths))
+    if workers == 1:
+        yield from map(_extract_job, jobs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_extract_job, jobs, chunksize=8)
+
+
+def merge_into_favorites(results, data_dir=None):
+    """Add extracted colors to the favorites store, skipping hex codes already saved.
+
+    Raises StoreBusyError if Color Picker or another command is writing them.
+    """
+    store = FavoritesStore(data_dir or get_data_directory())
+    if not store.lock.acquire(LOCK_TIMEOUT):
+        raise StoreBusyError(f"The favorites in {store.data_dir} are open in Color Picker or another import; "
+                             "close it and try again")
+    try:
+        return _merge(results, store)
+    finally:
+        store.lock.release()
+
+
+def _merge(results, store):
+    favorites = FavoritesModel()
+    store.load(favorites)
+
+    added = 0
+    for result in results:
+        name = os.path.splitext(os.path.basename(result["path"]))[0]
+        for rank, color in enumerate(result.get("colors", []), start=1):
+            if not favorites.find_by_hex(color["hex"]):
+                favorites.add(f"{name} #{rank}", normalize_hex(color["hex"]))
+                added += 1
+
+    # All new colors go to the journal in one write
+    store.save(favorites)
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract dominant colors from images as JSON lines.")
+    parser.add_argument('paths', nargs='+', help="Image files or directories to scan")
+    parser.add_argument('-k', '--colors', type=int, default=5, help="Colors to report per image (default 5)")
+    parser.add_argument('--method', choices=sorted(METHODS), default='mediancut',
+                        help="Quantization method (default mediancut)")
+    parser.add_argument('--max-size', type=int, default=256,
+                        help="Downsample images to at most this many pixels per side first (default 256)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Worker processes (default: one per CPU, 1 runs in-process)")
+    parser.add_argument('-o', '--output', help="Write JSON lines here instead of stdout")
+    parser.add_argument('--add-to-favorites', action='store_true',
+                        help="Also add the extracted colors to the favorites store")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    merged = [] if args.add_to_favorites else None
+    failures = 0
+    try:
+        for result in extract_all(args.paths, args.colors, args.method, args.max_size, args.workers):
+            # Stream each result as soon as it is ready
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            if "error" in result:
+                failures += 1
+            elif merged is not None:
+                merged.append(result)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if merged:
+        try:
+            added = merge_into_favorites(merged)
+        except StoreBusyError as e:
+            print(f"Could not add colors to favorites: {e}", file=sys.stderr)
+            return 1
+        print(f"Added {added} colors to favorites", file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
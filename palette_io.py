@@ -0,0 +1,380 @@
+"""Bulk palette import and export in common formats.
+
+    .gpl    GIMP palette
+    .ase    Adobe Swatch Exchange (RGB, CMYK, LAB and Gray swatches are read)
+    .css    CSS custom properties (--name: #RRGGBB;)
+    .json   a JSON array of {"label", "hex"} objects (or a favorites.json snapshot)
+    .jsonl  one {"label", "hex"} object per line
+
+Readers are generators that yield (label, "#RRGGBB") pairs as they parse,
+and writers take any iterable of pairs and write as they go, so a palette
+of hundreds of thousands of colors never has to be held in memory as a
+whole. Also runs headless against the favorites store:
+
+    python color-picker.py import brand.ase
+    python color-picker.py export palette.gpl
+"""
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+
+from colors import hex_to_rgb, rgb_to_hex, lab_to_rgb
+from favorites import normalize_hex
+
+FORMATS = ('gpl', 'ase', 'css', 'json', 'jsonl')
+
+# File dialog filters, in menu order
+FILE_TYPES = [
+    ("GIMP palette", "*.gpl"),
+    ("Adobe Swatch Exchange", "*.ase"),
+    ("CSS custom properties", "*.css"),
+    ("JSON", "*.json"),
+    ("JSON lines", "*.jsonl"),
+]
+
+_CHUNK_SIZE = 1 << 16
+
+_GPL_ROW = re.compile(r'\s*(\d+)\s+(\d+)\s+(\d+)\s*(.*)$')
+_CSS_PROPERTY = re.compile(r'--([\w-]+)\s*:\s*(#[0-9a-fA-F]{3,8}\b|rgba?\([^)]*\))')
+_JSON_SEPARATORS = re.compile(r'[\s,]*')
+
+_ASE_COLOR = 0x0001  # Block type of a swatch; group start and end blocks are skipped
+_ASE_CHANNELS = {b'RGB ': 3, b'CMYK': 4, b'LAB ': 3, b'Gray': 1}
+
+
+def detect_format(path):
+    """Format name for a file, from its extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown palette format '.{extension}'; use one of "
+                         + ", ".join(f".{name}" for name in FORMATS))
+    return extension
+
+
+def read_palette(path, format=None):
+    """Yield (label, '#RRGGBB') pairs from a palette file; entries without a valid color are skipped"""
+    format = format or detect_format(path)
+    if format == 'ase':
+        with open(path, 'rb') as f:
+            yield from _normalized(_read_ase(f))
+        return
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = {'gpl': _read_gpl, 'css': _read_css, 'json': _read_json, 'jsonl': _read_jsonl}[format]
+        yield from _normalized(reader(f))
+
+
+def _normalized(entries):
+    # Every format yields the same upper-case '#RRGGBB' the app stores
+    for label, hex_code in entries:
+        yield label, normalize_hex(hex_code)
+
+
+def write_palette(path, entries, format=None, name="Favorites"):
+    """Write (label, hex) pairs to a palette file and return how many were written"""
+    format = format or detect_format(path)
+    if format == 'ase':
+        with open(path, 'wb') as f:
+            return _write_ase(f, entries)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        if format == 'gpl':
+            return _write_gpl(f, entries, name)
+        return {'css': _write_css, 'json': _write_json, 'jsonl': _write_jsonl}[format](f, entries)
+
+
+def new_entries(entries, seen):
+    """Split entries into those whose color is not in `seen` and a count of the rest.
+
+    `seen` is a set of normalized hex codes. Colors are added to it as they
+    pass, so repeats within the input are dropped too. Returns
+    (new entries, duplicates dropped).
+    """
+    new, duplicates = [], 0
+    for label, hex_code in entries:
+        key = normalize_hex(hex_code)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        new.append((label, hex_code))
+    return new, duplicates
+
+
+def _color(rgb):
+    return normalize_hex(rgb_to_hex(tuple(min(255, max(0, int(round(c)))) for c in rgb)))
+
+
+def _parse_css_color(value):
+    value = value.strip()
+    if value.startswith('#'):
+        digits = value[1:]
+        if len(digits) in (3, 4):
+            digits = ''.join(c * 2 for c in digits[:3])
+        elif len(digits) in (6, 8):
+            digits = digits[:6]
+        else:
+            return None
+        return '#' + digits.upper()
+    channels = re.findall(r'[\d.]+%?', value)
+    if len(channels) < 3:
+        return None
+    rgb = [float(c[:-1]) * 255.0 / 100.0 if c.endswith('%') else float(c) for c in channels[:3]]
+    return _color(rgb)
+
+
+def _read_gpl(f):
+    first = f.readline()
+    if not first.startswith('GIMP Palette'):
+        raise ValueError("Not a GIMP palette (missing 'GIMP Palette' header)")
+    for line in f:
+        if line.startswith('#') or line.startswith('Name:') or line.startswith('Columns:'):
+            continue
+        match = _GPL_ROW.match(line)
+        if match is None:
+            continue
+        rgb = tuple(int(match.group(i)) for i in (1, 2, 3))
+        if max(rgb) > 255:
+            continue
+        hex_code = _color(rgb)
+        yield match.group(4).strip() or hex_code, hex_code
+
+
+def _write_gpl(f, entries, name):
+    f.write(f"GIMP Palette\nName: {name}\nColumns: 4\n#\n")
+    count = 0
+    for label, hex_code in entries:
+        r, g, b = hex_to_rgb(hex_code)
+        f.write(f"{r:3d} {g:3d} {b:3d}\t{' '.join(label.split())}\n")
+        count += 1
+    return count
+
+
+def _read_css(f):
+    for line in f:
+        for match in _CSS_PROPERTY.finditer(line):
+            hex_code = _parse_css_color(match.group(2))
+            if hex_code is not None:
+                yield match.group(1), hex_code
+
+
+def _css_name(label, used):
+    # Custom property names from labels: lower-case words joined by dashes, unique
+    base = re.sub(r'[^a-z0-9_]+', '-', label.lower()).strip('-') or 'color'
+    name, suffix = base, 2
+    while name in used:
+        name = f"{base}-{suffix}"
+        suffix += 1
+    used.add(name)
+    return name
+
+
+def _write_css(f, entries):
+    f.write(":root {\n")
+    used = set()
+    count = 0
+    for label, hex_code in entries:
+        f.write(f"  --{_css_name(label, used)}: {normalize_hex(hex_code)};\n")
+        count += 1
+    f.write("}\n")
+    return count
+
+
+def _entry(item):
+    # A favorites-style object, or a bare hex string
+    if isinstance(item, str):
+        label, hex_code = item, item
+    elif isinstance(item, dict):
+        hex_code = item.get("hex")
+        label = item.get("label", item.get("name", hex_code))
+    else:
+        return None
+    try:
+        hex_to_rgb(hex_code)
+    except (ValueError, TypeError, AttributeError):
+        return None
+    return str(label), normalize_hex(hex_code)
+
+
+def _iter_json_array(f):
+    """Yield the items of the first JSON array in a file, parsing one item at a time"""
+    decoder = json.JSONDecoder()
+    while True:
+        chunk = f.read(_CHUNK_SIZE)
+        if not chunk:
+            return
+        start = chunk.find('[')
+        if start >= 0:
+            buffer, pos = chunk[start + 1:], 0
+            break
+
+    while True:
+        pos = _JSON_SEPARATORS.match(buffer, pos).end()
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+        try:
+            if pos == len(buffer):
+                raise ValueError("Need more input")
+            item, end = decoder.raw_decode(buffer, pos)
+            if end == len(buffer) and not isinstance(item, (dict, list, str)):
+                raise ValueError("A number or literal may continue in the next chunk")
+        except ValueError:
+            chunk = f.read(_CHUNK_SIZE)
+            if not chunk:
+                if pos == len(buffer):
+                    return  # Unterminated array; keep what was read
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield item
+        pos = end
+
+
+def _read_json(f):
+    for item in _iter_json_array(f):
+        entry = _entry(item)
+        if entry is not None:
+            yield entry
+
+
+def _write_json(f, entries):
+    f.write("[\n")
+    count = 0
+    for label, hex_code in entries:
+        f.write((",\n" if count else "") + json.dumps({"label": label, "hex": normalize_hex(hex_code)}))
+        count += 1
+    f.write("\n]\n")
+    return count
+
+
+def _read_jsonl(f):
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = _entry(json.loads(line))
+        except ValueError:
+            continue
+        if entry is not None:
+            yield entry
+
+
+def _write_jsonl(f, entries):
+    count = 0
+    for label, hex_code in entries:
+        f.write(json.dumps({"label": label, "hex": normalize_hex(hex_code)}) + "\n")
+        count += 1
+    return count
+
+
+def _read_ase(f):
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b'ASEF':
+        raise ValueError("Not an Adobe Swatch Exchange file")
+    (blocks,) = struct.unpack('>I', header[8:12])
+    for _ in range(blocks):
+        block_header = f.read(6)
+        if len(block_header) < 6:
+            return
+        block_type, length = struct.unpack('>HI', block_header)
+        data = f.read(length)
+        if block_type != _ASE_COLOR or len(data) < 2:
+            continue  # Group markers carry no color
+
+        (name_units,) = struct.unpack('>H', data[:2])
+        pos = 2 + 2 * name_units
+        name = data[2:pos].decode('utf-16-be', errors='replace').rstrip('\0')
+        model = data[pos:pos + 4]
+        channels = _ASE_CHANNELS.get(model)
+        if channels is None or len(data) < pos + 4 + 4 * channels:
+            continue
+        values = struct.unpack(f'>{channels}f', data[pos + 4:pos + 4 + 4 * channels])
+
+        if model == b'RGB ':
+            rgb = [v * 255.0 for v in values]
+        elif model == b'CMYK':
+            c, m, y, k = values
+            rgb = [255.0 * (1.0 - v) * (1.0 - k) for v in (c, m, y)]
+        elif model == b'LAB ':
+            # L is stored as 0-1; Adobe's LAB is D50, ours D65, close enough for swatches
+            rgb = lab_to_rgb((values[0] * 100.0, values[1], values[2]))
+        else:
+            rgb = [values[0] * 255.0] * 3
+        hex_code = _color(rgb)
+        yield name or hex_code, hex_code
+
+
+def _write_ase(f, entries):
+    # The block count comes first, so write a placeholder and patch it at the end
+    f.write(b'ASEF' + struct.pack('>HHI', 1, 0, 0))
+    count = 0
+    for label, hex_code in entries:
+        name = (label + '\0').encode('utf-16-be')
+        r, g, b = hex_to_rgb(hex_code)
+        body = (struct.pack('>H', len(name) // 2) + name + b'RGB '
+                + struct.pack('>fffH', r / 255.0, g / 255.0, b / 255.0, 2))  # 2: normal (process) color
+        f.write(struct.pack('>HI', _ASE_COLOR, len(body)) + body)
+        count += 1
+    f.seek(8)
+    f.write(struct.pack('>I', count))
+    return count
+
+
+def main(argv=None):
+    from config import get_data_directory
+    from favorites import LOCK_TIMEOUT, FavoritesModel, FavoritesStore
+
+    parser = argparse.ArgumentParser(description="Import or export favorites as palette files.")
+    parser.add_argument('command', choices=('import', 'export'))
+    parser.add_argument('path', help="Palette file (.gpl, .ase, .css, .json or .jsonl)")
+    parser.add_argument('--format', choices=FORMATS, help="File format (default: from the extension)")
+    parser.add_argument('--data-dir', help="Favorites directory (default: the app's)")
+    args = parser.parse_args(argv)
+
+    store = FavoritesStore(args.data_dir or get_data_directory())
+    favorites = FavoritesModel()
+
+    # Importing adds favorites with IDs from our own counter, so nobody else may write meanwhile
+    if args.command == 'import' and not store.lock.acquire(LOCK_TIMEOUT):
+        print(f"The favorites in {store.data_dir} are open in Color Picker or another import; "
+              "close it and try again", file=sys.stderr)
+        return 1
+
+    try:
+        return _run(args, store, favorites)
+    finally:
+        store.lock.release()
+
+
+def _run(args, store, favorites):
+    try:
+        store.load(favorites)
+    except OSError as e:
+        print(f"Could not read favorites: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.command == 'export':
+            count = write_palette(args.path, ((f["label"], f["hex"]) for _, f in favorites), args.format)
+            print(f"Exported {count} favorites to {args.path}", file=sys.stderr)
+            return 0
+
+        seen = {normalize_hex(favorite["hex"]) for _, favorite in favorites}
+        entries, duplicates = new_entries(read_palette(args.path, args.format), seen)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Could not {args.command} {args.path}: {e}", file=sys.stderr)
+        return 1
+
+    for label, hex_code in entries:
+        favorites.add(label, hex_code)
+
+    # Every new favorite goes to the journal in one write
+    store.save(favorites)
+    print(f"Imported {len(entries)} colors from {args.path} ({duplicates} duplicates skipped)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
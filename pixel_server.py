@@ -0,0 +1,262 @@
+"""Local HTTP service answering batches of pixel-color queries.
+
+For test harnesses that need many pixel colors per frame. Every request is
+answered from a single screen capture covering all its points; with a frame
+cache the whole screen is captured at most once per `cache_ms` and shared
+by every client. Listens on localhost only:
+
+    python color-picker.py serve --port 8765 --cache-ms 16
+
+    POST /pixels  {"points": [[x, y], ...], "size": 1, "method": "mean"}
+    GET  /pixels?points=10,20;30,40&size=3
+    GET  /health
+
+Both /pixels forms answer {"colors": [[r, g, b], ...], "hex": [...],
+"age_ms": ...}, where age_ms is how old the capture was when it was used.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import capture
+from colors import rgb_to_hex_array
+
+# Largest batch accepted in one request
+MAX_POINTS = 100000
+
+
+class FrameSource:
+    """Answer pixel lookups from screen captures, one capture per batch.
+
+    With cache_ms at 0 each batch captures just the rectangle around its
+    points. Otherwise the whole screen is captured and reused until it is
+    older than cache_ms; concurrent requests wait for a single refresh
+    instead of each capturing.
+    """
+
+    def __init__(self, cache_ms=0):
+        self.cache_s = cache_ms / 1000.0
+        self.captures = 0
+        self._lock = threading.Lock()
+        self._frame = None  # (captured at, (left, top), pixels)
+
+    def _capture(self, left, top, width, height):
+        self.captures += 1
+        return time.perf_counter(), (left, top), capture.grab_region_array(left, top, width, height)
+
+    def frame(self, left, top, right, bottom):
+        """Return (captured at, origin, pixels) covering the inclusive rectangle"""
+        if self.cache_s <= 0:
+            return self._capture(left, top, right - left + 1, bottom - top + 1)
+
+        with self._lock:
+            frame = self._frame
+            if frame is None or time.perf_counter() - frame[0] > self.cache_s:
+                frame = self._frame = self._capture(*capture.screen_bounds())
+            return frame
+
+    def sample(self, points, size=1, method='mean'):
+        """Return an (n, 3) uint8 array of colors for (x, y) points, and the capture age in ms.
+
+        size > 1 reduces the size x size area around each point with the
+        mean or median, like the picker's area sampling.
+        """
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        if not len(points):
+            return np.zeros((0, 3), dtype=np.uint8), 0.0
+        screen_left, screen_top, width, height = capture.screen_bounds()
+        xs, ys = points[:, 0], points[:, 1]
+        if (xs.min() < screen_left or ys.min() < screen_top
+                or xs.max() >= screen_left + width or ys.max() >= screen_top + height):
+            raise ValueError("Points must lie on the screen "
+                             f"({screen_left}, {screen_top}, {width}x{height})")
+
+        # Areas around points near an edge are clipped to the screen
+        half = size // 2
+        left, top = max(int(xs.min()) - half, screen_left), max(int(ys.min()) - half, screen_top)
+        right = min(int(xs.max()) - half + size - 1, screen_left + width - 1)
+        bottom = min(int(ys.max()) - half + size - 1, screen_top + height - 1)
+
+        captured_at, (origin_x, origin_y), pixels = self.frame(left, top, right, bottom)
+        xs = xs - origin_x
+        ys = ys - origin_y
+
+        if size <= 1:
+            colors = pixels[ys, xs]
+        else:
+            # Gather every point's size x size window in one indexing operation
+            offsets = np.arange(size) - half
+            rows = ys[:, None, None] + offsets[None, :, None]
+            columns = xs[:, None, None] + offsets[None, None, :]
+            inside = ((rows >= 0) & (rows < pixels.shape[0]) & (columns >= 0) & (columns < pixels.shape[1]))
+            if inside.all():
+                windows = pixels[rows, columns].reshape(len(points), -1, 3)
+                if method == 'median':
+                    values = np.median(windows, axis=1)
+                else:
+                    values = windows.mean(axis=1)
+            else:
+                # Leave the off-screen cells out of the mean or median
+                windows = pixels[np.clip(rows, 0, pixels.shape[0] - 1),
+                                 np.clip(columns, 0, pixels.shape[1] - 1)].astype(np.float64)
+                windows[~inside] = np.nan
+                windows = windows.reshape(len(points), -1, 3)
+                if method == 'median':
+                    values = np.nanmedian(windows, axis=1)
+                else:
+                    values = np.nanmean(windows, axis=1)
+            colors = np.rint(values).astype(np.uint8)
+
+        return colors, (time.perf_counter() - captured_at) * 1000.0
+
+
+def parse_points(points):
+    """Return points as an (n, 2) int64 array; ValueError unless they are a list of [x, y] integer pairs"""
+    if not isinstance(points, (list, tuple)):
+        raise ValueError("points must be a list of [x, y] pairs")
+    if len(points) > MAX_POINTS:
+        raise ValueError(f"At most {MAX_POINTS} points per request")
+    if not points:
+        return np.zeros((0, 2), dtype=np.int64)
+    try:
+        array = np.asarray(points)
+    except (ValueError, OverflowError):
+        array = None  # Ragged rows, or numbers too large for any integer type
+    # Checked before any reshape, which would turn 3-element rows or odd lists into other points
+    if array is None or array.ndim != 2 or array.shape[1] != 2 or array.dtype.kind not in 'iu':
+        raise ValueError("points must be a list of [x, y] integer pairs")
+    return array.astype(np.int64, copy=False)
+
+
+class PixelRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections open between a client's requests
+    disable_nagle_algorithm = True  # Headers and body go out separately; don't let the body wait for an ACK
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            # Each connection has its own thread and capture handle; close it with the connection
+            capture.release_thread()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self.send_json(200, {"ok": True, "captures": self.server.source.captures})
+        elif url.path == '/pixels':
+            query = parse_qs(url.query)
+            try:
+                points = [tuple(int(v) for v in point.split(','))
+                          for point in query.get('points', [''])[0].split(';') if point]
+                size = int(query.get('size', ['1'])[0])
+            except ValueError:
+                self.send_json(400, {"error": "points must look like x,y;x,y"})
+                return
+            self.answer(points, size, query.get('method', ['mean'])[0])
+        else:
+            self.send_json(404, {"error": f"Unknown path {url.path}"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/pixels':
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            points = body.get('points', [])
+            size = int(body.get('size', 1))
+            method = body.get('method', 'mean')
+        except (ValueError, TypeError, AttributeError):
+            self.send_json(400, {"error": "Body must be a JSON object with a points list"})
+            return
+        self.answer(points, size, method)
+
+    def answer(self, points, size, method):
+        try:
+            points = parse_points(points)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        if size < 1 or method not in ('mean', 'median'):
+            self.send_json(400, {"error": "size must be at least 1 and method mean or median"})
+            return
+        try:
+            colors, age_ms = self.server.source.sample(points, size, method)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self.send_json(500, {"error": f"Capture failed: {e}"})
+            return
+        self.send_json(200, {"colors": colors.tolist(), "hex": rgb_to_hex_array(colors),
+                             "age_ms": round(age_ms, 3)})
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would swamp the console
+
+
+class PixelServer:
+    """Serve pixel queries on a background thread; each client gets its own thread."""
+
+    def __init__(self, port=8765, host='127.0.0.1', cache_ms=0):
+        self.httpd = ThreadingHTTPServer((host, port), PixelRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.source = FrameSource(cache_ms)
+        self._thread = None
+
+    @property
+    def address(self):
+        """(host, port) actually bound; useful when port 0 picked a free one"""
+        return self.httpd.server_address[:2]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.httpd.serve_forever, name="pixel-server", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop serving and release the port (waits up to one poll interval)"""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread = None
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    from config import config
+
+    parser = argparse.ArgumentParser(description="Serve batches of screen pixel colors over local HTTP.")
+    parser.add_argument('--port', type=int, default=config['server_port'],
+                        help="Port on 127.0.0.1 (default from config, 8765)")
+    parser.add_argument('--cache-ms', type=float, default=config['server_cache_ms'],
+                        help="Reuse a full-screen capture for this long (default 0: capture every request)")
+    args = parser.parse_args(argv)
+
+    server = PixelServer(args.port, cache_ms=args.cache_ms)
+    host, port = server.address
+    print(f"Serving pixel queries on http://{host}:{port}/pixels", file=sys.stderr)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
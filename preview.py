@@ -0,0 +1,86 @@
+"""Pick preview plumbing: the picker state machine and fixed-rate updates."""
+import threading
+
+
+class PickerState:
+    """Idle -> picking -> finishing -> idle, shared by the Tk loop and input threads.
+
+    The input listeners live for the whole session; they only act while the
+    state is PICKING, so arming and disarming a pick is a single transition.
+    """
+
+    IDLE = 'idle'
+    PICKING = 'picking'
+    FINISHING = 'finishing'
+
+    def __init__(self):
+        self.state = self.IDLE
+        self._lock = threading.Lock()
+
+    def transition(self, current, new):
+        """Move from `current` to `new`; return False if we were not in `current`"""
+        with self._lock:
+            if self.state != current:
+                return False
+            self.state = new
+            return True
+
+    @property
+    def picking(self):
+        return self.state == self.PICKING
+
+
+class PreviewScheduler:
+    """Redraw the pick preview at a fixed rate from the Tk main loop.
+
+    Input listener threads only call `submit` with the latest cursor
+    position. Each frame the Tk loop takes the newest position, if any, and
+    calls `render(x, y)` once, so positions that arrive faster than the frame
+    rate are dropped instead of queued.
+    """
+
+    def __init__(self, root, render, rate=60):
+        self.root = root
+        self.render = render
+        self.interval_ms = max(1, round(1000 / rate))
+        self._lock = threading.Lock()
+        self._pending = None
+        self._after_id = None
+        self._last_error = None
+
+    def submit(self, x, y):
+        """Record the latest cursor position (safe to call from any thread)"""
+        with self._lock:
+            self._pending = (x, y)
+
+    def start(self):
+        """Begin ticking on the Tk loop"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        """Stop ticking and forget any position that was not drawn yet"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        with self._lock:
+            self._pending = None
+
+    def _tick(self):
+        # Take the newest position and clear it so we only draw once per move
+        with self._lock:
+            position, self._pending = self._pending, None
+
+        try:
+            if position is not None:
+                self.render(*position)
+                self._last_error = None
+        except Exception as e:
+            # Report a failing frame once rather than on every tick
+            message = f"Error updating preview: {e}"
+            if message != self._last_error:
+                print(message)
+                self._last_error = message
+        finally:
+            # Keep ticking whatever happened, so one bad frame never freezes the preview
+            self._after_id = self.root.after(self.interval_ms, self._tick)
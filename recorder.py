@@ -0,0 +1,260 @@
+"""Continuous color recording at a fixed point or under the cursor.
+
+Samples the screen at a fixed rate on a background thread. The newest
+samples are kept in a fixed-size ring buffer, and every sample is streamed
+to a CSV or JSON lines file as it is taken. Runs from the GUI or headless:
+
+    python color-picker.py record --point 640 360 --rate 60 --duration 10 -o video.csv
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from colors import rgb_to_hex
+
+
+class SampleRing:
+    """The newest `capacity` samples, stored in preallocated numpy arrays.
+
+    Appending overwrites the oldest sample once the buffer is full, so
+    memory stays fixed however long a recording runs.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.positions = np.zeros((capacity, 2), dtype=np.int32)
+        self.colors = np.zeros((capacity, 3), dtype=np.uint8)
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, t, x, y, rgb):
+        with self._lock:
+            i = self._next
+            self.times[i] = t
+            self.positions[i] = (x, y)
+            self.colors[i] = rgb[:3]
+            self._next = (i + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def latest(self):
+        """Return the newest (t, (x, y), (r, g, b)) or None if empty"""
+        with self._lock:
+            if not self._count:
+                return None
+            i = self._next - 1
+            return (float(self.times[i]), tuple(self.positions[i].tolist()),
+                    tuple(self.colors[i].tolist()))
+
+    def snapshot(self):
+        """Copies of (times, positions, colors), oldest sample first"""
+        with self._lock:
+            if self._count < self.capacity:
+                order = slice(0, self._count)
+                return self.times[order].copy(), self.positions[order].copy(), self.colors[order].copy()
+            order = np.roll(np.arange(self.capacity), -self._next)
+            return self.times[order], self.positions[order], self.colors[order]
+
+
+class CsvSink:
+    """Write samples as CSV rows: time, x, y, r, g, b, hex"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.file.write("time,x,y,r,g,b,hex\n")
+
+    def write(self, t, x, y, rgb):
+        self.file.write(f"{t:.6f},{x},{y},{rgb[0]},{rgb[1]},{rgb[2]},{rgb_to_hex(rgb)}\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlSink:
+    """Write samples as one JSON object per line"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+
+    def write(self, t, x, y, rgb):
+        self.file.write(json.dumps({"time": round(t, 6), "x": x, "y": y,
+                                    "rgb": [rgb[0], rgb[1], rgb[2]], "hex": rgb_to_hex(rgb)}) + '\n')
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def open_sink(path):
+    """Pick the sink for a file by its extension (.jsonl/.json or CSV otherwise)"""
+    if os.path.splitext(path)[1].lower() in ('.jsonl', '.json'):
+        return JsonlSink(path)
+    return CsvSink(path)
+
+
+class Recorder:
+    """Sample `sample(x, y) -> (r, g, b)` at a fixed rate on a background thread.
+
+    `position` is either a fixed (x, y) point or a callable returning the
+    current cursor position. Ticks are scheduled on a fixed grid from the
+    start time, so a slow sample does not shift later ones. A tick that
+    starts more than one period late is skipped and counted as dropped;
+    a sample that starts more than `late_after` of a period off the grid
+    is counted as late. Sample times are seconds since the recording began.
+    """
+
+    def __init__(self, sample, position, rate=30, capacity=10000, sink=None, late_after=0.5):
+        self.sample = sample
+        self.position = position
+        self.period = 1.0 / rate
+        self.ring = SampleRing(capacity)
+        self.sink = sink
+        self.late_after = late_after
+        self.samples = 0
+        self.dropped = 0
+        self.late = 0
+        self.max_jitter_ms = 0.0
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+        self._finished = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="color-recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop sampling, then flush and close the sink"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, duration=None):
+        """Block until the recording stops, or for at most `duration` seconds"""
+        self._stop.wait(duration)
+
+    def stats(self):
+        """Counters for the status bar and the end-of-run summary"""
+        elapsed = 0.0
+        if self._started is not None:
+            elapsed = (self._finished or time.perf_counter()) - self._started
+        return {
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "late": self.late,
+            "max_jitter_ms": round(self.max_jitter_ms, 3),
+            "elapsed_s": round(elapsed, 3),
+            "buffered": len(self.ring),
+        }
+
+    def _where(self):
+        return self.position() if callable(self.position) else self.position
+
+    def _run(self):
+        self._started = start = time.perf_counter()
+        next_flush = start + 1.0
+        tick = 0
+        try:
+            while not self._stop.is_set():
+                scheduled = start + tick * self.period
+                now = time.perf_counter()
+                if scheduled > now:
+                    # Event.wait returns early when stop() is called
+                    if self._stop.wait(scheduled - now):
+                        break
+                    now = time.perf_counter()
+
+                jitter = now - scheduled
+                if jitter >= self.period:
+                    # Too far behind: skip the missed ticks instead of bursting
+                    missed = int(jitter / self.period)
+                    self.dropped += missed
+                    tick += missed
+                    scheduled = start + tick * self.period
+                    jitter = now - scheduled
+                if jitter > self.late_after * self.period:
+                    self.late += 1
+                self.max_jitter_ms = max(self.max_jitter_ms, jitter * 1000.0)
+
+                x, y = self._where()
+                rgb = self.sample(x, y)
+                t = now - start
+                self.ring.append(t, x, y, rgb)
+                if self.sink is not None:
+                    self.sink.write(t, x, y, rgb)
+                    if now >= next_flush:
+                        self.sink.flush()
+                        next_flush = now + 1.0
+                self.samples += 1
+                tick += 1
+        except Exception as e:
+            self.error = e
+            print(f"Error while recording: {e}")
+        finally:
+            self._finished = time.perf_counter()
+            self._stop.set()
+            if self.sink is not None:
+                self.sink.close()
+            # This thread's capture handle would otherwise outlive it
+            import capture
+            capture.release_thread()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record the screen color at a point or under the cursor.")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument('--point', type=int, nargs=2, metavar=('X', 'Y'), help="Sample this screen point")
+    where.add_argument('--follow', action='store_true', help="Sample under the mouse cursor")
+    parser.add_argument('--rate', type=float, default=30, help="Samples per second (default 30)")
+    parser.add_argument('--duration', type=float, help="Stop after this many seconds (default: until Ctrl+C)")
+    parser.add_argument('--size', type=int, default=1, help="Average over a size x size area (default 1)")
+    parser.add_argument('--method', choices=('mean', 'median'), default='mean',
+                        help="How to combine an area (default mean)")
+    parser.add_argument('--buffer', type=int, default=10000, help="Samples kept in memory (default 10000)")
+    parser.add_argument('-o', '--output', required=True, help="CSV file, or .jsonl for JSON lines")
+    args = parser.parse_args(argv)
+
+    import capture  # Only the recorder needs a display connection
+
+    if args.follow:
+        from pynput import mouse
+        controller = mouse.Controller()
+        position = lambda: controller.position
+    else:
+        position = tuple(args.point)
+
+    recorder = Recorder(lambda x, y: capture.sample_area(x, y, args.size, args.method),
+                        position, rate=args.rate, capacity=args.buffer, sink=open_sink(args.output))
+    recorder.start()
+    try:
+        recorder.wait(args.duration)
+    except KeyboardInterrupt:
+        pass
+    recorder.stop()
+
+    print(json.dumps(recorder.stats()), file=sys.stderr)
+    return 1 if recorder.error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Color statistics for a rectangular screen region.
+
+Everything works on the captured (height, width, 3) buffer with numpy
+binning; no per-pixel Python loops, so a full 4K screen takes well under a
+second. A `step` above 1 samples every step-th row and column first, for a
+quick preview of large regions.
+"""
+import numpy as np
+
+from colors import rgb_to_hex
+
+
+def region_bounds(corner1, corner2):
+    """Return (left, top, width, height) of the rectangle spanning two corners, inclusive"""
+    left, right = sorted((corner1[0], corner2[0]))
+    top, bottom = sorted((corner1[1], corner2[1]))
+    return left, top, right - left + 1, bottom - top + 1
+
+
+def preview_step(width, height, max_pixels=250000):
+    """Smallest sampling step that keeps a region at or below max_pixels"""
+    step = 1
+    while (width // step) * (height // step) > max_pixels:
+        step += 1
+    return step
+
+
+def channel_histograms(pixels):
+    """Return a (3, 256) array counting each value of the R, G and B channels"""
+    return np.stack([np.bincount(pixels[..., c].ravel(), minlength=256) for c in range(3)])
+
+
+def top_colors(pixels, count=10, bits=5):
+    """Return the `count` most common colors as (rgb, pixel count) pairs.
+
+    Colors are binned on their top `bits` bits per channel, so near-identical
+    shades (anti-aliasing, gradients, compression noise) count together; each
+    bin reports the mean color of its pixels. bits=8 counts exact colors.
+    """
+    shift = 8 - bits
+    mask = (1 << bits) - 1
+    packed = ((pixels[..., 0].ravel().astype(np.uint32) << 16)
+              | (pixels[..., 1].ravel().astype(np.uint32) << 8)
+              | pixels[..., 2].ravel())
+    if shift:
+        codes = ((((packed >> (16 + shift)) & mask) << (2 * bits))
+                 | (((packed >> (8 + shift)) & mask) << bits)
+                 | ((packed >> shift) & mask))
+    else:
+        codes = packed
+
+    counts = np.bincount(codes, minlength=1 << (3 * bits))
+    count = min(count, int(np.count_nonzero(counts)))
+    if count == 0:
+        return []
+    top = np.argpartition(counts, -count)[-count:]
+    top = top[np.argsort(counts[top])[::-1]]
+
+    # Lowest value of each winning bin per channel
+    colors = np.stack(((top >> (2 * bits)) & mask, (top >> bits) & mask, top & mask), axis=-1) << shift
+
+    if shift:
+        # Mean color of the pixels in each winning bin. Map every pixel to the
+        # rank of its bin (-1 for the rest), then count rank and dropped low
+        # bits together in one integer bincount; the per-channel means of the
+        # low bits come out of that small table.
+        rank = np.full(len(counts), -1, dtype=np.int64)
+        rank[top] = np.arange(count)
+        ranks = rank[codes]
+        hit = ranks >= 0
+        low_mask = (1 << shift) - 1
+        low = packed[hit]
+        low = (((low >> 16) & low_mask) << (2 * shift)) | (((low >> 8) & low_mask) << shift) | (low & low_mask)
+        side = 1 << shift
+        joint = np.bincount((ranks[hit] << (3 * shift)) + low, minlength=count * side ** 3)
+        joint = joint.reshape(count, side, side, side)
+        levels = np.arange(side)
+        low_sums = np.stack([joint.sum(axis=(2, 3)) @ levels,
+                             joint.sum(axis=(1, 3)) @ levels,
+                             joint.sum(axis=(1, 2)) @ levels], axis=-1)
+        colors = np.rint(colors + low_sums / counts[top][:, None]).astype(np.int64)
+
+    return [(tuple(int(v) for v in color), int(counts[code])) for color, code in zip(colors, top)]
+
+
+def analyze_region(pixels, count=10, bits=5, step=1):
+    """Summarise an (h, w, 3) RGB buffer: histograms, average and top colors.
+
+    Returns a dict with "size", "pixels", "step", "average" (r, g, b),
+    "histogram" (3 x 256 counts) and "top", a list of
+    {"hex", "rgb", "count", "fraction"} most common first.
+    """
+    height, width = pixels.shape[:2]
+    if step > 1:
+        pixels = pixels[::step, ::step]
+    total = pixels.shape[0] * pixels.shape[1]
+
+    histogram = channel_histograms(pixels)
+    # The per-channel means fall out of the histograms for free
+    average = tuple(int(v) for v in np.rint(histogram @ np.arange(256) / max(total, 1)))
+
+    top = []
+    for rgb, pixel_count in top_colors(pixels, count, bits):
+        top.append({
+            "hex": rgb_to_hex(rgb),
+            "rgb": list(rgb),
+            "count": pixel_count,
+            "fraction": round(pixel_count / total, 4),
+        })
+
+    return {
+        "size": [width, height],
+        "pixels": total,
+        "step": step,
+        "average": average,
+        "histogram": histogram,
+        "top": top,
+    }
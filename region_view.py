@@ -0,0 +1,93 @@
+"""Window showing the histogram and top colors of a selected screen region."""
+import tkinter as tk
+from tkinter import ttk
+
+from colors import is_dark, rgb_to_hex
+
+HISTOGRAM_HEIGHT = 100
+CHANNEL_COLORS = ("#D03030", "#30A030", "#3050D0")
+
+
+class RegionWindow:
+    """A Toplevel that shows one region analysis and is reused for the next.
+
+    `show` can be called twice for the same region: first with the quick
+    downsampled result, then with the full one.
+    """
+
+    def __init__(self, master, on_copy, on_add_all):
+        self.on_copy = on_copy
+        self.on_add_all = on_add_all
+        self.result = None
+        self.bounds = None
+
+        self.window = tk.Toplevel(master)
+        self.window.title("Region Colors")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.window.withdraw)
+
+        self.title_var = tk.StringVar()
+        tk.Label(self.window, textvariable=self.title_var, font=("Arial", 12, "bold")).pack(pady=(10, 5))
+
+        # Average color of the whole region
+        average_frame = tk.Frame(self.window)
+        average_frame.pack(pady=(0, 5))
+        tk.Label(average_frame, text="Average", font=("Arial", 10)).pack(side=tk.LEFT, padx=(0, 5))
+        self.average_swatch = tk.Label(average_frame, width=10, font=("Arial", 10), relief="groove")
+        self.average_swatch.pack(side=tk.LEFT)
+        self.average_swatch.bind("<Button-1>", lambda event: self.on_copy(self.average_swatch.cget("text")))
+
+        # Per-channel histograms drawn as one line per channel
+        self.histogram = tk.Canvas(self.window, width=256, height=HISTOGRAM_HEIGHT, bg="white",
+                                   highlightthickness=1, highlightbackground="#C0C0C0")
+        self.histogram.pack(padx=10, pady=5)
+
+        # Most common colors, one swatch row each; click to copy the hex code
+        self.top_frame = tk.Frame(self.window)
+        self.top_frame.pack(padx=10, pady=5, fill=tk.X)
+
+        self.note_var = tk.StringVar()
+        tk.Label(self.window, textvariable=self.note_var, font=("Arial", 9), foreground="gray").pack()
+
+        ttk.Button(self.window, text="Add All to Favorites",
+                   command=lambda: self.on_add_all(self.result, self.bounds)).pack(pady=(5, 10))
+
+    def show(self, result, bounds):
+        """Display a result from region.analyze_region for the (left, top, width, height) bounds"""
+        self.result = result
+        self.bounds = bounds
+        left, top, width, height = bounds
+        self.title_var.set(f"{width} x {height} region at ({left}, {top})")
+
+        average = rgb_to_hex(result["average"])
+        self.average_swatch.config(text=average.upper(), bg=average,
+                                   fg="white" if is_dark(result["average"]) else "black")
+
+        self.draw_histogram(result["histogram"])
+
+        for child in self.top_frame.winfo_children():
+            child.destroy()
+        for color in result["top"]:
+            row = tk.Label(self.top_frame, text=f"{color['hex'].upper()}   {color['fraction']:.1%}",
+                           bg=color["hex"], fg="white" if is_dark(color["rgb"]) else "black",
+                           font=("Arial", 10), anchor="w", padx=5)
+            row.pack(fill=tk.X, pady=1)
+            row.bind("<Button-1>", lambda event, hex_code=color["hex"].upper(): self.on_copy(hex_code))
+
+        if result["step"] > 1:
+            self.note_var.set(f"Preview from every {result['step']}th pixel, full analysis running...")
+        else:
+            self.note_var.set(f"{result['pixels']:,} pixels. Click a color to copy it.")
+
+        self.window.deiconify()
+        self.window.lift()
+
+    def draw_histogram(self, histogram):
+        self.histogram.delete("all")
+        peak = max(int(histogram.max()), 1)
+        scale = (HISTOGRAM_HEIGHT - 2) / peak
+        for counts, color in zip(histogram.tolist(), CHANNEL_COLORS):
+            points = []
+            for value, count in enumerate(counts):
+                points.extend((value, HISTOGRAM_HEIGHT - count * scale))
+            self.histogram.create_line(*points, fill=color)
@@ -0,0 +1,157 @@
+"""Sampling at the edges of the virtual screen, and backend calibration.
+
+Runs against the fake backend: two 1920x1080 monitors side by side with
+the left one at negative x, so no display is needed.
+"""
+import time
+
+import numpy as np
+import pytest
+
+import capture
+import capture_backends
+import magnifier
+from capture_backends import FakeBackend
+
+LEFT, TOP, WIDTH, HEIGHT = -1920, 0, 3840, 1080
+
+CORNERS = [
+    (LEFT, TOP),
+    (LEFT + WIDTH - 1, TOP),
+    (LEFT, TOP + HEIGHT - 1),
+    (LEFT + WIDTH - 1, TOP + HEIGHT - 1),
+]
+
+
+# Building the pattern takes a while, so every test shares one
+FRAME = FakeBackend.pattern(WIDTH, HEIGHT, (LEFT, TOP))
+
+
+@pytest.fixture
+def fake_screen(monkeypatch):
+    screen = FakeBackend(FRAME, origin=(LEFT, TOP))
+    monkeypatch.setattr(capture, '_backend', screen)
+    return screen
+
+
+def on_screen(x, y):
+    return LEFT <= x < LEFT + WIDTH and TOP <= y < TOP + HEIGHT
+
+
+def expected_tile(x, y, size):
+    half = size // 2
+    tile = np.empty((size, size, 3), dtype=np.uint8)
+    for row in range(size):
+        for column in range(size):
+            px, py = x - half + column, y - half + row
+            tile[row, column] = FakeBackend.expected_color(px, py) if on_screen(px, py) else capture.OFF_SCREEN_COLOR
+    return tile
+
+
+@pytest.mark.parametrize('x, y', CORNERS)
+@pytest.mark.parametrize('size', [1, 3, 11])
+def test_sample_tile_array_pads_off_screen_cells(fake_screen, x, y, size):
+    tile = capture.sample_tile_array(x, y, size)
+
+    assert tile.shape == (size, size, 3)
+    assert tile.dtype == np.uint8
+    np.testing.assert_array_equal(tile, expected_tile(x, y, size))
+
+
+@pytest.mark.parametrize('x, y', CORNERS)
+@pytest.mark.parametrize('method', ['mean', 'median'])
+@pytest.mark.parametrize('size', [1, 3, 5])
+def test_sample_area_averages_only_on_screen_pixels(fake_screen, x, y, method, size):
+    half = size // 2
+    pixels = np.array([FakeBackend.expected_color(px, py)
+                       for py in range(y - half, y + half + 1)
+                       for px in range(x - half, x + half + 1) if on_screen(px, py)])
+    reduce = np.median if method == 'median' else np.mean
+    expected = tuple(int(v) for v in np.rint(reduce(pixels, axis=0)))
+
+    assert capture.sample_area(x, y, size, method) == expected
+
+
+def test_sample_area_off_screen_raises_value_error(fake_screen):
+    with pytest.raises(ValueError):
+        capture.sample_area(LEFT - 5, TOP, 3)
+    with pytest.raises(ValueError):
+        capture.sample_pixel(LEFT + WIDTH, TOP)
+
+
+class FakePhotoImage:
+    """Stands in for ImageTk.PhotoImage, which needs a Tk display"""
+
+    def __init__(self, image, master=None):
+        self.image = image
+
+    def paste(self, image):
+        self.image = image
+
+
+@pytest.mark.parametrize('x, y', CORNERS)
+def test_magnifier_renders_at_corners(fake_screen, monkeypatch, x, y):
+    monkeypatch.setattr(magnifier.ImageTk, 'PhotoImage', FakePhotoImage)
+    loupe = magnifier.Magnifier(None, grid_size=11, zoom=4)
+
+    assert loupe.render(x, y) == FakeBackend.expected_color(x, y)
+    assert not loupe.complete
+    np.testing.assert_array_equal(loupe.tile, expected_tile(x, y, 11))
+
+    # Back in the middle of the screen the whole tile is captured again
+    assert loupe.render(0, 500) == FakeBackend.expected_color(0, 500)
+    assert loupe.complete
+
+
+class SlowStartBackend(FakeBackend):
+    """A backend whose first grab takes longer than the whole calibration budget"""
+
+    name = 'slow-start'
+    first_grab = 0.1
+
+    def __init__(self):
+        super().__init__(FRAME, origin=(LEFT, TOP))
+        self.grabs = 0
+
+    def grab(self, left, top, width, height):
+        self.grabs += 1
+        if self.grabs == 1:
+            time.sleep(self.first_grab)
+        return super().grab(left, top, width, height)
+
+
+class WrongShapeBackend(FakeBackend):
+    name = 'wrong-shape'
+
+    def __init__(self):
+        super().__init__(FRAME, origin=(LEFT, TOP))
+
+    def grab(self, left, top, width, height):
+        return super().grab(left, top, width, height)[:, :, :2]
+
+
+@pytest.fixture
+def test_backends(monkeypatch):
+    monkeypatch.setitem(capture_backends.BACKENDS, 'slow-start', SlowStartBackend)
+    monkeypatch.setitem(capture_backends.BACKENDS, 'wrong-shape', WrongShapeBackend)
+    monkeypatch.setattr(capture, 'calibration', {})
+
+
+def test_calibrate_times_a_backend_whose_first_grab_is_slow(test_backends):
+    chosen = capture.calibrate(['slow-start'], budget=SlowStartBackend.first_grab / 10)
+
+    assert isinstance(chosen, SlowStartBackend)
+    assert chosen.grabs >= 2  # The warm-up plus at least one timed grab
+    assert isinstance(capture.calibration['slow-start'], float)
+
+
+def test_calibrate_rejects_a_backend_with_the_wrong_shape(test_backends):
+    chosen = capture.calibrate(['wrong-shape', 'slow-start'], budget=0.01)
+
+    assert isinstance(chosen, SlowStartBackend)
+    assert capture.calibration['wrong-shape'].startswith('unavailable')
+
+
+def test_calibrate_raises_when_nothing_works(test_backends):
+    with pytest.raises(OSError):
+        capture.calibrate(['wrong-shape'], budget=0.01)
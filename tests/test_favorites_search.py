@@ -0,0 +1,108 @@
+"""Favorites search: query kinds, incremental indexing and background builds."""
+import pytest
+
+from color_index import NearestColorIndex
+from colors import hex_to_rgb
+from favorites import FavoritesModel
+from favorites_search import FavoritesSearch
+
+FAVORITES = [
+    {"label": "Brand Blue", "hex": "#3366CC"},
+    {"label": "Brand Red", "hex": "#CC3333"},
+    {"label": "Sky", "hex": "#3A7BD5"},
+    {"label": "Charcoal", "hex": "#333333"},
+]
+
+
+class App:
+    """The parts of the app a search needs: a model and a color index kept in step"""
+
+    def __init__(self, entries=FAVORITES):
+        self.model = FavoritesModel()
+        self.model.load(entries)
+        self.colors = NearestColorIndex()
+        self.colors.rebuild((key, hex_to_rgb(f["hex"]), f) for key, f in self.model)
+        self.search = FavoritesSearch(self.model, self.colors)
+
+    def add(self, label, hex_code):
+        key = self.model.add(label, hex_code)
+        self.colors.add(key, hex_to_rgb(hex_code), self.model.get(key))
+        self.search.add(key, self.model.get(key))
+        return key
+
+
+@pytest.fixture
+def app():
+    app = App()
+    app.search.build()
+    return app
+
+
+def test_label_substring_ignores_case(app):
+    assert app.search.search("brand") == [1, 2]
+    assert app.search.search("COAL") == [4]
+
+
+def test_fuzzy_match_when_no_label_contains_the_text(app):
+    assert app.search.search("brnd blue")[0] == 1
+
+
+def test_hex_prefix_ignores_case(app):
+    assert app.search.search("#33") == [1, 4]
+    assert app.search.search("#3a7b") == [3]
+
+
+def test_near_query_is_closest_first(app):
+    assert app.search.search("~#3366CC 1") == [1]
+    assert app.search.search("~#3366cc 30")[0] == 1
+    with pytest.raises(ValueError):
+        app.search.search("~blue")
+
+
+def test_empty_query_shows_everything(app):
+    assert app.search.search("  ") is None
+
+
+def test_changes_after_build_are_indexed(app):
+    key = app.add("Brand Green", "#33CC66")
+    assert app.search.search("brand") == [1, 2, key]
+
+    app.model.update(key, label="Mint", hex_code="#AAFFCC")
+    app.search.update(key, app.model.get(key))
+    assert app.search.search("brand") == [1, 2]
+    assert app.search.search("mint") == [key]
+    assert app.search.search("#AAF") == [key]
+
+    app.model.delete(key)
+    app.search.remove(key)
+    assert app.search.search("mint") == []
+    assert app.search.search("#AAF") == []
+
+
+def test_nothing_is_built_on_the_calling_thread():
+    app = App()
+    # Label and hex queries wait for the background build; ~ queries do not need it
+    assert app.search.search("brand") is None
+    assert app.search.search("#33") is None
+    assert app.search.search("~#3366CC 1") == [1]
+    assert not app.search.built
+
+
+def test_changes_during_a_background_build_are_replayed_on_install():
+    app = App()
+    generation, records = app.search.snapshot()
+    indexes = FavoritesSearch.build_indexes(records)  # On a worker thread in the app
+
+    key = app.add("Brand Green", "#33CC66")
+    assert app.search.install(generation, indexes)
+    assert app.search.search("brand") == [1, 2, key]
+
+
+def test_stale_builds_are_not_installed():
+    app = App()
+    generation, records = app.search.snapshot()
+    indexes = FavoritesSearch.build_indexes(records)
+
+    app.search.invalidate()  # The model was replaced meanwhile
+    assert not app.search.install(generation, indexes)
+    assert not app.search.built
@@ -0,0 +1,183 @@
+"""The journaled favorites store: replay, compaction, recovery and locking."""
+import json
+import os
+
+import pytest
+
+import favorites
+from favorites import FavoritesModel, FavoritesStore, StoreBusyError, StoreLock
+
+
+def saved(store, *entries):
+    """Add (label, hex) entries through a fresh model and journal them; return the model"""
+    model = FavoritesModel()
+    store.load(model)
+    for label, hex_code in entries:
+        model.add(label, hex_code)
+    store.save(model)
+    return model
+
+
+def reloaded(data_dir):
+    model = FavoritesModel()
+    FavoritesStore(data_dir).load(model)
+    return model
+
+
+def test_journal_replays_adds_updates_and_deletes(tmp_path):
+    store = FavoritesStore(tmp_path)
+    model = saved(store, ("red", "#FF0000"), ("green", "#00FF00"), ("blue", "#0000FF"))
+    model.update(1, label="scarlet")
+    model.delete(2)
+    store.save(model)
+
+    assert reloaded(tmp_path).to_records() == [
+        {"id": 1, "label": "scarlet", "hex": "#FF0000"},
+        {"id": 3, "label": "blue", "hex": "#0000FF"},
+    ]
+    assert not os.path.exists(store.snapshot_path)  # Still journal only
+
+
+def test_torn_journal_tail_is_skipped_and_compacted(tmp_path):
+    store = FavoritesStore(tmp_path)
+    saved(store, ("red", "#FF0000"), ("blue", "#0000FF"))
+    with open(store.journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "id": 3, "lab')  # A crash mid-append
+
+    model = FavoritesModel()
+    recovered = FavoritesStore(tmp_path)
+    recovered.load(model)
+
+    assert [f["label"] for _, f in model] == ["red", "blue"]
+    # The damage is folded away at once, so later appends start clean
+    assert recovered.journal_records == 0
+    with open(recovered.snapshot_path, encoding='utf-8') as f:
+        assert len(json.load(f)["favorites"]) == 2
+
+
+def test_append_after_torn_tail_starts_a_new_line(tmp_path):
+    store = FavoritesStore(tmp_path)
+    saved(store, ("red", "#FF0000"))
+    with open(store.journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "id": 2, "lab')
+
+    # With compaction held the torn record stays in the journal
+    store = FavoritesStore(tmp_path)
+    store.compaction_held = True
+    model = FavoritesModel()
+    store.load(model)
+    model.add("blue", "#0000FF")
+    store.save(model)
+
+    assert [f["label"] for _, f in reloaded(tmp_path)] == ["red", "blue"]
+
+
+def test_compact_then_reload(tmp_path):
+    store = FavoritesStore(tmp_path, compact_after=3)
+    model = saved(store, ("a", "#000001"), ("b", "#000002"))
+    assert store.journal_records == 2
+
+    model.add("c", "#000003")
+    store.save(model)  # Reaches compact_after
+    assert store.journal_records == 0
+    assert os.path.getsize(store.journal_path) == 0
+
+    model.delete(1)
+    store.save(model)
+    again = reloaded(tmp_path)
+    assert again.to_records() == model.to_records()
+    # IDs are never reused, even for the deleted favorite
+    assert again.next_id == 4
+
+
+def test_legacy_list_is_migrated_and_kept(tmp_path):
+    legacy = [{"label": "red", "hex": "#FF0000"}, {"label": "blue", "hex": "#0000FF"}]
+    (tmp_path / "favorites.json").write_text(json.dumps(legacy), encoding='utf-8')
+
+    assert reloaded(tmp_path).to_list() == legacy
+    assert json.loads((tmp_path / "favorites.json.v1").read_text(encoding='utf-8')) == legacy
+    assert json.loads((tmp_path / "favorites.json").read_text(encoding='utf-8'))["version"] == 2
+
+
+def test_corrupt_snapshot_is_moved_aside_and_never_compacted_over(tmp_path):
+    (tmp_path / "favorites.json").write_text('{"version": 2, "favorites": [', encoding='utf-8')
+
+    store = FavoritesStore(tmp_path, compact_after=1)
+    model = FavoritesModel()
+    store.load(model)
+
+    assert len(model) == 0
+    assert store.compaction_held
+    assert os.path.basename(store.recovered_from).startswith("favorites.json.corrupt-")
+    assert os.path.exists(store.recovered_from)
+
+    model.add("red", "#FF0000")
+    store.save(model)
+    assert not os.path.exists(store.snapshot_path)
+
+    store.compaction_held = False  # The user confirmed
+    store.compact(model)
+    assert os.path.exists(store.snapshot_path)
+
+
+def test_corrupt_snapshot_is_left_alone_while_another_writer_holds_the_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(favorites, 'LOCK_TIMEOUT', 0)
+    (tmp_path / "favorites.json").write_text('not json', encoding='utf-8')
+    owner = StoreLock(tmp_path)
+    assert owner.acquire()
+    try:
+        with pytest.raises(StoreBusyError):
+            FavoritesStore(tmp_path).load(FavoritesModel())
+    finally:
+        owner.release()
+    assert (tmp_path / "favorites.json").read_text(encoding='utf-8') == 'not json'
+
+
+def test_store_lock_is_exclusive(tmp_path):
+    first, second = StoreLock(tmp_path), StoreLock(tmp_path)
+    assert first.acquire()
+    assert not second.acquire(timeout=0.1)
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_writes_need_the_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(favorites, 'LOCK_TIMEOUT', 0)
+    store = FavoritesStore(tmp_path)
+    model = FavoritesModel()
+    store.load(model)
+    model.add("red", "#FF0000")
+
+    owner = StoreLock(tmp_path)
+    owner.acquire()
+    try:
+        with pytest.raises(StoreBusyError):
+            store.save(model)
+        with pytest.raises(StoreBusyError):
+            store.compact(model)
+    finally:
+        owner.release()
+
+
+def test_copy_to_skips_an_empty_source(tmp_path):
+    source, target = tmp_path / "old", tmp_path / "new"
+    source.mkdir()
+    target.mkdir()
+    saved(FavoritesStore(target), ("team blue", "#3366CC"))
+
+    assert FavoritesStore(source).copy_to(target) == 0
+    assert [f["label"] for _, f in reloaded(target)] == ["team blue"]
+
+
+def test_copy_to_merges_and_backs_up_the_target(tmp_path):
+    source, target = tmp_path / "old", tmp_path / "new"
+    source.mkdir()
+    target.mkdir()
+    saved(FavoritesStore(target), ("team blue", "#3366CC"))
+    saved(FavoritesStore(source), ("red", "#FF0000"), ("team blue", "#3366cc"))
+
+    assert FavoritesStore(source).copy_to(target) == 1
+    assert [(f["label"], f["hex"]) for _, f in reloaded(target)] == [("team blue", "#3366CC"), ("red", "#FF0000")]
+    backups = [name for name in os.listdir(target) if ".backup-" in name]
+    assert any(name.startswith("favorites.journal.backup-") for name in backups)
@@ -0,0 +1,116 @@
+"""The background favorites writer: debouncing, flushing, compaction and retries."""
+import threading
+
+from favorites import FavoritesModel, FavoritesStore, FavoritesWriter
+
+
+class CountingStore(FavoritesStore):
+    """Counts journal writes and can be told to fail them"""
+
+    def __init__(self, data_dir, compact_after=1000):
+        super().__init__(data_dir, compact_after)
+        self.appends = 0
+        self.fail = False
+
+    def append(self, changes):
+        if self.fail:
+            raise OSError("disk full")
+        self.appends += 1
+        super().append(changes)
+
+
+def open_store(data_dir, compact_after=1000):
+    store = CountingStore(data_dir, compact_after)
+    model = FavoritesModel()
+    store.load(model)
+    return store, model
+
+
+def reloaded(data_dir):
+    model = FavoritesModel()
+    FavoritesStore(data_dir).load(model)
+    return model
+
+
+def test_a_burst_of_changes_is_one_write(tmp_path):
+    store, model = open_store(tmp_path)
+    writer = FavoritesWriter(store, model, delay=0.05, max_delay=5.0)
+    try:
+        for i in range(20):
+            model.add(f"color {i}", f"#0000{i:02X}")
+            writer.submit(model.take_changes())
+        assert writer.flush(timeout=5)
+    finally:
+        writer.close()
+
+    assert store.appends == 1
+    assert len(reloaded(tmp_path)) == 20
+
+
+def test_close_flushes_pending_changes(tmp_path):
+    store, model = open_store(tmp_path)
+    # A delay far longer than the test, so only close can write
+    writer = FavoritesWriter(store, model, delay=60.0, max_delay=60.0)
+    model.add("red", "#FF0000")
+    writer.submit(model.take_changes())
+    assert store.appends == 0
+
+    assert writer.close(timeout=5)
+    assert not writer.is_alive()
+    assert [f["label"] for _, f in reloaded(tmp_path)] == ["red"]
+
+
+def test_writer_compacts_from_its_own_copy(tmp_path):
+    store, model = open_store(tmp_path, compact_after=5)
+    model.add("before", "#000000")
+    store.save(model)
+    writer = FavoritesWriter(store, model, delay=0.01)
+    try:
+        for i in range(5):
+            model.add(f"color {i}", f"#0000{i:02X}")
+        writer.submit(model.take_changes())
+        assert writer.flush(timeout=5)
+    finally:
+        writer.close()
+
+    assert store.journal_records == 0
+    assert reloaded(tmp_path).to_records() == model.to_records()
+
+
+def test_a_failed_write_is_kept_and_retried(tmp_path):
+    store, model = open_store(tmp_path)
+    results = []
+    writer = FavoritesWriter(store, model, on_result=lambda error, message: results.append(error), delay=0.01)
+    try:
+        store.fail = True
+        model.add("red", "#FF0000")
+        writer.submit(model.take_changes())
+        writer.flush(timeout=5)
+        assert isinstance(results[-1], OSError)
+
+        store.fail = False
+        model.add("blue", "#0000FF")
+        writer.submit(model.take_changes())
+        assert writer.flush(timeout=5)
+        assert results[-1] is None
+    finally:
+        writer.close()
+
+    # The failed batch is written ahead of the newer one
+    assert [f["label"] for _, f in reloaded(tmp_path)] == ["red", "blue"]
+
+
+def test_call_runs_after_earlier_changes_are_written(tmp_path):
+    store, model = open_store(tmp_path)
+    writer = FavoritesWriter(store, model, delay=60.0, max_delay=60.0)
+    done = threading.Event()
+    seen = []
+    try:
+        model.add("red", "#FF0000")
+        writer.submit(model.take_changes())
+        writer.call(lambda: len(reloaded(tmp_path)), lambda error, result: (seen.append(result), done.set()))
+        assert done.wait(5)
+    finally:
+        writer.close()
+
+    assert seen == [1]
@@ -0,0 +1,101 @@
+"""Palette files: round trips through every format, and the headless import/export."""
+import struct
+
+import pytest
+
+import palette_io
+from favorites import FavoritesModel, FavoritesStore
+
+ENTRIES = [
+    ("Brand Blue", "#3366CC"),
+    ("lower case", "#abcdef"),
+    ("Black", "#000000"),
+    ("Unicode ✓ label", "#FF8800"),
+]
+
+
+@pytest.mark.parametrize('format', palette_io.FORMATS)
+def test_round_trip_keeps_labels_and_normalizes_hex(tmp_path, format):
+    path = tmp_path / f"palette.{format}"
+    assert palette_io.write_palette(str(path), ENTRIES) == len(ENTRIES)
+
+    entries = list(palette_io.read_palette(str(path)))
+    hex_codes = [hex_code for _, hex_code in entries]
+    # Every reader yields the same upper-case '#RRGGBB' the app stores
+    assert hex_codes == [hex_code.upper() for _, hex_code in ENTRIES]
+    if format == 'css':
+        # Labels become custom property names
+        assert [label for label, _ in entries] == ["brand-blue", "lower-case", "black", "unicode-label"]
+    else:
+        assert [label for label, _ in entries] == [label for label, _ in ENTRIES]
+
+
+def test_gpl_rows_without_a_name_are_labelled_with_their_hex(tmp_path):
+    path = tmp_path / "palette.gpl"
+    path.write_text("GIMP Palette\nName: test\nColumns: 4\n#\n171 205 239\n300 0 0 too bright\n", encoding='utf-8')
+
+    assert list(palette_io.read_palette(str(path))) == [("#ABCDEF", "#ABCDEF")]
+
+
+def test_css_short_hex_and_rgb_functions(tmp_path):
+    path = tmp_path / "palette.css"
+    path.write_text(":root {\n  --short: #abc;\n  --alpha: #11223380;\n  --fn: rgb(255, 0, 128);\n"
+                    "  --pct: rgb(100%, 50%, 0%);\n  --bad: #12;\n}\n", encoding='utf-8')
+
+    assert list(palette_io.read_palette(str(path))) == [
+        ("short", "#AABBCC"), ("alpha", "#112233"), ("fn", "#FF0080"), ("pct", "#FF8000")]
+
+
+def test_ase_cmyk_and_gray_swatches(tmp_path):
+    def swatch(name, model, values):
+        name = (name + '\0').encode('utf-16-be')
+        body = (struct.pack('>H', len(name) // 2) + name + model
+                + struct.pack(f'>{len(values)}fH', *values, 2))
+        return struct.pack('>HI', 0x0001, len(body)) + body
+
+    path = tmp_path / "palette.ase"
+    path.write_bytes(b'ASEF' + struct.pack('>HHI', 1, 0, 2)
+                     + swatch("cyan", b'CMYK', (1.0, 0.0, 0.0, 0.0))
+                     + swatch("mid gray", b'Gray', (0.5,)))
+
+    assert list(palette_io.read_palette(str(path))) == [("cyan", "#00FFFF"), ("mid gray", "#808080")]
+
+
+def test_not_a_palette_is_an_error(tmp_path):
+    gpl, ase = tmp_path / "bad.gpl", tmp_path / "bad.ase"
+    gpl.write_text("hello\n", encoding='utf-8')
+    ase.write_bytes(b'nope')
+    with pytest.raises(ValueError):
+        list(palette_io.read_palette(str(gpl)))
+    with pytest.raises(ValueError):
+        list(palette_io.read_palette(str(ase)))
+    with pytest.raises(ValueError):
+        palette_io.detect_format("palette.txt")
+
+
+def test_new_entries_drops_saved_and_repeated_colors():
+    seen = {"#3366CC"}
+    new, duplicates = palette_io.new_entries(
+        [("a", "#3366cc"), ("b", "#FF0000"), ("c", "#ff0000"), ("d", "#00FF00")], seen)
+
+    assert new == [("b", "#FF0000"), ("d", "#00FF00")]
+    assert duplicates == 2
+    assert seen == {"#3366CC", "#FF0000", "#00FF00"}
+
+
+def test_import_then_export_through_the_store(tmp_path):
+    data_dir = tmp_path / "data"
+    source = tmp_path / "brand.gpl"
+    palette_io.write_palette(str(source), ENTRIES)
+
+    assert palette_io.main(['import', str(source), '--data-dir', str(data_dir)]) == 0
+    # A second import finds every color already saved
+    assert palette_io.main(['import', str(source), '--data-dir', str(data_dir)]) == 0
+
+    favorites = FavoritesModel()
+    FavoritesStore(str(data_dir)).load(favorites)
+    assert [(f["label"], f["hex"]) for _, f in favorites] == [(label, hex_code.upper()) for label, hex_code in ENTRIES]
+
+    exported = tmp_path / "out.jsonl"
+    assert palette_io.main(['export', str(exported), '--data-dir', str(data_dir)]) == 0
+    assert list(palette_io.read_palette(str(exported))) == [(label, hex_code.upper()) for label, hex_code in ENTRIES]